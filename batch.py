@@ -0,0 +1,69 @@
+"""
+Regels voor de niet-interactieve modus (--batch) en het resultatenlogboek.
+
+Elke regel koppelt een voorwaarde aan een beslissing; de eerste regel die
+past, wint. Tickets waarop geen regel past, wachten op een interactieve run.
+"""
+import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from email_parser import TicketData
+from holidays_be import is_work_day
+
+ACCEPT = "accept"
+SKIP = "skip"
+REVIEW = "review"
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    decision: str                          # ACCEPT | SKIP | REVIEW
+    matches: Callable[[TicketData], bool]
+
+
+def _station_key(name: str | None) -> str:
+    return (name or "").strip().lower()
+
+
+def default_rules(home_station: str | None, office_station: str | None) -> list[Rule]:
+    """
+    Standaardregels: niet-werkdagen overslaan, woon-werkverkeer aanvaarden.
+
+    Zonder HOME_STATION en OFFICE_STATION wordt niets automatisch aanvaard.
+    """
+    commute = {_station_key(home_station), _station_key(office_station)}
+    rules = [Rule("niet-werkdag", SKIP, lambda t: not is_work_day(t.travel_date))]
+    if home_station and office_station:
+        rules.append(Rule(
+            "woon-werk",
+            ACCEPT,
+            lambda t: {_station_key(t.from_station), _station_key(t.to_station)} == commute,
+        ))
+    return rules
+
+
+def classify(ticket: TicketData, rules: list[Rule]) -> tuple[str, str]:
+    """Geeft (beslissing, regelnaam) van de eerste passende regel."""
+    for rule in rules:
+        if rule.matches(ticket):
+            return rule.decision, rule.name
+    return REVIEW, "geen regel"
+
+
+def batch_log_file(state_file: Path) -> Path:
+    """Het logboek staat naast het state-bestand (processed.json)."""
+    return state_file.with_name("batch_log.jsonl")
+
+
+def append_batch_log(record: dict, path: Path) -> None:
+    """Voeg het resultaat van één run toe als één JSON-regel."""
+    record = {"timestamp": datetime.now().isoformat(timespec="seconds"), **record}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
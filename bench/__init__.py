@@ -0,0 +1,5 @@
+"""
+Prestatiemetingen op synthetische NMBS-mailboxen en maandbestanden.
+
+Starten vanuit de projectmap: python -m bench.run (zie bench/run.py).
+"""
@@ -0,0 +1,279 @@
+"""
+Lokale stand-in voor de Gmail API, voor end-to-end tests en benchmarks zonder netwerk.
+
+Bedient dezelfde paden als Gmail, zodat gmail_client er via api_endpoint
+(of GMAIL_API_ENDPOINT in config.py) ongewijzigd tegen praat:
+
+  GET  gmail/v1/users/me/profile
+  GET  gmail/v1/users/me/messages            (paginering met maxResults/pageToken)
+  GET  gmail/v1/users/me/messages/<id>       (format=raw)
+  GET  gmail/v1/users/me/history             (startHistoryId; 404 als te oud)
+  POST batch/gmail/v1                        (multipart/mixed, zoals BatchHttpRequest)
+
+Per HTTP-aanvraag kan vertraging (latency + willekeurige jitter) en een fout
+(error_rate, met error_status) ingesteld worden; een batch telt als één
+aanvraag, de onderdelen krijgen elk hun eigen foutkans. De willekeur is
+geseed, zodat een run reproduceerbaar is.
+
+Gebruik:
+    with GmailStub(synthetic_raw_messages(1000), latency=0.02) as stub:
+        emails = fetch_nmbs_emails(None, None, api_endpoint=stub.endpoint)
+        print(stub.requests)
+"""
+import base64
+import json
+import random
+import threading
+import time
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_API_PREFIX = "/gmail/v1/users/me/"
+BATCH_PATH = "/batch/gmail/v1"
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class GmailStub:
+    """
+    Een mailbox in het geheugen achter een HTTP-server op 127.0.0.1 (vrije poort).
+
+    messages: (message_id, RFC 822-bytes), bijv. uit bench.synthetic.
+    page_size begrenst het aantal id's per messages.list-pagina (Gmail: 500).
+    requests telt de aanvragen per soort ("list", "get", "history", "profile",
+    "batch"); errors telt de geïnjecteerde fouten.
+    """
+
+    def __init__(
+        self,
+        messages: list[tuple[str, bytes]] = (),
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+        page_size: int = MAX_PAGE_SIZE,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = page_size
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._messages: dict[str, bytes] = {}
+        self._order: list[str] = []
+        # historyId -> toegevoegde bericht-id's; history_id is het laatst uitgedeelde
+        self._history: list[tuple[int, list[str]]] = []
+        self.history_id = 1000
+        self.oldest_history_id = self.history_id
+        self.add_messages(messages, record_history=False)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # --- mailbox ---------------------------------------------------------
+
+    def add_messages(self, messages, record_history: bool = True) -> str:
+        """Voeg berichten toe (zoals nieuwe mail); geeft het nieuwe historyId terug."""
+        with self._lock:
+            added = []
+            for msg_id, raw in messages:
+                if msg_id not in self._messages:
+                    self._order.append(msg_id)
+                    added.append(msg_id)
+                self._messages[msg_id] = raw
+            self.history_id += 1
+            if record_history and added:
+                self._history.append((self.history_id, added))
+            return str(self.history_id)
+
+    def expire_history(self) -> None:
+        """Vergeet de geschiedenis: oudere startHistoryId's krijgen dan een 404, zoals bij Gmail."""
+        with self._lock:
+            self._history.clear()
+            self.oldest_history_id = self.history_id
+
+    # --- server ----------------------------------------------------------
+
+    def start(self) -> str:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.endpoint
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self) -> "GmailStub":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- afhandeling (gedeeld door gewone en batch-aanvragen) ------------
+
+    def _inject_error(self, kind: str) -> bool:
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.errors[kind] += 1
+            return failed
+
+    def _delay(self) -> None:
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def handle(self, method: str, target: str) -> tuple[int, dict]:
+        """Verwerk één API-aanvraag; geeft (HTTP-status, JSON-antwoord)."""
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method != "GET" or not url.path.startswith(_API_PREFIX):
+            return 404, _error_body(404, f"Onbekend pad: {method} {url.path}")
+        resource = url.path[len(_API_PREFIX):]
+        kind = {"messages": "list", "history": "history", "profile": "profile"}.get(
+            resource, "get" if resource.startswith("messages/") else resource
+        )
+        with self._lock:
+            self.requests[kind] += 1
+        if self._inject_error(kind):
+            return self.error_status, _error_body(self.error_status, "Geïnjecteerde fout")
+
+        if resource == "profile":
+            return 200, {"emailAddress": "stub@localhost", "historyId": str(self.history_id)}
+        if resource == "messages":
+            return 200, self._list(query)
+        if resource.startswith("messages/"):
+            return self._get(resource[len("messages/"):])
+        if resource == "history":
+            return self._history_list(query)
+        return 404, _error_body(404, f"Onbekend pad: {url.path}")
+
+    def _list(self, query: dict) -> dict:
+        size = min(int(query.get("maxResults", DEFAULT_PAGE_SIZE)), self.page_size)
+        start = int(query.get("pageToken", 0))
+        with self._lock:
+            page = self._order[start:start + size]
+            total = len(self._order)
+        result: dict = {
+            "messages": [{"id": m, "threadId": m} for m in page],
+            "resultSizeEstimate": total,
+        }
+        if start + size < total:
+            result["nextPageToken"] = str(start + size)
+        return result
+
+    def _get(self, msg_id: str) -> tuple[int, dict]:
+        raw = self._messages.get(msg_id)
+        if raw is None:
+            return 404, _error_body(404, "Requested entity was not found.")
+        return 200, {
+            "id": msg_id,
+            "threadId": msg_id,
+            "raw": base64.urlsafe_b64encode(raw).decode("ascii"),
+            "sizeEstimate": len(raw),
+        }
+
+    def _history_list(self, query: dict) -> tuple[int, dict]:
+        start = int(query["startHistoryId"])
+        if start < self.oldest_history_id:
+            return 404, _error_body(404, "Requested entity was not found.")
+        with self._lock:
+            records = [
+                {"id": str(hid), "messagesAdded": [{"message": {"id": m}} for m in ids]}
+                for hid, ids in self._history
+                if hid > start
+            ]
+            latest = str(self.history_id)
+        result: dict = {"historyId": latest}
+        if records:
+            result["history"] = records
+        return 200, result
+
+    def handle_batch(self, content_type: str, body: bytes) -> tuple[str, bytes]:
+        """Verwerk een multipart/mixed batch; geeft (content-type, body) van het antwoord."""
+        with self._lock:
+            self.requests["batch"] += 1
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("ascii") + b"\r\n\r\n" + body
+        )
+        boundary = "batch_stub_boundary"
+        out = []
+        for part in message.iter_parts():
+            request_line = part.get_payload(decode=True).decode("utf-8").split("\r\n", 1)[0]
+            method, target, _ = request_line.split(" ", 2)
+            status, payload = self.handle(method, target)
+            content_id = (part.get("Content-ID") or "").strip("<>")
+            out.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode("utf-8")
+
+
+def _error_body(status: int, message: str) -> dict:
+    return {"error": {"code": status, "message": message, "status": _REASONS.get(status, "")}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Kop en inhoud gaan apart over de socket; zonder dit wacht elke aanvraag
+    # op de vertraagde ACK van de client (tot 40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:  # geen logregel per aanvraag
+        pass
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status, _REASONS.get(status))
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        stub: GmailStub = self.server.stub
+        stub._delay()
+        status, payload = stub.handle("GET", self.path)
+        self._send(status, "application/json; charset=UTF-8", json.dumps(payload).encode("utf-8"))
+
+    def do_POST(self) -> None:
+        stub: GmailStub = self.server.stub
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        stub._delay()
+        if urlsplit(self.path).path != BATCH_PATH:
+            self._send(404, "application/json", json.dumps(_error_body(404, "Onbekend pad")).encode())
+            return
+        if stub._inject_error("batch"):
+            payload = json.dumps(_error_body(stub.error_status, "Geïnjecteerde fout")).encode()
+            self._send(stub.error_status, "application/json", payload)
+            return
+        content_type, response = stub.handle_batch(self.headers["Content-Type"], body)
+        self._send(200, content_type, response)
@@ -0,0 +1,96 @@
+"""
+Piekgeheugen (RSS) van de ophaalroute voor een synthetische mailbox.
+
+Meet hoeveel het piekgeheugen van het proces stijgt terwijl main.sync een
+mailbox van --mails berichten parseert en klaarzet: alle mails, de
+geparseerde tickets met hun HTML en de reviewwachtrij zitten dan tegelijk
+in het geheugen. Draai het in een eigen proces, want de piek (ru_maxrss)
+kan enkel stijgen:
+
+  python -m bench.memory --mails 5000 --budget 64
+
+Met --budget wordt de exitcode 1 als de stijging groter is dan dat aantal MB.
+Werkt niet op Windows (geen resource-module); daar wordt niets gemeten.
+"""
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from bench.synthetic import project_config, synthetic_mails
+
+DEFAULT_MAILS = 5000
+# Stijging van het piekgeheugen voor 5000 mails; gemeten ~18 MB, ruim marge
+DEFAULT_BUDGET_MB = 64
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux geeft kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_sync_peak(n: int) -> dict:
+    """Voer main.sync uit op n synthetische mails in een tijdelijke projectmap."""
+    with tempfile.TemporaryDirectory(prefix="nmbs-mem-") as tmp:
+        cfg = project_config(Path(tmp), None)
+        sys.modules.setdefault("config", cfg)
+        import main
+        main.config = cfg
+
+        before = _peak_rss_mb()
+        started = time.perf_counter()
+        mails = synthetic_mails(n)
+        with redirect_stdout(io.StringIO()):
+            queued = main.sync(raw_emails=mails)
+        peak = _peak_rss_mb()
+    return {
+        "mails": n,
+        "queued": queued,
+        "rss_before_mb": round(before, 1),
+        "rss_peak_mb": round(peak, 1),
+        "growth_mb": round(peak - before, 1),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.memory",
+        description="Piekgeheugen van main.sync voor een synthetische mailbox.",
+    )
+    parser.add_argument("--mails", type=int, default=DEFAULT_MAILS, help="aantal mails (standaard 5000)")
+    parser.add_argument("--budget", type=float, default=None, metavar="MB",
+                        help=f"maximale stijging van het piekgeheugen (bijv. {DEFAULT_BUDGET_MB})")
+    parser.add_argument("--json", action="store_true", help="schrijf het resultaat als JSON")
+    args = parser.parse_args(argv)
+
+    if resource is None:
+        print("Geheugenmeting niet beschikbaar op dit platform (geen resource-module).")
+        return 0
+
+    result = measure_sync_peak(args.mails)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(
+            f"{result['mails']} mails, {result['queued']} klaargezet in {result['seconds']} s:"
+            f" piek {result['rss_peak_mb']} MB (+{result['growth_mb']} MB)"
+        )
+    if args.budget is not None and result["growth_mb"] > args.budget:
+        print(f"Boven het budget van {args.budget} MB.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
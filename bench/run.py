@@ -0,0 +1,360 @@
+"""
+Benchmarks van de hete paden op synthetische mailboxen van 10 tot 10000 mails.
+
+Gebruik (vanuit de projectmap):
+  python -m bench.run                         # schalen 10, 100 en 1000
+  python -m bench.run --full                  # ook 10000 (duurt enkele minuten)
+  python -m bench.run --only parse,excel.write --scales 100
+  python -m bench.run --save-baseline         # bewaar als referentie
+  python -m bench.run                         # vergelijkt met de referentie
+  python -m bench.run --only gmail.fetch,sync --gmail-latency 0.02 --gmail-errors 0.05
+
+De cases gmail.fetch en sync praten over HTTP met een lokale Gmail-stand-in
+(bench/gmail_stub.py): gmail.fetch meet fetch_nmbs_emails, sync de hele
+ophaalroute van main (ophalen, parsen, klaarzetten voor review) in een
+tijdelijke projectmap. --gmail-latency en --gmail-errors stellen de
+vertraging per aanvraag en het aandeel mislukte aanvragen (503, met
+herhalingen door gmail_client) in.
+
+Elke meting is de snelste van --repeat herhalingen, telkens in een verse
+tijdelijke map. Staat er een referentiebestand (standaard bench/baseline.json),
+dan wordt elke meting ermee vergeleken; wie meer dan --threshold keer trager
+is (en minstens MIN_REGRESSION_SECONDS), telt als regressie en de exitcode
+wordt 1. De referentie hangt af van de machine: bewaar ze op dezelfde
+computer als waarop je vergelijkt.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from bench.gmail_stub import GmailStub
+from bench.synthetic import (
+    HOME_STATION,
+    OFFICE_STATION,
+    build_workbooks,
+    project_config,
+    synthetic_mails,
+    synthetic_raw_messages,
+    synthetic_state,
+    synthetic_tickets,
+)
+from email_parser import TicketData, parse_nmbs_email
+from excel_updater import month_excel_files, scan_month_files
+from gmail_client import fetch_nmbs_emails
+from holidays_be import WorkCalendar, configure_calendar, is_work_day, refresh
+from outbox import load_outbox, save_outbox
+from report_gen import generate_history_report, generate_html_report
+from state import is_processed, load_state, mark_processed, save_state
+from verify import verify
+
+DEFAULT_SCALES = (10, 100, 1000)
+FULL_SCALES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 1.25
+# Onder dit verschil is een trager resultaat ruis, geen regressie
+MIN_REGRESSION_SECONDS = 0.005
+# Instellingen van de Gmail-stand-in voor gmail.fetch en sync (--gmail-latency/--gmail-errors)
+STUB_OPTIONS = {"latency": 0.0, "error_rate": 0.0}
+
+
+def _measure(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@lru_cache(maxsize=None)
+def _tickets(n: int) -> tuple[TicketData, ...]:
+    return tuple(synthetic_tickets(n))
+
+
+@lru_cache(maxsize=None)
+def _raw_messages(n: int) -> tuple[tuple[str, bytes], ...]:
+    return tuple(synthetic_raw_messages(n))
+
+
+@lru_cache(maxsize=None)
+def _mails(n: int) -> tuple[tuple[str, str, str], ...]:
+    return tuple(synthetic_mails(n))
+
+
+# Elke case krijgt (n, lege werkmap), doet zijn eigen voorbereiding en geeft
+# alleen de gemeten tijd van het hete pad terug.
+
+def bench_parse(n: int, workdir: Path) -> float:
+    mails = _mails(n)
+    return _measure(lambda: [
+        parse_nmbs_email(html, HOME_STATION, OFFICE_STATION) for _, _, html in mails
+    ])
+
+
+def bench_state_save(n: int, workdir: Path) -> float:
+    state = synthetic_state(list(_tickets(n)))
+    return _measure(lambda: save_state(state, workdir / "processed.json"))
+
+
+def bench_state_load(n: int, workdir: Path) -> float:
+    path = workdir / "processed.json"
+    save_state(synthetic_state(list(_tickets(n))), path)
+    return _measure(lambda: load_state(path))
+
+
+def bench_state_lookup(n: int, workdir: Path) -> float:
+    """De 'al verwerkt?'-controle per opgehaalde mail, voor n bekende en n nieuwe bestellingen."""
+    state = synthetic_state(list(_tickets(n)))
+    orders = [t.order_number for t in _tickets(n)] + [f"N{i:07d}" for i in range(n)]
+    return _measure(lambda: [is_processed(order, state) for order in orders])
+
+
+def bench_state_mark(n: int, workdir: Path) -> float:
+    """n tickets als verwerkt markeren, inclusief het bijwerken van de maandtotalen."""
+    metadata = synthetic_state(list(_tickets(n)))["metadata"]
+
+    def mark_all() -> None:
+        state = {"processed": [], "skipped_weekend": [], "metadata": {}, "aggregates": {}}
+        for order, meta in metadata.items():
+            mark_processed(order, state, metadata=meta)
+
+    return _measure(mark_all)
+
+
+def bench_calendar(n: int, workdir: Path) -> float:
+    """Werkdagcontrole per ticket, inclusief het opbouwen van de feestdagen en bitmaps."""
+    dates = [t.travel_date for t in _tickets(n)]
+    refresh()
+    configure_calendar(WorkCalendar())
+    return _measure(lambda: [is_work_day(d) for d in dates])
+
+
+def bench_outbox_save(n: int, workdir: Path) -> float:
+    outbox = {t.order_number: t for t in _tickets(n)}
+    return _measure(lambda: save_outbox(outbox, workdir / "outbox.jsonl"))
+
+
+def bench_outbox_load(n: int, workdir: Path) -> float:
+    path = workdir / "outbox.jsonl"
+    save_outbox({t.order_number: t for t in _tickets(n)}, path)
+    return _measure(lambda: load_outbox(path))
+
+
+def bench_excel_write(n: int, workdir: Path) -> float:
+    tickets = list(_tickets(n))
+    return _measure(lambda: build_workbooks(tickets, workdir / "excel"))
+
+
+def bench_excel_scan(n: int, workdir: Path) -> float:
+    excel_dir = workdir / "excel"
+    build_workbooks(list(_tickets(n)), excel_dir)
+    return _measure(lambda: scan_month_files(month_excel_files(excel_dir)))
+
+
+def bench_report(n: int, workdir: Path) -> float:
+    tickets = list(_tickets(n))
+    shots = [workdir / "screenshots" / f"{t.order_number}.png" for t in tickets]
+    return _measure(lambda: generate_html_report(tickets, workdir / "reports", shots))
+
+
+def bench_history_report(n: int, workdir: Path) -> float:
+    excel_dir = workdir / "excel"
+    tickets = list(_tickets(n))
+    build_workbooks(tickets, excel_dir)
+    state = synthetic_state(tickets, excel_dir)
+    return _measure(lambda: generate_history_report(
+        state, excel_dir, workdir / "screenshots", workdir / "reports"
+    ))
+
+
+def bench_gmail_fetch(n: int, workdir: Path) -> float:
+    with GmailStub(_raw_messages(n), **STUB_OPTIONS) as stub:
+        return _measure(lambda: fetch_nmbs_emails(None, None, api_endpoint=stub.endpoint))
+
+
+def bench_sync(n: int, workdir: Path) -> float:
+    """main.sync van begin tot einde: Gmail (stand-in) -> parsen -> review.jsonl."""
+    with GmailStub(_raw_messages(n), **STUB_OPTIONS) as stub:
+        cfg = project_config(workdir, stub.endpoint)
+        # main leest config bij het importeren; zonder config.py neemt het deze
+        sys.modules.setdefault("config", cfg)
+        import main
+        previous, main.config = main.config, cfg
+        try:
+            with open(workdir / "sync.log", "w", encoding="utf-8") as log, redirect_stdout(log):
+                return _measure(main.sync)
+        finally:
+            main.config = previous
+
+
+def bench_verify(n: int, workdir: Path) -> float:
+    """--verify over n tickets: state, read-only scan van alle maandbestanden en screenshotmappen."""
+    excel_dir = workdir / "excel"
+    tickets = list(_tickets(n))
+    build_workbooks(tickets, excel_dir)
+    state = synthetic_state(tickets, excel_dir)
+    return _measure(lambda: verify(state, excel_dir, workdir / "screenshots"))
+
+
+CASES: dict[str, Callable[[int, Path], float]] = {
+    "parse": bench_parse,
+    "state.save": bench_state_save,
+    "state.load": bench_state_load,
+    "state.lookup": bench_state_lookup,
+    "state.mark": bench_state_mark,
+    "kalender": bench_calendar,
+    "outbox.save": bench_outbox_save,
+    "outbox.load": bench_outbox_load,
+    "excel.write": bench_excel_write,
+    "excel.scan": bench_excel_scan,
+    "report": bench_report,
+    "report.history": bench_history_report,
+    "verify": bench_verify,
+    "gmail.fetch": bench_gmail_fetch,
+    "sync": bench_sync,
+}
+
+
+def run_benchmarks(
+    scales: tuple[int, ...],
+    cases: list[str],
+    repeat: int = 3,
+    log: Callable[[str], None] = print,
+) -> dict[str, dict[str, float]]:
+    """Geeft {case: {n: snelste tijd in seconden}} terug (n als string, zoals in JSON)."""
+    results: dict[str, dict[str, float]] = {}
+    for name in cases:
+        for n in scales:
+            best = float("inf")
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory(prefix="nmbs-bench-") as tmp:
+                    best = min(best, CASES[name](n, Path(tmp)))
+            results.setdefault(name, {})[str(n)] = best
+            log(f"  {name:<14} n={n:<6} {best:9.4f} s")
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[tuple[str, str, float, float]]:
+    """Metingen die meer dan threshold keer trager zijn dan de referentie: (case, n, nu, referentie)."""
+    regressions = []
+    for name, by_scale in results.items():
+        for n, seconds in by_scale.items():
+            base = baseline.get(name, {}).get(n)
+            if base is None:
+                continue
+            if seconds > base * threshold and seconds - base >= MIN_REGRESSION_SECONDS:
+                regressions.append((name, n, seconds, base))
+    return regressions
+
+
+def format_results_table(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None = None,
+) -> str:
+    """ASCII-tabel per case en schaal, met tijd per item en (optioneel) de verhouding tot de referentie."""
+    baseline = baseline or {}
+    header = f"| {'Case':<14} | {'n':>6} | {'Tijd (s)':>9} | {'Per item (us)':>13} | {'Referentie':>10} | {'x':>5} |"
+    sep = "+" + "+".join("-" * (w + 2) for w in (14, 6, 9, 13, 10, 5)) + "+"
+    lines = [sep, header, sep]
+    for name, by_scale in results.items():
+        for n, seconds in by_scale.items():
+            per_item = seconds / int(n) * 1e6
+            base = baseline.get(name, {}).get(n)
+            base_text = f"{base:10.4f}" if base is not None else " " * 10
+            ratio_text = f"{seconds / base:5.2f}" if base else " " * 5
+            lines.append(
+                f"| {name:<14} | {n:>6} | {seconds:>9.4f} | {per_item:>13.1f} | {base_text} | {ratio_text} |"
+            )
+    lines.append(sep)
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_results(results: dict[str, dict[str, float]], path: Path) -> None:
+    """Bewaar de metingen met een beschrijving van de machine waarop ze gemaakt zijn."""
+    data = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.run",
+        description="Benchmarks op synthetische NMBS-mailboxen.",
+    )
+    parser.add_argument("--full", action="store_true", help="ook de schaal van 10000 mails")
+    parser.add_argument("--scales", help="komma-gescheiden aantallen, bijv. 10,500")
+    parser.add_argument("--only", help=f"komma-gescheiden cases uit: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="herhalingen per meting (standaard 3)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="referentiebestand")
+    parser.add_argument("--save-baseline", action="store_true", help="bewaar de metingen als referentie")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="factor waarboven een meting een regressie is (standaard 1.25)")
+    parser.add_argument("--gmail-latency", type=float, default=0.0,
+                        help="vertraging per aanvraag aan de Gmail-stand-in, in seconden")
+    parser.add_argument("--gmail-errors", type=float, default=0.0,
+                        help="aandeel aanvragen dat met 503 mislukt (0-1)")
+    parser.add_argument("--out", type=Path, help="schrijf de metingen ook naar dit JSON-bestand")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.scales:
+        scales = tuple(int(s) for s in args.scales.split(","))
+    else:
+        scales = FULL_SCALES if args.full else DEFAULT_SCALES
+    cases = args.only.split(",") if args.only else list(CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        print(f"Onbekende case(s): {', '.join(unknown)}. Kies uit: {', '.join(CASES)}")
+        return 2
+
+    STUB_OPTIONS.update(latency=args.gmail_latency, error_rate=args.gmail_errors)
+    print(f"Benchmarks: {len(cases)} case(s), schalen {', '.join(map(str, scales))}, {args.repeat}x\n")
+    results = run_benchmarks(scales, cases, args.repeat)
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+    print()
+    print(format_results_table(results, baseline))
+
+    if args.out:
+        save_results(results, args.out)
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"\nReferentie opgeslagen: {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"\nGeen referentie gevonden ({args.baseline}); bewaar er een met --save-baseline.")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nGeen regressies (drempel x{args.threshold:.2f}).")
+        return 0
+    print(f"\n{len(regressions)} regressie(s) (drempel x{args.threshold:.2f}):")
+    for name, n, seconds, base in regressions:
+        print(f"  {name} n={n}: {seconds:.4f} s (was {base:.4f} s, x{seconds / base:.2f})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Synthetische NMBS-mails, tickets, state en maandbestanden voor de benchmarks.
+
+De mails zijn de voorbeeldmails uit tests/conftest.py met een ander
+bestelnummer, een andere datum en een andere prijs ingevuld. Alles is
+deterministisch: dezelfde n geeft altijd dezelfde mailbox.
+
+Het reisschema loopt werkdag na werkdag vanaf START_DATE: meestal een heen-
+en een terugrit (twee mails), elke vijfde werkdag één heen-en-terugticket.
+Zo komen er 35 à 45 tickets in een maand, ruim boven de 8 standaardrijen van
+de onkostennota, zodat het schrijven naar Excel vooral overflow-rijen invoegt.
+"""
+from collections.abc import Iterator
+from datetime import date, timedelta
+from email.mime.text import MIMEText
+from pathlib import Path
+from types import SimpleNamespace
+
+from email_parser import TicketData
+from excel_updater import add_tickets_by_month, date_to_excel_serial, excel_path_for_date
+from holidays_be import WorkCalendar
+from screenshot_gen import html_digest
+from state import rebuild_aggregates, trip_key
+from tests.conftest import (
+    SAMPLE_HTML_ROUND_TRIP,
+    SAMPLE_HTML_SINGLE_HEEN,
+    SAMPLE_HTML_SINGLE_TERUG,
+)
+
+START_DATE = date(2010, 1, 1)
+HOME_STATION = "Zottegem"
+OFFICE_STATION = "Antwerpen-Zuid"
+
+# (sjabloon, bestelnummer, datum, prijs) zoals ze in de voorbeeldmail staan
+_TEMPLATES = {
+    "heen/terug": (SAMPLE_HTML_ROUND_TRIP, "UPL1IGGK", "13/02/2026", "28,00"),
+    "heen": (SAMPLE_HTML_SINGLE_HEEN, "ABC12345", "07/01/2026", "14,00"),
+    "terug": (SAMPLE_HTML_SINGLE_TERUG, "XYZ99999", "07/01/2026", "14,00"),
+}
+_PRICES = {"heen/terug": 28.0, "heen": 14.0, "terug": 14.0}
+
+
+def order_number(i: int) -> str:
+    return f"B{i:07d}"
+
+
+def _schedule(n: int) -> Iterator[tuple[int, date, str]]:
+    """(volgnummer, reisdatum, richting) voor de eerste n tickets."""
+    calendar = WorkCalendar()
+    d = START_DATE
+    i = 0
+    workday = 0
+    while i < n:
+        if calendar.is_work_day(d):
+            directions = ("heen/terug",) if workday % 5 == 4 else ("heen", "terug")
+            for direction in directions:
+                if i == n:
+                    return
+                yield i, d, direction
+                i += 1
+            workday += 1
+        d += timedelta(days=1)
+
+
+def _price(i: int, direction: str) -> float:
+    # Een beetje spreiding, zodat totalen niet triviaal zijn
+    return _PRICES[direction] + (i % 3) * 0.5
+
+
+def ticket_html(i: int, travel_date: date, direction: str) -> str:
+    template, order, date_text, price_text = _TEMPLATES[direction]
+    price = f"{_price(i, direction):.2f}".replace(".", ",")
+    return (
+        template.replace(order, order_number(i))
+        .replace(date_text, travel_date.strftime("%d/%m/%Y"))
+        .replace(price_text, price)
+    )
+
+
+def synthetic_mails(n: int) -> list[tuple[str, str, str]]:
+    """n mails in de vorm van fetch_nmbs_emails: (message_id, bestelnummer, html)."""
+    return [
+        (f"msg{i:08x}", order_number(i), ticket_html(i, d, direction))
+        for i, d, direction in _schedule(n)
+    ]
+
+
+def raw_message(i: int, travel_date: date, direction: str) -> bytes:
+    """De mail als RFC 822-bericht, zoals Gmail hem met format="raw" teruggeeft."""
+    msg = MIMEText(ticket_html(i, travel_date, direction), "html", "utf-8")
+    msg["Subject"] = f"{order_number(i)} - NMBS Mobile Ticket"
+    msg["From"] = "no-reply@sales.belgiantrain.be"
+    return msg.as_bytes()
+
+
+def synthetic_raw_messages(n: int) -> list[tuple[str, bytes]]:
+    """n mails als (message_id, RFC 822-bytes)."""
+    return [
+        (f"msg{i:08x}", raw_message(i, d, direction))
+        for i, d, direction in _schedule(n)
+    ]
+
+
+def synthetic_tickets(n: int, with_html: bool = True) -> list[TicketData]:
+    """Dezelfde n tickets, al geparseerd (zonder HTML als with_html=False)."""
+    stations = {
+        "heen": (HOME_STATION, OFFICE_STATION),
+        "terug": (OFFICE_STATION, HOME_STATION),
+        "heen/terug": (HOME_STATION, OFFICE_STATION),
+    }
+    return [
+        TicketData(
+            order_number=order_number(i),
+            from_station=stations[direction][0],
+            to_station=stations[direction][1],
+            direction=direction,
+            travel_date=d,
+            price=_price(i, direction),
+            email_html=ticket_html(i, d, direction) if with_html else "",
+        )
+        for i, d, direction in _schedule(n)
+    ]
+
+
+def synthetic_state(tickets: list[TicketData], excel_dir: Path = Path(".")) -> dict:
+    """State zoals main hem opbouwt nadat alle tickets verwerkt zijn, met metadata en maandtotalen."""
+    state: dict = {"processed": [], "skipped_weekend": [], "metadata": {}}
+    for t in tickets:
+        state["processed"].append(t.order_number)
+        state["metadata"][t.order_number] = {
+            "filename": excel_path_for_date(excel_dir, t.travel_date).name,
+            "travel_date_serial": date_to_excel_serial(t.travel_date),
+            "description": f"Trein {t.from_station} - {t.to_station} {t.direction}",
+            "html_sha256": html_digest(t.email_html),
+            "price": t.price,
+            "direction": t.direction,
+            "trip": trip_key(t.travel_date, t.from_station, t.to_station, t.price),
+        }
+    rebuild_aggregates(state)
+    return state
+
+
+def build_workbooks(tickets: list[TicketData], excel_dir: Path) -> list[Path]:
+    """Schrijf de tickets naar maandbestanden via de echte schrijfroute (met overflow)."""
+    results = add_tickets_by_month(tickets, excel_dir)
+    failed = {path: exc for path, exc in results.items() if exc is not None}
+    if failed:
+        raise OSError(f"Maandbestanden niet geschreven: {failed}")
+    return sorted(results)
+
+
+def project_config(workdir: Path, endpoint: str | None = None) -> SimpleNamespace:
+    """Een config zoals config.example.py, maar met alles in workdir en Gmail op endpoint."""
+    return SimpleNamespace(
+        EXCEL_DIR=workdir / "data",
+        SCREENSHOTS_DIR=workdir / "screenshots",
+        REPORTS_DIR=None,
+        HOME_STATION=HOME_STATION,
+        OFFICE_STATION=OFFICE_STATION,
+        EXTRA_DAYS_OFF={},
+        FORCED_WORK_DAYS=[],
+        GMAIL_API_ENDPOINT=endpoint,
+        CLIENT_SECRET_PATH=workdir / "credentials" / "client_secret.json",
+        TOKEN_PATH=workdir / "credentials" / "token.json",
+        STATE_FILE=workdir / "processed.json",
+    )
@@ -23,16 +23,62 @@ EXCEL_DIR = BASE_DIR / "data"
 # Subfolders (bijv. "Februari 2026") worden automatisch aangemaakt.
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
 
+# Formaat van de screenshots: "png" (verliesloos), "jpeg" of "webp" (veel kleiner).
+# SCREENSHOT_QUALITY (1-100) geldt alleen voor jpeg/webp.
+# Met SCREENSHOT_CROP = True wordt de witruimte onder de e-mail weggeknipt.
+SCREENSHOT_FORMAT = "png"
+SCREENSHOT_QUALITY = 80
+SCREENSHOT_CROP = True
+
 # Map waar HTML-rapporten worden opgeslagen (optioneel).
 # Verwijder de regel of zet op None om HTML-rapporten uit te schakelen.
 REPORTS_DIR = BASE_DIR / "reports"
 
+# Naam die in nieuwe maandbestanden (cel B4) komt.
+EMPLOYEE_NAME = "Stijn Van der Spiegel"
+
 # Thuisstation en kantoorstation — gebruikt om heen/terug-richting te bepalen
 # bij enkelvoudige tickets (Enkel). Gebruik dezelfde schrijfwijze als NMBS
 # (title-case, koppelteken waar van toepassing, bijv. "Antwerpen-Zuid").
 HOME_STATION = "Zottegem"
 OFFICE_STATION = "Antwerpen-Zuid"
 
+# Extra vrije dagen bovenop weekends en Belgische feestdagen (brugdagen,
+# verlof, ...). Een dag als "JJJJ-MM-DD", een periode als ("begin", "einde").
+# Tickets op deze dagen worden, net als weekendtickets, eerst nagevraagd.
+EXTRA_DAYS_OFF = {
+    # "2026-05-15": "brugdag",
+    # ("2026-07-20", "2026-08-07"): "zomerverlof",
+}
+
+# Dagen waarop je toch gewerkt hebt (bijv. een zaterdag of een feestdag).
+# Tickets op deze dagen worden als gewone werkdag behandeld.
+FORCED_WORK_DAYS = [
+    # "2026-11-11",
+]
+
+# Hoe vaak --watch naar nieuwe mails kijkt, in seconden.
+WATCH_INTERVAL = 300
+
+# Meerdere collega's (elk met een eigen Gmail-account) in één installatie.
+# Elk profiel overschrijft de instellingen hierboven; token.json,
+# processed.json, data/, screenshots/ en reports/ komen standaard per profiel
+# in profiles/<naam>/. Zonder --user verwerkt main.py alle profielen na
+# elkaar (de mails worden voor iedereen tegelijk opgehaald); met
+# --user <naam> enkel dat profiel. Leeg laten voor één gebruiker.
+PROFILES = {
+    # "stijn": {"EMPLOYEE_NAME": "Stijn Van der Spiegel"},
+    # "an": {
+    #     "EMPLOYEE_NAME": "An Peeters",
+    #     "HOME_STATION": "Gent-Sint-Pieters",
+    #     "OFFICE_STATION": "Brussel-Centraal",
+    # },
+}
+
+# Alleen voor tests en benchmarks: een lokale Gmail-stand-in in plaats van
+# Gmail zelf, bijv. "http://127.0.0.1:8765/" (zie bench/gmail_stub.py).
+GMAIL_API_ENDPOINT = None
+
 # ---------------------------------------------------------------
 # Niet aanpassen — automatisch ingesteld
 # ---------------------------------------------------------------
@@ -0,0 +1,249 @@
+"""
+Cumulatief dashboard over alle runs: reports/dashboard/index.html.
+
+Elke run voegt zijn tickets toe aan het dashboard in plaats van enkel een
+los run_<tijdstip>.html te maken. Per maand worden bewaard:
+
+  months/JJJJ-MM.json   de tickets van die maand (bron voor het fragment)
+  months/JJJJ-MM.html   de gerenderde tabelrijen van die maand
+
+Alleen de maanden waarin deze run tickets toevoegde (of die expliciet
+vernieuwd worden, bijv. na --verify --repair), worden opnieuw gelezen en
+gerenderd; index.html wordt daarna samengesteld uit de maandtotalen in de
+state (state.month_aggregates) en de bestaande fragmenten, zonder de andere
+maanden opnieuw op te bouwen. Een aparte kopie van de totalen is er niet,
+dus het dashboard kan daar niet van de state afwijken. Met Pillow krijgt
+elke screenshot een kleine miniatuur
+(thumbs/<bestelnummer>.jpg); zonder Pillow toont het dashboard de screenshot
+zelf, verkleind.
+"""
+import html
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+
+from constants import DUTCH_MONTHS
+from email_parser import TicketData
+from report_gen import relative_href
+from state import month_aggregates
+
+DASHBOARD_DIRNAME = "dashboard"
+THUMBNAIL_WIDTH = 160
+
+_INDEX_HEAD = """<!DOCTYPE html>
+<html lang="nl">
+<head>
+<meta charset="utf-8">
+<title>NMBS Onkostennota - dashboard</title>
+<style>
+  body { font-family: Arial, sans-serif; margin: 20px; }
+  table { border-collapse: collapse; width: 100%; max-width: 900px; margin-bottom: 24px; }
+  th, td { border: 1px solid #ccc; padding: 6px 8px; vertical-align: middle; }
+  th { background: #f0f0f0; text-align: left; }
+  td.num { text-align: right; }
+  img.thumb { width: 160px; border: 1px solid #ddd; }
+</style>
+</head>
+<body>
+<h1>NMBS Onkostennota - dashboard</h1>
+"""
+_OVERVIEW_HEAD = (
+    "<p>Bijgewerkt: {updated}</p>\n<table>\n<thead><tr><th>Maand</th><th>Tickets</th>"
+    "<th>Totaal (EUR)</th><th>Van</th><th>Tot</th></tr></thead>\n<tbody>\n"
+).format
+_OVERVIEW_ROW = (
+    '<tr><td><a href="#m{key}">{label}</a></td><td class="num">{count}</td>'
+    '<td class="num">{total}</td><td>{first}</td><td>{last}</td></tr>\n'
+).format
+_OVERVIEW_FOOT = (
+    '</tbody>\n<tfoot><tr><th>Totaal</th><th class="num">{count}</th>'
+    '<th class="num">{total}</th><th></th><th></th></tr></tfoot>\n</table>\n'
+).format
+_INDEX_FOOT = "</body>\n</html>\n"
+
+_SECTION_HEAD = (
+    '<section id="m{key}">\n<h2>{label}</h2>\n<p>{count} ticket(s), totaal EUR {total}</p>\n'
+    "<table>\n<thead><tr><th>Datum</th><th>Omschrijving</th><th>Bedrag (EUR)</th>"
+    "<th>Screenshot</th></tr></thead>\n<tbody>\n"
+).format
+_SECTION_ROW = (
+    '<tr><td>{datum}</td><td>{description}</td><td class="num">{price}</td><td>{shot}</td></tr>\n'
+).format
+_SECTION_FOOT = "</tbody>\n</table>\n</section>\n"
+_THUMB = '<a href="{href}"><img class="thumb" src="{src}" alt="{alt}" loading="lazy"></a>'.format
+
+
+@dataclass
+class DashboardUpdate:
+    index: Path
+    changed_months: list[str]     # JJJJ-MM van de opnieuw gerenderde maanden
+    added: int                    # aantal nieuwe tickets (al gekende tellen niet)
+
+
+def dashboard_dir(reports_dir: Path) -> Path:
+    return reports_dir / DASHBOARD_DIRNAME
+
+
+def month_key(d: date) -> str:
+    return f"{d.year}-{d.month:02d}"
+
+
+def _month_label(key: str) -> str:
+    year, month = key.split("-")
+    return f"{DUTCH_MONTHS[int(month)]} {year}"
+
+
+def _load_json(path: Path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _thumbnail(screenshot: Path, thumbs_dir: Path, order: str) -> Path:
+    """Kleine JPEG van de screenshot als Pillow beschikbaar is; anders de screenshot zelf."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return screenshot
+    thumb = thumbs_dir / f"{order}.jpg"
+    if thumb.exists():
+        return thumb
+    try:
+        with Image.open(screenshot) as img:
+            img = img.convert("RGB")
+            img.thumbnail((THUMBNAIL_WIDTH * 2, THUMBNAIL_WIDTH * 6))
+            thumbs_dir.mkdir(parents=True, exist_ok=True)
+            img.save(thumb, format="JPEG", quality=70)
+    except OSError:
+        return screenshot  # best effort: de screenshot zelf werkt ook
+    return thumb
+
+
+def _render_rows(rows: list[dict], base_dir: Path) -> str:
+    parts = []
+    for row in rows:
+        shot = ""
+        if row.get("screenshot"):
+            screenshot = Path(row["screenshot"])
+            thumb = Path(row.get("thumbnail") or screenshot)
+            shot = _THUMB(
+                href=html.escape(relative_href(screenshot, base_dir)),
+                src=html.escape(relative_href(thumb, base_dir)),
+                alt=html.escape(screenshot.name),
+            )
+        parts.append(_SECTION_ROW(
+            datum=date.fromisoformat(row["date"]).strftime("%d/%m/%Y"),
+            description=html.escape(row["description"]),
+            price=f"{row['price']:.2f}",
+            shot=shot,
+        ))
+    return "".join(parts)
+
+
+def _write_index(directory: Path, aggregates: dict[str, dict]) -> Path:
+    """
+    Stel index.html samen uit de maandtotalen van de state en de bestaande
+    fragmenten, nieuwste maand eerst.
+    """
+    index = directory / "index.html"
+    keys = sorted(aggregates, reverse=True)
+    tmp = index.with_suffix(".html.tmp")
+    with open(tmp, "w", encoding="utf-8") as out:
+        out.write(_INDEX_HEAD)
+        out.write(_OVERVIEW_HEAD(updated=datetime.now().strftime("%d/%m/%Y %H:%M:%S")))
+        for key in keys:
+            agg = aggregates[key]
+            out.write(_OVERVIEW_ROW(
+                key=key, label=html.escape(_month_label(key)), count=agg["count"],
+                total=f"{agg['vervoer']:.2f}",
+                first=date.fromisoformat(agg["first"]).strftime("%d/%m/%Y"),
+                last=date.fromisoformat(agg["last"]).strftime("%d/%m/%Y"),
+            ))
+        out.write(_OVERVIEW_FOOT(
+            count=sum(a["count"] for a in aggregates.values()),
+            total=f"{sum(a['vervoer'] for a in aggregates.values()):.2f}",
+        ))
+        for key in keys:
+            agg = aggregates[key]
+            out.write(_SECTION_HEAD(
+                key=key, label=html.escape(_month_label(key)),
+                count=agg["count"], total=f"{agg['vervoer']:.2f}",
+            ))
+            fragment = directory / "months" / f"{key}.html"
+            if fragment.exists():
+                out.write(fragment.read_text(encoding="utf-8"))
+            out.write(_SECTION_FOOT)
+        out.write(_INDEX_FOOT)
+    os.replace(tmp, index)
+    return index
+
+
+def update_dashboard(
+    tickets: list[TicketData],
+    screenshot_paths: list[Path | None] | None,
+    reports_dir: Path,
+    state: dict,
+    refresh: Iterable[str] = (),
+) -> DashboardUpdate:
+    """
+    Voeg de tickets van deze run toe aan het dashboard en werk index.html bij.
+
+    screenshot_paths hoort (zoals bij generate_html_report) in dezelfde
+    volgorde als tickets. Tickets die al in het dashboard staan, worden
+    overgeslagen. Alleen de maanden met nieuwe tickets en de maanden in
+    refresh (JJJJ-MM) worden opnieuw gerenderd; daarbij vallen tickets weg die
+    niet meer verwerkt zijn in de state. De totalen komen uit de state.
+    """
+    directory = dashboard_dir(reports_dir)
+    months_dir = directory / "months"
+    months_dir.mkdir(parents=True, exist_ok=True)
+    processed = set(state.get("processed", []))
+
+    shots = screenshot_paths or []
+    by_month: dict[str, list[tuple[TicketData, Path | None]]] = {key: [] for key in refresh}
+    for i, ticket in enumerate(tickets):
+        shot = shots[i] if i < len(shots) else None
+        by_month.setdefault(month_key(ticket.travel_date), []).append((ticket, shot))
+
+    changed: list[str] = []
+    added = 0
+    for key, entries in sorted(by_month.items()):
+        rows_path = months_dir / f"{key}.json"
+        rows: list[dict] = _load_json(rows_path, [])
+        known = {row["order"] for row in rows}
+        new = [(t, s) for t, s in entries if t.order_number not in known]
+        kept = [row for row in rows if row["order"] in processed]
+        if not new and len(kept) == len(rows):
+            continue
+        rows = kept
+        for ticket, shot in new:
+            rows.append({
+                "order": ticket.order_number,
+                "date": ticket.travel_date.isoformat(),
+                "description": f"Trein {ticket.from_station} - {ticket.to_station} {ticket.direction}",
+                "price": ticket.price,
+                "screenshot": str(shot) if shot else None,
+                "thumbnail": (
+                    str(_thumbnail(shot, directory / "thumbs", ticket.order_number)) if shot else None
+                ),
+            })
+        rows.sort(key=lambda r: (r["date"], r["order"]))
+        _write_atomic(rows_path, json.dumps(rows, indent=1, ensure_ascii=False))
+        _write_atomic(months_dir / f"{key}.html", _render_rows(rows, directory))
+        changed.append(key)
+        added += len(new)
+
+    # Altijd opnieuw samenstellen: enkel aaneenrijgen, en zo volgen de totalen de state
+    index = _write_index(directory, month_aggregates(state))
+    return DashboardUpdate(index, changed, added)
@@ -6,7 +6,7 @@ import re
 from dataclasses import dataclass
 from datetime import date
 
-from bs4 import BeautifulSoup
+from profiling import stage
 
 
 @dataclass
@@ -20,6 +20,32 @@ class TicketData:
     email_html: str     # originele HTML, bewaard voor de screenshot
 
 
+def ticket_to_dict(ticket: TicketData) -> dict:
+    """Zet een TicketData om naar een JSON-serialiseerbaar dict."""
+    return {
+        "order_number": ticket.order_number,
+        "from_station": ticket.from_station,
+        "to_station": ticket.to_station,
+        "direction": ticket.direction,
+        "travel_date": ticket.travel_date.isoformat(),
+        "price": ticket.price,
+        "email_html": ticket.email_html,
+    }
+
+
+def ticket_from_dict(data: dict) -> TicketData:
+    """Omgekeerde van ticket_to_dict."""
+    return TicketData(
+        order_number=data["order_number"],
+        from_station=data["from_station"],
+        to_station=data["to_station"],
+        direction=data["direction"],
+        travel_date=date.fromisoformat(data["travel_date"]),
+        price=float(data["price"]),
+        email_html=data.get("email_html", ""),
+    )
+
+
 class ParseError(Exception):
     """Wordt gegeven als de e-mail niet de verwachte structuur heeft."""
 
@@ -67,8 +93,11 @@ def parse_nmbs_email(
       - "2e klas, Enkel"         → direction="heen" of "terug" afhankelijk van
                                    welke datum aanwezig is
     """
-    soup = BeautifulSoup(html, "lxml")
-    full_text = soup.get_text(" ", strip=True)
+    from bs4 import BeautifulSoup  # pas hier: --review werkt met bewaarde tickets
+
+    with stage("parse.html", len(html)):
+        soup = BeautifulSoup(html, "lxml")
+        full_text = soup.get_text(" ", strip=True)
 
     # --- Bestelnummer ---
     order_match = re.search(r"Bestelnummer:\s*([A-Z0-9]+)", full_text)
@@ -0,0 +1,20 @@
+"""
+Omzetting tussen Python-datums en Excel-seriële getallen.
+
+Apart van excel_updater, zodat de state, de rapporten en de PDF-bundel met
+reisdagen uit de metadata kunnen rekenen zonder de Excel-schrijver te laden.
+"""
+from datetime import date, timedelta
+
+# Dag 0 van Excel (met de schrikkeldagfout van 1900 ingerekend)
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def date_to_excel_serial(d: date) -> int:
+    """Zet een Python-datum om naar een Excel-serieel getal."""
+    return (d - EXCEL_EPOCH).days
+
+
+def excel_serial_to_date(serial: int) -> date:
+    """Zet een Excel-serieel getal terug om naar een Python-datum."""
+    return EXCEL_EPOCH + timedelta(days=serial)
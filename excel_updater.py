@@ -6,15 +6,15 @@ Als het bestand nog niet bestaat, wordt het automatisch aangemaakt.
 """
 import calendar
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
 
-import openpyxl
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-
 from constants import DUTCH_MONTHS
 from email_parser import TicketData
+from excel_dates import date_to_excel_serial, excel_serial_to_date
+from profiling import stage
 
 # Rijen waar de data in staan (inclusief)
 DATA_START_ROW = 8
@@ -29,18 +29,12 @@ COL_VERVOER = 6      # F
 COL_TOTAAL = 12      # L
 
 
+# Naam in B4 van nieuwe maandbestanden, tenzij config.EMPLOYEE_NAME (of het profiel) iets anders zegt
+DEFAULT_EMPLOYEE_NAME = "Stijn Van der Spiegel"
+
 # Stijlen
 DATE_FORMAT = "DD/MM/YYYY"
 EUR_FORMAT = '#,##0.00'
-THIN_SIDE = Side(style="thin")
-THIN_BORDER = Border(
-    left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE,
-)
-HEADER_FILL = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-HEADER_FONT = Font(bold=True)
-TOTAAL_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-TOTAAL_FONT = Font(bold=True, color="FFFFFF")
-BOLD_FONT = Font(bold=True)
 
 # Kolombreedtes (1-gebaseerd index -> breedte)
 COLUMN_WIDTHS = {
@@ -64,6 +58,17 @@ def _apply_styles(ws) -> None:
 
     Detecteert automatisch de laatste gevulde datarij.
     """
+    # openpyxl pas hier laden: --review, --summary enz. starten zonder
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    thin_side = Side(style="thin")
+    thin_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+    header_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+    totaal_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    totaal_font = Font(bold=True, color="FFFFFF")
+    bold_font = Font(bold=True)
+
     # Detecteer laatste datarij
     last_data_row = DATA_START_ROW - 1
     for row in range(DATA_START_ROW, DATA_START_ROW + 50):
@@ -78,7 +83,7 @@ def _apply_styles(ws) -> None:
 
     # Naam/Maand labels (rij 4-5, kolom A) vetgedrukt
     for row in (4, 5):
-        ws.cell(row=row, column=1).font = BOLD_FONT
+        ws.cell(row=row, column=1).font = bold_font
 
     # Van/Tot datums (K4, K5) — datumformaat
     ws["K4"].number_format = DATE_FORMAT
@@ -87,16 +92,16 @@ def _apply_styles(ws) -> None:
     # Kolomkoppen (rij 7) — vetgedrukt, grijze achtergrond, rand
     for col in range(1, COL_TOTAAL + 1):
         cell = ws.cell(row=7, column=col)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.border = THIN_BORDER
+        cell.font = bold_font
+        cell.fill = header_fill
+        cell.border = thin_border
         cell.alignment = Alignment(horizontal="center")
 
     # Datarijen — randen, datumformaat kolom A, EUR-formaat kolommen E-L
     for row in range(DATA_START_ROW, last_data_row + 1):
         for col in range(1, COL_TOTAAL + 1):
             cell = ws.cell(row=row, column=col)
-            cell.border = THIN_BORDER
+            cell.border = thin_border
             if col == COL_DATUM:
                 cell.number_format = DATE_FORMAT
             elif col >= 5:  # E t/m L: bedragen
@@ -109,20 +114,20 @@ def _apply_styles(ws) -> None:
             # Subtotaal-rij: bovenrand, vetgedrukt
             for col in range(1, COL_TOTAAL + 1):
                 cell = ws.cell(row=row, column=col)
-                cell.border = Border(top=THIN_SIDE)
-            ws.cell(row=row, column=11).font = BOLD_FONT
-            ws.cell(row=row, column=12).font = BOLD_FONT
+                cell.border = Border(top=thin_side)
+            ws.cell(row=row, column=11).font = bold_font
+            ws.cell(row=row, column=12).font = bold_font
             ws.cell(row=row, column=12).number_format = EUR_FORMAT
         elif k_val == "TOTAAL":
             # TOTAAL-rij: blauwe achtergrond, witte tekst, vetgedrukt
             for col in range(1, COL_TOTAAL + 1):
                 cell = ws.cell(row=row, column=col)
-                cell.fill = TOTAAL_FILL
-                cell.font = TOTAAL_FONT
-                cell.border = THIN_BORDER
+                cell.fill = totaal_fill
+                cell.font = totaal_font
+                cell.border = thin_border
             ws.cell(row=row, column=12).number_format = EUR_FORMAT
         elif k_val == "Voorschotten":
-            ws.cell(row=row, column=11).font = BOLD_FONT
+            ws.cell(row=row, column=11).font = bold_font
             ws.cell(row=row, column=12).number_format = EUR_FORMAT
 
 
@@ -135,10 +140,25 @@ def excel_path_for_date(excel_dir: Path, d: date) -> Path:
     return excel_dir / f"Onkosten_{DUTCH_MONTHS[d.month]}_{d.year}.xlsx"
 
 
-def date_to_excel_serial(d: date) -> int:
-    """Zet een Python-datum om naar een Excel-serieel getal."""
-    delta = d - date(1899, 12, 30)
-    return delta.days
+def is_excel_locked(excel_path: Path) -> bool:
+    """
+    Controleert of een maandbestand open staat in Excel.
+
+    Excel maakt naast een geopend bestand een eigenaarsbestand aan
+    (~$Onkosten_Januari_2026.xlsx) en vergrendelt het bestand zelf op Windows.
+    Een bestand dat nog niet bestaat is nooit vergrendeld.
+    """
+    if not excel_path.exists():
+        return False
+    owner_names = (f"~${excel_path.name}", f"~${excel_path.name[2:]}")
+    if any((excel_path.parent / name).exists() for name in owner_names):
+        return True
+    try:
+        with open(excel_path, "r+b"):
+            pass
+    except PermissionError:
+        return True
+    return False
 
 
 def _to_datetime(d: date) -> datetime:
@@ -160,6 +180,13 @@ def _dates_match(cell_value, serial: int) -> bool:
     return False
 
 
+def _cell_to_date(value) -> date:
+    """Zet een datumcelwaarde (int of datetime) om naar een Python-datum."""
+    if isinstance(value, datetime):
+        return value.date()
+    return excel_serial_to_date(value)
+
+
 def _find_next_data_row(ws) -> int:
     """Geeft het rijnummer van de eerste lege rij in het datablok.
 
@@ -182,6 +209,8 @@ def _insert_overflow_row(ws, insert_at: int) -> None:
     Voegt een lege rij in voor `insert_at` en werkt de SOM-formules bij
     in het samenvattingsgedeelte zodat de nieuwe rij meegeteld wordt.
     """
+    from openpyxl.utils import get_column_letter
+
     ws.insert_rows(insert_at)
 
     # Stel de L-formule in voor de nieuw ingevoegde rij
@@ -208,11 +237,15 @@ def _insert_overflow_row(ws, insert_at: int) -> None:
                 )
 
 
-def _create_month_excel(excel_path: Path, d: date) -> None:
+def _create_month_excel(
+    excel_path: Path, d: date, employee_name: str = DEFAULT_EMPLOYEE_NAME
+) -> None:
     """
     Maak een nieuw per-maand Excel-bestand met de standaardstructuur.
     Het bestand bevat precies een werkblad met de juiste maandnaam.
     """
+    import openpyxl
+
     sheet_name = sheet_name_for_date(d)
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -220,7 +253,7 @@ def _create_month_excel(excel_path: Path, d: date) -> None:
 
     # Koptekst
     ws["A4"] = "Naam"
-    ws["B4"] = "Stijn Van der Spiegel"
+    ws["B4"] = employee_name
     ws["A5"] = "Maand"
     ws["B5"] = f" {sheet_name}"
     ws["J4"] = "Van"
@@ -267,6 +300,9 @@ def remove_ticket_from_excel(
     Geeft True terug als de rij gevonden en verwijderd is, anders False.
     Gooit een OSError als het bestand vergrendeld is (bijv. open in Excel).
     """
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+
     if not excel_path.exists():
         print(f"  Waarschuwing: bestand '{excel_path.name}' niet gevonden.")
         return False
@@ -350,27 +386,8 @@ def remove_ticket_from_excel(
     return True
 
 
-def add_ticket_to_excel(ticket: TicketData, excel_dir: Path) -> Path:
-    """
-    Voegt het ticket als nieuwe rij toe aan het juiste per-maand Excel-bestand.
-    Maakt het bestand automatisch aan als het nog niet bestaat.
-    Geeft het pad naar het bijgewerkte bestand terug.
-    Gooit een OSError als het bestand vergrendeld is (bijv. open in Excel).
-    """
-    excel_path = excel_path_for_date(excel_dir, ticket.travel_date)
-
-    if not excel_path.exists():
-        _create_month_excel(excel_path, ticket.travel_date)
-
-    try:
-        wb = openpyxl.load_workbook(excel_path)
-    except PermissionError:
-        raise OSError(
-            f"Het Excel-bestand is vergrendeld. Sluit het eerst in Excel: {excel_path}"
-        )
-
-    ws = wb.active
-
+def _write_ticket_row(ws, ticket: TicketData) -> None:
+    """Schrijf een ticket in de eerstvolgende vrije datarij van het werkblad."""
     next_row = _find_next_data_row(ws)
 
     if next_row > DATA_END_ROW:
@@ -396,11 +413,178 @@ def add_ticket_to_excel(ticket: TicketData, excel_dir: Path) -> Path:
             f"=SUM(E{next_row}:K{next_row})"
         )
 
-    _apply_styles(ws)
+
+def add_tickets_to_excel(
+    tickets: list[TicketData], excel_dir: Path, employee_name: str = DEFAULT_EMPLOYEE_NAME
+) -> Path:
+    """
+    Voegt meerdere tickets van dezelfde maand toe met een enkele load/save.
+    Maakt het bestand automatisch aan als het nog niet bestaat (met
+    employee_name als naam).
+    Geeft het pad naar het bijgewerkte bestand terug.
+    Gooit een OSError als het bestand vergrendeld is (bijv. open in Excel).
+    """
+    import openpyxl
+
+    if not tickets:
+        raise ValueError("Geen tickets om toe te voegen.")
+    excel_path = excel_path_for_date(excel_dir, tickets[0].travel_date)
+    if any(excel_path_for_date(excel_dir, t.travel_date) != excel_path for t in tickets):
+        raise ValueError("Alle tickets moeten in dezelfde maand vallen.")
+
+    if not excel_path.exists():
+        _create_month_excel(excel_path, tickets[0].travel_date, employee_name)
+
     try:
-        wb.save(excel_path)
+        with stage("excel.load", excel_path.stat().st_size):
+            wb = openpyxl.load_workbook(excel_path)
+    except PermissionError:
+        raise OSError(
+            f"Het Excel-bestand is vergrendeld. Sluit het eerst in Excel: {excel_path}"
+        )
+
+    ws = wb.active
+    with stage("excel.write_rows"):
+        for ticket in tickets:
+            _write_ticket_row(ws, ticket)
+        _apply_styles(ws)
+    try:
+        with stage("excel.save") as span:
+            wb.save(excel_path)
+            span.bytes = excel_path.stat().st_size
     except PermissionError:
         raise OSError(
             f"Het Excel-bestand is vergrendeld. Sluit het eerst in Excel: {excel_path}"
         )
     return excel_path
+
+
+def add_ticket_to_excel(
+    ticket: TicketData, excel_dir: Path, employee_name: str = DEFAULT_EMPLOYEE_NAME
+) -> Path:
+    """
+    Voegt het ticket als nieuwe rij toe aan het juiste per-maand Excel-bestand.
+    Maakt het bestand automatisch aan als het nog niet bestaat.
+    Geeft het pad naar het bijgewerkte bestand terug.
+    Gooit een OSError als het bestand vergrendeld is (bijv. open in Excel).
+    """
+    return add_tickets_to_excel([ticket], excel_dir, employee_name)
+
+
+def group_tickets_by_file(
+    tickets: list[TicketData], excel_dir: Path
+) -> dict[Path, list[TicketData]]:
+    """Groepeer tickets per maandbestand, met behoud van volgorde binnen elke maand."""
+    groups: dict[Path, list[TicketData]] = {}
+    for ticket in tickets:
+        groups.setdefault(excel_path_for_date(excel_dir, ticket.travel_date), []).append(ticket)
+    return groups
+
+
+def add_tickets_by_month(
+    tickets: list[TicketData],
+    excel_dir: Path,
+    max_workers: int = 4,
+    employee_name: str = DEFAULT_EMPLOYEE_NAME,
+) -> dict[Path, Exception | None]:
+    """
+    Schrijf tickets weg naar hun maandbestanden, elk bestand in een eigen thread.
+
+    Elke maand is een apart bestand, dus de load/wijzig/save-reeksen zijn
+    onafhankelijk. Geeft per bestand None (gelukt) of de fout terug (bijv. een
+    OSError als het vergrendeld is, of een fout van openpyxl bij een beschadigd
+    bestand), zodat een mislukte maand de andere niet blokkeert.
+    """
+    groups = group_tickets_by_file(tickets, excel_dir)
+    if not groups:
+        return {}
+
+    results: dict[Path, Exception | None] = {}
+    workers = max(1, min(max_workers, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            path: pool.submit(add_tickets_to_excel, group, excel_dir, employee_name)
+            for path, group in groups.items()
+        }
+        for path, future in futures.items():
+            try:
+                future.result()
+                results[path] = None
+            except Exception as exc:  # vergrendeld of beschadigd: enkel deze maand
+                results[path] = exc
+    return results
+
+
+@dataclass
+class ExcelRow:
+    """Een ingevulde datarij uit een maandbestand."""
+    travel_date: date
+    nr: int | None
+    description: str | None
+    amount: float | None  # kolom F (Vervoer)
+
+
+def month_excel_files(excel_dir: Path) -> list[Path]:
+    """Geeft alle per-maand Excel-bestanden in excel_dir, gesorteerd op naam.
+
+    Excel-vergrendelingsbestanden (~$Onkosten_...) worden genegeerd.
+    """
+    if not excel_dir.exists():
+        return []
+    return sorted(
+        p for p in excel_dir.glob("Onkosten_*_*.xlsx") if not p.name.startswith("~$")
+    )
+
+
+def scan_month_rows(excel_path: Path) -> list[ExcelRow]:
+    """
+    Lees de datarijen van een maandbestand zonder het bewerkbare model op te bouwen.
+
+    Gebruikt openpyxl in read-only modus: geen stijlen, geen celobjecten,
+    alleen de waarden van kolommen A t/m F. Bedoeld voor controles,
+    rapporten en duplicaatdetectie over veel maandbestanden tegelijk.
+    Gooit een OSError als het bestand vergrendeld is.
+    """
+    import openpyxl
+
+    try:
+        with stage("excel.scan", excel_path.stat().st_size):
+            wb = openpyxl.load_workbook(excel_path, read_only=True)
+    except PermissionError:
+        raise OSError(
+            f"Het Excel-bestand is vergrendeld. Sluit het eerst in Excel: {excel_path}"
+        )
+
+    rows = []
+    try:
+        ws = wb.active
+        for values in ws.iter_rows(
+            min_row=DATA_START_ROW,
+            max_row=DATA_START_ROW + 49,
+            max_col=COL_VERVOER,
+            values_only=True,
+        ):
+            # Lege rijen aan het einde van het blad worden soms ingekort
+            values = tuple(values) + (None,) * (COL_VERVOER - len(values))
+            datum = values[COL_DATUM - 1]
+            if not _is_date_cell(datum):
+                continue
+            amount = values[COL_VERVOER - 1]
+            rows.append(
+                ExcelRow(
+                    travel_date=_cell_to_date(datum),
+                    nr=values[COL_NR - 1],
+                    description=values[COL_OMSCHRIJVING - 1],
+                    amount=float(amount) if isinstance(amount, (int, float)) else None,
+                )
+            )
+    finally:
+        wb.close()
+    return rows
+
+
+def scan_month_files(excel_paths) -> dict[Path, list[ExcelRow]]:
+    """Scan meerdere maandbestanden. Ontbrekende bestanden worden overgeslagen."""
+    return {
+        path: scan_month_rows(path) for path in excel_paths if path.exists()
+    }
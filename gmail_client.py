@@ -7,25 +7,54 @@ import email as email_lib
 import os
 import re
 import sys
+import threading
+from collections.abc import Collection
 from pathlib import Path
 
+import httplib2
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from profiling import stage
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 GMAIL_QUERY = (
     'from:no-reply@sales.belgiantrain.be subject:"NMBS Mobile Ticket" newer_than:2y'
 )
+# Aantal herhalingen bij 429/5xx-antwoorden, met exponentieel oplopende wachttijd
+GMAIL_RETRIES = 3
+# Fouten die voorbijgaan (netwerk weg, time-out, 5xx na de herhalingen):
+# --watch meldt ze en probeert het later opnieuw in plaats van te stoppen
+TRANSIENT_ERRORS = (HttpError, httplib2.HttpLib2Error, OSError)
+# Eén aanmelding tegelijk: profielen die samen ophalen (main.prefetch_emails)
+# mogen niet tegelijk een token verversen of een browservenster openen
+_auth_lock = threading.Lock()
 
 
-def get_gmail_service(client_secret_path: Path, token_path: Path):
+def get_gmail_service(
+    client_secret_path: Path, token_path: Path, api_endpoint: str | None = None
+):
     """
     Bouw een geauthenticeerde Gmail API-service.
     Bij de eerste keer opent er een browservenster voor de OAuth-toestemming.
+    Met api_endpoint wordt een andere server gebruikt (zie local_gmail_service).
     """
+    if api_endpoint:
+        return local_gmail_service(api_endpoint)
+
+    with _auth_lock:
+        creds = _credentials(client_secret_path, token_path)
+
+    with stage("gmail.build"):
+        return build("gmail", "v1", credentials=creds)
+
+
+def _credentials(client_secret_path: Path, token_path: Path) -> Credentials:
+    """Laad token.json, ververs het of meld opnieuw aan via de browser."""
     creds = None
 
     if token_path.exists():
@@ -67,8 +96,23 @@ def get_gmail_service(client_secret_path: Path, token_path: Path):
             )
         else:
             os.chmod(token_path, 0o600)
+    return creds
+
+
+def local_gmail_service(api_endpoint: str):
+    """
+    Gmail-service tegen een lokale stand-in (bijv. bench/gmail_stub.py), zonder OAuth.
 
-    return build("gmail", "v1", credentials=creds)
+    api_endpoint is de basis-URL, bijv. "http://127.0.0.1:8765/"; de paden
+    (gmail/v1/users/me/...) blijven die van de echte API.
+    """
+    with stage("gmail.build"):
+        return build(
+            "gmail", "v1",
+            http=httplib2.Http(),
+            client_options={"api_endpoint": api_endpoint},
+            static_discovery=True,
+        )
 
 
 def _decode_html_part(part) -> str:
@@ -98,53 +142,128 @@ def _parse_raw_email(raw_bytes: bytes) -> tuple[str | None, str]:
     return html_body, subject
 
 
-def fetch_nmbs_emails(
-    client_secret_path: Path, token_path: Path
-) -> list[tuple[str, str, str]]:
-    """
-    Haal alle NMBS-ticketmails op uit Gmail.
-
-    Geeft een lijst terug van (message_id, order_number, html_body).
-    Mails zonder leesbare HTML worden overgeslagen met een waarschuwing.
-    """
-    service = get_gmail_service(client_secret_path, token_path)
-
-    messages = []
+def list_nmbs_message_ids(service) -> list[str]:
+    """Alle bericht-id's die aan GMAIL_QUERY voldoen (alleen id's, geen inhoud)."""
+    ids: list[str] = []
     page_token = None
 
     while True:
         kwargs = {"userId": "me", "q": GMAIL_QUERY, "maxResults": 500}
         if page_token:
             kwargs["pageToken"] = page_token
-        result = service.users().messages().list(**kwargs).execute()
-        messages.extend(result.get("messages", []))
+        with stage("gmail.list"):
+            result = service.users().messages().list(**kwargs).execute(
+                num_retries=GMAIL_RETRIES
+            )
+        ids.extend(m["id"] for m in result.get("messages", []))
         page_token = result.get("nextPageToken")
         if not page_token:
             break
+    return ids
 
-    emails = []
-    for msg in messages:
+
+def fetch_message(service, msg_id: str) -> tuple[str, str, str] | None:
+    """
+    Haal één bericht op als (message_id, order_number, html_body).
+    Geeft None (met een waarschuwing) als er geen leesbare HTML in zit.
+    """
+    with stage("gmail.get") as span:
         msg_data = (
             service.users()
             .messages()
-            .get(userId="me", id=msg["id"], format="raw")
-            .execute()
+            .get(userId="me", id=msg_id, format="raw")
+            .execute(num_retries=GMAIL_RETRIES)
         )
-        try:
-            raw = base64.urlsafe_b64decode(msg_data["raw"] + "==")
-        except Exception as exc:
-            print(f"  Waarschuwing: base64-decodering mislukt voor bericht {msg['id']}: {exc}, overgeslagen.")
-            continue
-        html_body, subject = _parse_raw_email(raw)
+        span.bytes = len(msg_data.get("raw", ""))
+    try:
+        raw = base64.urlsafe_b64decode(msg_data["raw"] + "==")
+    except Exception as exc:
+        print(f"  Waarschuwing: base64-decodering mislukt voor bericht {msg_id}: {exc}, overgeslagen.")
+        return None
+    html_body, subject = _parse_raw_email(raw)
 
-        if not html_body:
-            print(f"  Waarschuwing: geen HTML gevonden in bericht {msg['id']}, overgeslagen.")
-            continue
+    if not html_body:
+        print(f"  Waarschuwing: geen HTML gevonden in bericht {msg_id}, overgeslagen.")
+        return None
+
+    # Haal bestelnummer op uit het onderwerp
+    order_match = re.search(r"([A-Z0-9]+)\s*-\s*NMBS Mobile Ticket", subject)
+    order_number = order_match.group(1) if order_match else msg_id
 
-        # Haal bestelnummer op uit het onderwerp
-        order_match = re.search(r"([A-Z0-9]+)\s*-\s*NMBS Mobile Ticket", subject)
-        order_number = order_match.group(1) if order_match else msg["id"]
+    return msg_id, order_number, html_body
 
-        emails.append((msg["id"], order_number, html_body))
+
+def fetch_nmbs_emails(
+    client_secret_path: Path,
+    token_path: Path,
+    service=None,
+    skip_ids: Collection[str] = (),
+    api_endpoint: str | None = None,
+    unreadable: set[str] | None = None,
+) -> list[tuple[str, str, str]]:
+    """
+    Haal alle NMBS-ticketmails op uit Gmail.
+
+    Geeft een lijst terug van (message_id, order_number, html_body).
+    Mails zonder leesbare HTML worden overgeslagen met een waarschuwing; hun
+    id's komen in unreadable (indien gegeven). Een bestaande service kan
+    hergebruikt worden (--watch); berichten in skip_ids worden niet opnieuw
+    gedownload. Met api_endpoint wordt een lokale stand-in gebruikt in plaats
+    van Gmail.
+    """
+    if service is None:
+        service = get_gmail_service(client_secret_path, token_path, api_endpoint)
+
+    emails = []
+    for msg_id in list_nmbs_message_ids(service):
+        if msg_id in skip_ids:
+            continue
+        email = fetch_message(service, msg_id)
+        if email is not None:
+            emails.append(email)
+        elif unreadable is not None:
+            unreadable.add(msg_id)
 
     return emails
+
+
+def current_history_id(service) -> str:
+    """Het huidige historyId van de mailbox: het startpunt voor check_for_new_messages."""
+    profile = service.users().getProfile(userId="me").execute(num_retries=GMAIL_RETRIES)
+    return profile["historyId"]
+
+
+def check_for_new_messages(service, history_id: str) -> tuple[bool, str]:
+    """
+    Kijk met één history.list-aanroep of er sinds history_id berichten bijkwamen.
+
+    Geeft (nieuwe berichten?, nieuw historyId) terug. Is history_id te oud
+    (Gmail bewaart de geschiedenis maar een beperkte tijd), dan wordt
+    (True, huidig historyId) teruggegeven zodat de aanroeper alles opnieuw
+    bekijkt.
+    """
+    changed = False
+    page_token = None
+    latest = history_id
+    while True:
+        kwargs = {
+            "userId": "me",
+            "startHistoryId": history_id,
+            "historyTypes": ["messageAdded"],
+        }
+        if page_token:
+            kwargs["pageToken"] = page_token
+        try:
+            with stage("gmail.history"):
+                result = service.users().history().list(**kwargs).execute(
+                    num_retries=GMAIL_RETRIES
+                )
+        except HttpError as exc:
+            if exc.resp.status == 404:
+                return True, current_history_id(service)
+            raise
+        changed = changed or bool(result.get("history"))
+        latest = result.get("historyId", latest)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return changed, latest
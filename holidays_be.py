@@ -1,25 +1,174 @@
 """
-Controleert of een datum een werkdag is (geen weekend of Belgische feestdag).
+Controleert of een datum een werkdag is.
+
+Een WorkCalendar legt drie lagen over elkaar: weekends en Belgische
+feestdagen, extra vrije dagen (brugdagen, verlof) en dagen waarop toch
+gewerkt is. Per jaar wordt één bitmap opgebouwd, zodat elke opzoeking O(1)
+is. is_work_day en day_type_label gebruiken de kalender die met
+configure_calendar() ingesteld is (standaard: alleen weekend en feestdagen).
+
+De feestdagen worden per jaar één keer opgebouwd en bewaard; refresh() wist
+die cache (bijv. na een update van het holidays-pakket).
 """
-from datetime import date
+from collections.abc import Iterable, Mapping
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+
 import holidays
 
+from profiling import timed
+
+
+@lru_cache(maxsize=None)
+@timed("kalender.feestdagen")
+def holiday_table(year: int) -> Mapping[date, str]:
+    """Alle Belgische feestdagen van een jaar: datum -> naam (alleen-lezen)."""
+    return MappingProxyType(dict(holidays.Belgium(years=year)))
+
+
+class WorkCalendar:
+    """
+    Werkdagenkalender met een bitmap per jaar (1 = werkdag).
+
+    extra_days_off: datum -> reden (bijv. {date(2026, 5, 15): "brugdag"}).
+    forced_work_days: datums die altijd als werkdag tellen, ook in het weekend
+    of op een feestdag. Die laag wint van alle andere.
+    """
+
+    def __init__(
+        self,
+        extra_days_off: Mapping[date, str] | None = None,
+        forced_work_days: Iterable[date] = (),
+    ):
+        self.extra_days_off = dict(extra_days_off or {})
+        self.forced_work_days = frozenset(forced_work_days)
+        self._years: dict[int, tuple[int, bytearray]] = {}
+
+    def _bitmap(self, year: int) -> tuple[int, bytearray]:
+        """(ordinal van 1 januari, bitmap) voor een jaar; wordt één keer opgebouwd."""
+        cached = self._years.get(year)
+        if cached is not None:
+            return cached
+
+        start = date(year, 1, 1)
+        n_days = (date(year + 1, 1, 1) - start).days
+        # 1 januari valt op weekday(); van daaruit loopt het weekritme door
+        first = start.weekday()
+        bits = bytearray(1 if (first + i) % 7 < 5 else 0 for i in range(n_days))
+        for d in holiday_table(year):
+            bits[(d - start).days] = 0
+        for d in self.extra_days_off:
+            if d.year == year:
+                bits[(d - start).days] = 0
+        for d in self.forced_work_days:
+            if d.year == year:
+                bits[(d - start).days] = 1
+
+        cached = self._years[year] = (start.toordinal(), bits)
+        return cached
+
+    def is_work_day(self, d: date) -> bool:
+        start, bits = self._bitmap(d.year)
+        return bits[d.toordinal() - start] == 1
+
+    def work_day_mask(self, dates: Iterable[date]) -> list[bool]:
+        """is_work_day voor een hele reeks datums, in dezelfde volgorde."""
+        return [self.is_work_day(d) for d in dates]
+
+    def label(self, d: date) -> str:
+        """Waarom de dag (geen) werkdag is, in dezelfde vorm als day_type_label."""
+        if self.is_work_day(d):
+            return "werkdag"
+        if d in self.extra_days_off:
+            reason = self.extra_days_off[d]
+            return f"vrije dag ({reason})" if reason else "vrije dag"
+        if d.weekday() == 5:
+            return "zaterdag"
+        if d.weekday() == 6:
+            return "zondag"
+        return f"feestdag ({holiday_table(d.year)[d]})"
+
+    def clear(self) -> None:
+        """Vergeet de opgebouwde bitmaps."""
+        self._years.clear()
+
 
+def _parse_day(value) -> date:
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _expand(entry) -> list[date]:
+    """
+    Eén datum, een ISO-string of een (begin, einde)-periode, grenzen inbegrepen.
+    Een periode die eindigt vóór ze begint, is een ValueError.
+    """
+    if isinstance(entry, (tuple, list)):
+        begin, end = (_parse_day(v) for v in entry)
+        if end < begin:
+            raise ValueError(f"periode eindigt vóór ze begint: {begin} > {end}")
+        return [begin + timedelta(days=i) for i in range((end - begin).days + 1)]
+    return [_parse_day(entry)]
+
+
+def calendar_from_config(cfg) -> WorkCalendar:
+    """
+    Bouw een WorkCalendar uit EXTRA_DAYS_OFF en FORCED_WORK_DAYS in config (optioneel).
+
+    EXTRA_DAYS_OFF is een lijst of een dict {dag of periode: reden};
+    FORCED_WORK_DAYS is een lijst. Een dag is een date of "JJJJ-MM-DD", een
+    periode een tuple of lijst (begin, einde). Ongeldige waarden (ook een
+    periode met het einde vóór het begin) worden gemeld en overgeslagen.
+    """
+    raw_off = getattr(cfg, "EXTRA_DAYS_OFF", None) or {}
+    # Een lijst kan perioden als lijst bevatten: niet hashbaar, dus geen dict-sleutel
+    entries = raw_off.items() if isinstance(raw_off, Mapping) else ((e, "") for e in raw_off)
+    extra: dict[date, str] = {}
+    for entry, reason in entries:
+        try:
+            for d in _expand(entry):
+                extra[d] = reason or ""
+        except (TypeError, ValueError):
+            print(f"  Waarschuwing: ongeldige datum in EXTRA_DAYS_OFF: {entry!r}")
+
+    forced: set[date] = set()
+    for entry in getattr(cfg, "FORCED_WORK_DAYS", None) or ():
+        try:
+            forced.update(_expand(entry))
+        except (TypeError, ValueError):
+            print(f"  Waarschuwing: ongeldige datum in FORCED_WORK_DAYS: {entry!r}")
+
+    return WorkCalendar(extra, forced)
+
+
+_calendar = WorkCalendar()
+
+
+def configure_calendar(calendar: WorkCalendar) -> None:
+    """Stel de kalender in die is_work_day en day_type_label gebruiken."""
+    global _calendar
+    _calendar = calendar
+
+
+def refresh() -> None:
+    """Vergeet alle opgebouwde feestdagtabellen en bitmaps; ze worden bij het volgende gebruik herberekend."""
+    holiday_table.cache_clear()
+    _calendar.clear()
+
+
+@timed("kalender")
 def is_work_day(d: date) -> bool:
     """Geeft True terug als de datum een gewone werkdag is."""
-    if d.weekday() >= 5:  # 5 = zaterdag, 6 = zondag
-        return False
-    be_holidays = holidays.Belgium(years=d.year)
-    return d not in be_holidays
+    return _calendar.is_work_day(d)
+
+
+def work_day_mask(dates: Iterable[date]) -> list[bool]:
+    """is_work_day voor een hele reeks datums in één keer, in dezelfde volgorde."""
+    return _calendar.work_day_mask(dates)
 
 
 def day_type_label(d: date) -> str:
     """Geeft een beschrijving van waarom de dag geen werkdag is."""
-    if d.weekday() == 5:
-        return "zaterdag"
-    if d.weekday() == 6:
-        return "zondag"
-    be_holidays = holidays.Belgium(years=d.year)
-    if d in be_holidays:
-        return f"feestdag ({be_holidays[d]})"
-    return "werkdag"
+    return _calendar.label(d)
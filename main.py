@@ -5,11 +5,29 @@ Gebruik:
     python main.py                      # alle tickets
     python main.py --month januari      # alleen januari (huidig jaar)
     python main.py --month "maart 2025" # alleen maart 2025
+    python main.py --wait               # wacht tot open Excel-bestanden gesloten zijn
+    python main.py --batch              # zonder vragen, volgens vaste regels (Taakplanner)
+    python main.py --sync               # alleen ophalen en klaarzetten, zonder vragen
+    python main.py --review             # klaargezette tickets beoordelen, zonder Gmail
+    python main.py --bulk               # alle tickets in één tabel, beslissen per bereik
+    python main.py --watch              # blijf draaien en zet nieuwe tickets meteen klaar
+    python main.py --profile            # toon na afloop de tijd per verwerkingsstap
+    python main.py --memprofile         # toon na afloop het geheugengebruik per stap
+    python main.py --pdf februari       # bundel alle tickets van februari in één PDF
+    python main.py --history-report     # HTML-rapport van alle verwerkte maanden
+    python main.py --summary            # totalen per maand en per jaar, zonder Excel te openen
+    python main.py --verify             # vergelijk state, Excel en screenshots (--repair: herstel)
     python main.py --reset              # wis de verwerkte-ticketslijst
+    python main.py --user an            # enkel profiel 'an' (zonder --user: alle profielen)
 """
 import argparse
+import dataclasses
+import shutil
 import sys
-from datetime import date
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
 from pathlib import Path
 
 try:
@@ -22,19 +40,42 @@ except ModuleNotFoundError:
     )
     sys.exit(1)
 
-from constants import DUTCH_MONTHS_REVERSE
+from batch import ACCEPT, REVIEW, SKIP, append_batch_log, batch_log_file, classify, default_rules
+from constants import DUTCH_MONTHS, DUTCH_MONTHS_REVERSE
+from dashboard import dashboard_dir, month_key, update_dashboard
 from email_parser import TicketData, parse_nmbs_email, ParseError
+from excel_dates import date_to_excel_serial, excel_serial_to_date
 from excel_updater import (
-    add_ticket_to_excel,
+    DEFAULT_EMPLOYEE_NAME,
+    add_tickets_by_month,
     excel_path_for_date,
+    group_tickets_by_file,
+    is_excel_locked,
     remove_ticket_from_excel,
     sheet_name_for_date,
-    date_to_excel_serial,
 )
-from gmail_client import fetch_nmbs_emails
-from holidays_be import is_work_day, day_type_label
-from report_gen import format_summary_table, generate_html_report
-from screenshot_gen import save_screenshot
+from holidays_be import calendar_from_config, configure_calendar, day_type_label, is_work_day
+import memprofile
+from outbox import append_to_outbox, load_outbox, outbox_file, save_outbox
+from pdf_bundle import build_month_pdf
+import profiling
+from profiles import select_profiles
+from report_gen import (
+    format_month_totals,
+    format_summary_table,
+    generate_history_report,
+    generate_html_report,
+)
+from review_queue import enqueue_for_review, load_review_queue, review_file, save_review_queue
+from screenshot_gen import (
+    ScreenshotQueue,
+    cached_html_path,
+    close_session,
+    html_digest,
+    render_settings_from_config,
+    save_screenshots,
+    screenshot_path,
+)
 from state import (
     load_state,
     save_state,
@@ -43,7 +84,32 @@ from state import (
     mark_processed,
     mark_skipped_weekend,
     get_metadata,
+    duplicate_of,
+    month_aggregates,
+    trip_key,
+    unmark_processed,
 )
+from verify import format_verify_report, verify
+
+
+def _gmail(name: str):
+    """
+    gmail_client (googleapiclient, google-auth) pas bij het eerste gebruik laden:
+    het opstarten kost anders een halve seconde, ook voor --review en andere
+    opdrachten die Gmail niet nodig hebben.
+    """
+    def call(*args, **kwargs):
+        import gmail_client
+        return getattr(gmail_client, name)(*args, **kwargs)
+
+    call.__name__ = name
+    return call
+
+
+check_for_new_messages = _gmail("check_for_new_messages")
+current_history_id = _gmail("current_history_id")
+fetch_nmbs_emails = _gmail("fetch_nmbs_emails")
+get_gmail_service = _gmail("get_gmail_service")
 
 
 def parse_month_arg(arg: str) -> tuple[int, int]:
@@ -77,14 +143,99 @@ def parse_month_arg(arg: str) -> tuple[int, int]:
     return month, year
 
 
+DEFAULT_WATCH_INTERVAL = 300.0  # seconden tussen twee controles in --watch
+WATCH_MAX_BACKOFF = 3600.0      # langste wachttijd na herhaalde Gmail-fouten
+
+_BATCH_LABELS = {ACCEPT: "aanvaard", SKIP: "overgeslagen", REVIEW: "ter controle"}
+
+
 def _prompt(question: str, default_yes: bool = True) -> bool:
     hint = "[J/n]" if default_yes else "[j/N]"
-    answer = input(f"      {question} {hint}: ").strip().lower()
+    with profiling.stage("invoer"):
+        answer = input(f"      {question} {hint}: ").strip().lower()
     if not answer:
         return default_yes
     return answer in ("j", "y", "ja", "yes")
 
 
+_BULK_ACTIONS = {"a": ACCEPT, "s": SKIP, "l": REVIEW}
+_BULK_STATUS = {ACCEPT: "aanvaard", SKIP: "overslaan", REVIEW: "later"}
+
+
+def parse_bulk_command(command: str, total: int, open_indices: list[int]) -> tuple[str, list[int]]:
+    """
+    Parseer een commando van het beoordelingsscherm, bijv. 'a 1-20', 's 21' of 'a rest'.
+
+    Geeft (beslissing, volgnummers vanaf 1) terug. 'rest' staat voor alle
+    tickets zonder beslissing (open_indices). Gooit een ValueError met een
+    leesbare uitleg bij een ongeldig commando.
+    """
+    parts = command.strip().lower().split(maxsplit=1)
+    if len(parts) != 2 or parts[0] not in _BULK_ACTIONS:
+        raise ValueError("Gebruik: a|s|l gevolgd door nummers, bijv. 'a 1-20', 's 21' of 'a rest'.")
+    action, spec = _BULK_ACTIONS[parts[0]], parts[1].replace(" ", "")
+
+    if spec in ("rest", "alles"):
+        return action, list(open_indices) if spec == "rest" else list(range(1, total + 1))
+
+    indices: list[int] = []
+    for piece in spec.split(","):
+        begin, sep, end = piece.partition("-")
+        if not begin.isdigit() or (sep and not end.isdigit()):
+            raise ValueError(f"Ongeldig bereik '{piece}'.")
+        first, last = int(begin), int(end) if sep else int(begin)
+        if not 1 <= first <= last <= total:
+            raise ValueError(f"Bereik '{piece}' valt buiten 1-{total}.")
+        indices.extend(range(first, last + 1))
+    return action, indices
+
+
+def _bulk_review(tickets: list[TicketData]) -> dict[str, tuple[str, str]]:
+    """
+    Beoordelingsscherm: alle tickets in één tabel, beslissen per bereik.
+
+    Geeft per bestelnummer (beslissing, "handmatig") terug; tickets zonder
+    beslissing blijven klaarstaan voor later.
+    """
+    decisions: dict[int, str] = {}
+    warnings = {
+        i: f"(!!) {day_type_label(t.travel_date)}"
+        for i, t in enumerate(tickets, 1) if not is_work_day(t.travel_date)
+    }
+
+    while True:
+        status = [
+            _BULK_STATUS[decisions[i]] if i in decisions else warnings.get(i, "")
+            for i in range(1, len(tickets) + 1)
+        ]
+        print(f"\n{format_summary_table(tickets, status)}")
+        open_indices = [i for i in range(1, len(tickets) + 1) if i not in decisions]
+        if not open_indices:
+            break
+        print(
+            "\n  a = aanvaarden, s = permanent overslaan, l = later;"
+            " bijv. 'a 1-20', 's 21', 'a rest'. 'klaar' om te stoppen."
+        )
+        with profiling.stage("invoer"):
+            command = input("  > ").strip().lower()
+        if command in ("klaar", "k", "q"):
+            break
+        if not command:
+            continue
+        try:
+            action, indices = parse_bulk_command(command, len(tickets), open_indices)
+        except ValueError as exc:
+            print(f"  {exc}")
+            continue
+        for i in indices:
+            decisions[i] = action
+
+    return {
+        tickets[i - 1].order_number: (action, "handmatig")
+        for i, action in decisions.items()
+    }
+
+
 def _print_ticket(ticket: TicketData, index: int, total: int) -> None:
     print(
         f"\n[{index}/{total}] {ticket.from_station} -> {ticket.to_station}"
@@ -97,30 +248,187 @@ def _print_ticket(ticket: TicketData, index: int, total: int) -> None:
     print(f"      Bestelnummer : {ticket.order_number}")
 
 
-def main(month_filter: tuple[int, int] | None = None) -> None:
-    excel_dir = config.EXCEL_DIR
-    excel_dir.mkdir(parents=True, exist_ok=True)
-    config.SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+def _excel_metadata(ticket: TicketData, excel_path: Path) -> dict:
+    """Metadata waarmee --reset de Excel-rij later terugvindt (en de maandtotalen)."""
+    return {
+        "filename": excel_path.name,
+        "travel_date_serial": date_to_excel_serial(ticket.travel_date),
+        "description": (
+            f"Trein {ticket.from_station} - {ticket.to_station} {ticket.direction}"
+        ),
+        # Sleutel naar de bewaarde e-mail in screenshots/.cache (voor --pdf)
+        "html_sha256": html_digest(ticket.email_html),
+        "price": ticket.price,
+        "direction": ticket.direction,
+        "trip": _ticket_trip(ticket),
+    }
 
-    print("NMBS Onkostennota -- nieuwe tickets verwerken\n")
-    if month_filter:
-        from constants import DUTCH_MONTHS
-        print(f"Maandfilter: {DUTCH_MONTHS[month_filter[0]]} {month_filter[1]}\n")
-    print("Mails ophalen uit Gmail...")
 
+def _ticket_trip(ticket: TicketData) -> str:
+    return trip_key(ticket.travel_date, ticket.from_station, ticket.to_station, ticket.price)
+
+
+def _flush_outbox(
+    outbox: dict[str, TicketData],
+    state: dict,
+    excel_dir: Path,
+    screenshots: ScreenshotQueue | None = None,
+) -> list[TicketData]:
+    """
+    Schrijf de tickets uit de outbox weg, parallel per maandbestand.
+
+    Maandbestanden die open staan in Excel worden niet geprobeerd; hun tickets
+    blijven in de outbox. Een ticket wordt pas als verwerkt gemarkeerd (en uit
+    de outbox gehaald) nadat zijn maandbestand succesvol opgeslagen is.
+    Met een screenshots-wachtrij krijgt elk weggeschreven ticket zonder
+    screenshot er alsnog een (bijv. na Ctrl+C terwijl de werker nog bezig was).
+    Geeft de toegevoegde tickets terug, in chronologische volgorde.
+    """
+    if not outbox:
+        return []
+
+    pending = sorted(outbox.values(), key=lambda t: t.travel_date)
+    groups = group_tickets_by_file(pending, excel_dir)
+
+    to_write: list[TicketData] = []
+    for excel_path, month_tickets in groups.items():
+        if is_excel_locked(excel_path):
+            print(
+                f"  {excel_path.name} is geopend in Excel: {len(month_tickets)}"
+                " ticket(s) blijven in de wachtrij."
+            )
+            continue
+        to_write.extend(month_tickets)
+
+    if not to_write:
+        return []
+
+    print("\nExcel bijwerken...")
+    results = add_tickets_by_month(
+        to_write, excel_dir,
+        employee_name=getattr(config, "EMPLOYEE_NAME", DEFAULT_EMPLOYEE_NAME),
+    )
+
+    for excel_path, error in results.items():
+        month_tickets = groups[excel_path]
+        if error is not None:
+            print(f"\n  Fout: {error}")
+            print(f"  {len(month_tickets)} ticket(s) blijven in de wachtrij.")
+            continue
+        for ticket in month_tickets:
+            mark_processed(
+                ticket.order_number, state,
+                metadata=_excel_metadata(ticket, excel_path),
+            )
+            del outbox[ticket.order_number]
+            if screenshots is not None and not screenshot_path(
+                ticket, screenshots.screenshots_dir, screenshots.settings
+            ).exists():
+                screenshots.submit(ticket)
+        save_state(state, config.STATE_FILE)
+        save_outbox(outbox, outbox_file(config.STATE_FILE))
+        print(f"      OK  {len(month_tickets)} ticket(s) toegevoegd aan {excel_path.name}")
+
+    return [
+        t for t in to_write
+        if results[excel_path_for_date(excel_dir, t.travel_date)] is None
+    ]
+
+
+def _wait_for_outbox(
+    outbox: dict[str, TicketData],
+    state: dict,
+    excel_dir: Path,
+    interval: float = 5.0,
+    screenshots: ScreenshotQueue | None = None,
+) -> list[TicketData]:
+    """Wacht tot de vergrendelde maandbestanden gesloten zijn en schrijf dan weg."""
+    added: list[TicketData] = []
+    print(
+        f"\nWachten tot de Excel-bestanden gesloten zijn ({len(outbox)} ticket(s))..."
+        " Druk Ctrl+C om te stoppen."
+    )
     try:
-        raw_emails = fetch_nmbs_emails(config.CLIENT_SECRET_PATH, config.TOKEN_PATH)
-    except FileNotFoundError as exc:
-        print(f"\nFout: {exc}")
-        sys.exit(1)
+        while outbox:
+            time.sleep(interval)
+            paths = group_tickets_by_file(list(outbox.values()), excel_dir)
+            if all(is_excel_locked(p) for p in paths):
+                continue
+            added.extend(_flush_outbox(outbox, state, excel_dir, screenshots))
+    except KeyboardInterrupt:
+        print("\nWachten gestopt. De tickets blijven in de wachtrij voor de volgende keer.")
+    return added
 
-    state = load_state(config.STATE_FILE)
 
-    # Parseer alle nog niet-verwerkte mails
+def _load_pending_outbox(path: Path, state: dict) -> dict[str, TicketData]:
+    """
+    Laad de outbox zonder tickets die al verwerkt zijn.
+
+    _flush_outbox bewaart de state vóór de outbox; na een crash of Ctrl+C
+    daartussen staat een ticket dus al in Excel en in de state, maar nog in
+    outbox.jsonl. Zonder opruimen zou de volgende run de rij opnieuw
+    wegschrijven. De opgeruimde outbox wordt meteen bewaard, vóór er iets
+    naar Excel gaat.
+    """
+    outbox = load_outbox(path)
+    done = [order for order in outbox if is_processed(order, state)]
+    for order in done:
+        del outbox[order]
+    if done:
+        save_outbox(outbox, path)
+    return outbox
+
+
+def _load_pending_review(
+    path: Path, state: dict, outbox: dict[str, TicketData]
+) -> dict[str, TicketData]:
+    """
+    Laad de reviewwachtrij zonder tickets die intussen al beslist zijn.
+
+    Na een onderbroken run kan een ticket al verwerkt, overgeslagen of in de
+    outbox staan terwijl het nog in review.jsonl zit; die worden opgeruimd.
+    """
+    review = load_review_queue(path)
+    decided = [
+        order for order in review
+        if is_processed(order, state) or is_skipped(order, state) or order in outbox
+    ]
+    for order in decided:
+        del review[order]
+    if decided:
+        save_review_queue(review, path)
+    return review
+
+
+def _fetch_new_tickets(
+    state: dict,
+    outbox: dict[str, TicketData],
+    review: dict[str, TicketData],
+    raw_emails: list[tuple[str, str, str]] | None = None,
+) -> list[TicketData]:
+    """
+    Haal de NMBS-mails op en parseer alleen wat nog nergens gekend is.
+    Met raw_emails (al opgehaald, bijv. door --watch) wordt Gmail overgeslagen.
+    """
+    if raw_emails is None:
+        print("Mails ophalen uit Gmail...")
+        try:
+            raw_emails = fetch_nmbs_emails(
+                config.CLIENT_SECRET_PATH, config.TOKEN_PATH,
+                api_endpoint=getattr(config, "GMAIL_API_ENDPOINT", None),
+            )
+        except FileNotFoundError as exc:
+            print(f"\nFout: {exc}")
+            sys.exit(1)
+
     tickets: list[TicketData] = []
     for _msg_id, order_number, html_body in raw_emails:
         if is_processed(order_number, state) or is_skipped(order_number, state):
             continue
+        if order_number in outbox:
+            continue  # al aanvaard, wacht enkel nog op Excel
+        if order_number in review:
+            continue  # al geparsed, wacht op beoordeling
         try:
             ticket = parse_nmbs_email(
                 html_body,
@@ -130,8 +438,108 @@ def main(month_filter: tuple[int, int] | None = None) -> None:
             tickets.append(ticket)
         except ParseError as exc:
             print(f"  Waarschuwing: {exc} -- overgeslagen.")
+    return tickets
+
+
+def sync(raw_emails: list[tuple[str, str, str]] | None = None) -> int:
+    """
+    Haal nieuwe tickets op en zet ze klaar in review.jsonl, zonder iets te vragen.
+
+    Bedoeld om op de achtergrond (Taakplanner) te draaien; `--review` toont ze
+    daarna meteen. Geeft het aantal nieuw klaargezette tickets terug.
+    """
+    print("NMBS Onkostennota -- nieuwe tickets ophalen\n")
+    state = load_state(config.STATE_FILE)
+    outbox = _load_pending_outbox(outbox_file(config.STATE_FILE), state)
+    review_path = review_file(config.STATE_FILE)
+    review = _load_pending_review(review_path, state, outbox)
+
+    new = enqueue_for_review(
+        _fetch_new_tickets(state, outbox, review, raw_emails), review, review_path
+    )
+    memprofile.checkpoint("ophalen")
+    print(f"{new} nieuw(e) ticket(s) klaargezet; {len(review)} wachten op beoordeling.")
+    return new
+
+
+def _ticket_record(ticket: TicketData, decision: str, rule: str) -> dict:
+    """Eén ticket in het batchlogboek."""
+    return {
+        "order_number": ticket.order_number,
+        "travel_date": ticket.travel_date.isoformat(),
+        "from_station": ticket.from_station,
+        "to_station": ticket.to_station,
+        "direction": ticket.direction,
+        "price": ticket.price,
+        "decision": decision,
+        "rule": rule,
+    }
+
+
+def main(
+    month_filter: tuple[int, int] | None = None,
+    wait: bool = False,
+    batch: bool = False,
+    fetch: bool = True,
+    bulk: bool = False,
+    raw_emails: list[tuple[str, str, str]] | None = None,
+) -> None:
+    """
+    Verwerk nieuwe tickets.
+
+    Opgehaalde tickets gaan eerst naar de reviewwachtrij (review.jsonl); wat
+    niet beslist wordt, blijft daar staan voor de volgende keer. Met
+    fetch=False (`--review`) wordt Gmail overgeslagen en worden enkel de door
+    `--sync` klaargezette tickets getoond.
 
-    # Filter op maand indien opgegeven
+    Met bulk=True (`--bulk`) worden alle tickets in één tabel getoond en per
+    bereik beslist ('a 1-20', 's 21', 'a rest') in plaats van per ticket.
+
+    Interactief wordt per ticket gevraagd of het opgenomen moet worden. Met
+    batch=True beslissen de regels uit batch.default_rules zonder input():
+    werkdagtickets tussen HOME_STATION en OFFICE_STATION worden aanvaard,
+    niet-werkdagen overgeslagen en de rest blijft staan voor een interactieve
+    run. Het resultaat komt dan ook in batch_log.jsonl.
+    """
+    excel_dir = config.EXCEL_DIR
+    excel_dir.mkdir(parents=True, exist_ok=True)
+    config.SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    title = "nieuwe tickets verwerken (batch)" if batch else "nieuwe tickets verwerken"
+    print(f"NMBS Onkostennota -- {title}\n")
+    if month_filter:
+        print(f"Maandfilter: {DUTCH_MONTHS[month_filter[0]]} {month_filter[1]}\n")
+
+    configure_calendar(calendar_from_config(config))
+    state = load_state(config.STATE_FILE)
+    outbox_path = outbox_file(config.STATE_FILE)
+    outbox = _load_pending_outbox(outbox_path, state)
+    review_path = review_file(config.STATE_FILE)
+    review = _load_pending_review(review_path, state, outbox)
+    memprofile.checkpoint("start")
+    screenshots = ScreenshotQueue(
+        config.SCREENSHOTS_DIR,
+        render_many=save_screenshots,
+        settings=render_settings_from_config(config),
+    )
+
+    # Tickets die bij een vorige run aanvaard maar niet weggeschreven zijn
+    added_tickets: list[TicketData] = []
+    if outbox:
+        print(f"{len(outbox)} ticket(s) uit de wachtrij van een vorige run.")
+        added_tickets.extend(_flush_outbox(outbox, state, excel_dir, screenshots))
+        print()
+
+    if fetch:
+        new_tickets = _fetch_new_tickets(state, outbox, review, raw_emails)
+        enqueue_for_review(new_tickets, review, review_path)
+        memprofile.checkpoint("ophalen")
+    elif review:
+        print(f"{len(review)} ticket(s) klaargezet door --sync (Gmail wordt niet geraadpleegd).")
+
+    tickets = list(review.values())
+
+    # Filter op maand indien opgegeven; de andere maanden blijven klaarstaan
     if month_filter:
         target_month, target_year = month_filter
         tickets = [
@@ -139,72 +547,178 @@ def main(month_filter: tuple[int, int] | None = None) -> None:
             if t.travel_date.month == target_month and t.travel_date.year == target_year
         ]
 
-    if not tickets:
+    if not tickets and not added_tickets and not outbox:
         print("Geen nieuwe tickets gevonden.")
+        if batch:
+            append_batch_log(
+                {"added": 0, "skipped": 0, "review": 0, "queued": 0, "tickets": []},
+                batch_log_file(config.STATE_FILE),
+            )
         return
 
     tickets.sort(key=lambda t: t.travel_date)
     total = len(tickets)
-    print(f"{total} nieuw(e) ticket(s) gevonden.\n")
+    if tickets:
+        print(f"{total} nieuw(e) ticket(s) gevonden.\n")
+    else:
+        print("Geen nieuwe tickets gevonden.")
+
+    # Vergrendelde maandbestanden vooraf melden, zodat de gebruiker weet
+    # dat die tickets na het antwoorden in de wachtrij terechtkomen.
+    for excel_path in group_tickets_by_file(tickets, excel_dir):
+        if is_excel_locked(excel_path):
+            print(
+                f"  Let op: {excel_path.name} is geopend in Excel. Aanvaarde tickets"
+                " voor deze maand komen in de wachtrij."
+            )
 
-    added = 0
     skipped_weekend = 0
-    added_tickets: list[TicketData] = []
-    screenshot_paths: list[Path | None] = []
+    accepted: list[TicketData] = []
+    records: dict[str, dict] = {}
+    rules = default_rules(
+        getattr(config, "HOME_STATION", None), getattr(config, "OFFICE_STATION", None)
+    )
 
-    for i, ticket in enumerate(tickets, 1):
-        _print_ticket(ticket, i, total)
+    # Beslissingen vooraf: via de regels (batch) of het beoordelingsscherm (bulk)
+    decisions: dict[str, tuple[str, str]] | None = None
+    if batch:
+        decisions = {t.order_number: classify(t, rules) for t in tickets}
+    elif bulk and tickets:
+        decisions = _bulk_review(tickets)
+
+    # Ritten die al aanvaard zijn maar nog niet in de state staan (wachtrij, deze run)
+    pending_trips = {_ticket_trip(t): t.order_number for t in outbox.values()}
 
-        # Weekend / feestdag controle
-        if not is_work_day(ticket.travel_date):
-            label = day_type_label(ticket.travel_date)
-            print(f"\n  (!!)  Dit ticket is gekocht op een {label}.")
-            if not _prompt("Toch opnemen in de onkostennota?", default_yes=False):
+    for i, ticket in enumerate(tickets, 1):
+        trip = _ticket_trip(ticket)
+        duplicate = duplicate_of(trip, state) or pending_trips.get(trip)
+        if decisions is not None:
+            decision, rule = decisions.get(ticket.order_number, (REVIEW, "later"))
+            if decision == ACCEPT and duplicate:
+                # Nooit automatisch een tweede rij voor dezelfde rit
+                decision, rule = REVIEW, f"mogelijk dubbel met {duplicate}"
+                if not batch:
+                    print(
+                        f"  {ticket.order_number}: zelfde rit, datum en prijs als {duplicate}"
+                        " -- blijft klaarstaan voor beoordeling."
+                    )
+            if batch:
+                records[ticket.order_number] = _ticket_record(ticket, decision, rule)
+                print(
+                    f"  [{i}/{total}] {ticket.travel_date.strftime('%d/%m/%Y')}"
+                    f" {ticket.from_station} -> {ticket.to_station}"
+                    f" ({ticket.order_number}): {_BATCH_LABELS[decision]} ({rule})"
+                )
+            if decision == SKIP:
                 mark_skipped_weekend(ticket.order_number, state)
                 save_state(state, config.STATE_FILE)
-                print("      Permanent overgeslagen (wordt niet meer getoond).")
+                del review[ticket.order_number]
                 skipped_weekend += 1
                 continue
+            if decision == REVIEW:
+                continue
+        else:
+            _print_ticket(ticket, i, total)
 
-        if not _prompt("Toevoegen aan de onkostennota?", default_yes=True):
-            print("      Overgeslagen (wordt volgende keer opnieuw getoond).")
-            continue
+            # Weekend / feestdag controle
+            if not is_work_day(ticket.travel_date):
+                label = day_type_label(ticket.travel_date)
+                print(f"\n  (!!)  Dit ticket is gekocht op een {label}.")
+                if not _prompt("Toch opnemen in de onkostennota?", default_yes=False):
+                    mark_skipped_weekend(ticket.order_number, state)
+                    save_state(state, config.STATE_FILE)
+                    del review[ticket.order_number]
+                    print("      Permanent overgeslagen (wordt niet meer getoond).")
+                    skipped_weekend += 1
+                    continue
 
-        # Screenshot opslaan
-        scr_path = None
-        try:
-            scr_path = save_screenshot(ticket, config.SCREENSHOTS_DIR)
-            print(f"      Screenshot opgeslagen: {scr_path}")
-        except RuntimeError as exc:
-            print(f"      Waarschuwing: {exc}")
-            print("      Verdergaan zonder screenshot...")
+            if duplicate:
+                print(
+                    f"\n  (!!)  Mogelijk dubbel: zelfde rit, datum en prijs als bestelling {duplicate}."
+                )
+            if not _prompt("Toevoegen aan de onkostennota?", default_yes=not duplicate):
+                print("      Overgeslagen (wordt volgende keer opnieuw getoond).")
+                continue
 
-        # Excel bijwerken
-        try:
-            result_path = add_ticket_to_excel(ticket, excel_dir)
-        except OSError as exc:
-            print(f"\n  Fout: {exc}")
-            print("  Dit ticket wordt NIET als verwerkt gemarkeerd. Probeer opnieuw.")
-            continue
+        # Meteen duurzaam bewaren: een antwoord gaat nooit meer verloren
+        outbox[ticket.order_number] = ticket
+        append_to_outbox(ticket, outbox_path)
+        del review[ticket.order_number]
+        accepted.append(ticket)
+        pending_trips.setdefault(trip, ticket.order_number)
 
-        excel_metadata = {
-            "filename": result_path.name,
-            "travel_date_serial": date_to_excel_serial(ticket.travel_date),
-            "description": (
-                f"Trein {ticket.from_station} - {ticket.to_station} {ticket.direction}"
-            ),
-        }
-        mark_processed(ticket.order_number, state, metadata=excel_metadata)
-        save_state(state, config.STATE_FILE)
-        added += 1
-        added_tickets.append(ticket)
-        screenshot_paths.append(scr_path)
-        print(f"      OK  Toegevoegd aan {result_path.name}")
+        # Screenshot op de achtergrond; de volgende vraag komt meteen
+        screenshots.submit(ticket)
+        if decisions is None:
+            print("      Aanvaard (screenshot wordt op de achtergrond gemaakt).")
+
+    # Beoordeelde tickets staan nu in de state of de outbox
+    save_review_queue(review, review_path)
+    memprofile.checkpoint("beslissingen")
+
+    # Excel bijwerken terwijl de screenshots nog lopen
+    added_tickets.extend(_flush_outbox(outbox, state, excel_dir, screenshots))
+    if outbox and wait:
+        added_tickets.extend(_wait_for_outbox(outbox, state, excel_dir, screenshots=screenshots))
+    added = len(added_tickets)
+    memprofile.checkpoint("excel")
 
+    if screenshots.pending():
+        print(f"\nWachten op {screenshots.pending()} screenshot(s)...")
+    screenshot_results = screenshots.wait()
+    memprofile.checkpoint("screenshots")
+    rendered = {t.order_number: t for t in [*accepted, *added_tickets]}
+    screenshot_failures = [
+        (t, screenshot_results[order]) for order, t in rendered.items()
+        if isinstance(screenshot_results.get(order), RuntimeError)
+    ]
+    screenshot_paths = [
+        screenshot_results.get(t.order_number)
+        if isinstance(screenshot_results.get(t.order_number), Path) else None
+        for t in added_tickets
+    ]
+
+    to_review = [r for r in records.values() if r["decision"] == REVIEW]
     print(f"\nKlaar: {added} ticket(s) toegevoegd", end="")
     if skipped_weekend:
-        print(f", {skipped_weekend} weekend/feestdag(en) overgeslagen", end="")
+        what = "ticket(s) permanent" if bulk else "weekend/feestdag(en)"
+        print(f", {skipped_weekend} {what} overgeslagen", end="")
+    if to_review:
+        print(f", {len(to_review)} ter controle (voer main.py zonder --batch uit)", end="")
     print(".")
+    if outbox:
+        print(
+            f"{len(outbox)} ticket(s) wachten nog op een gesloten Excel-bestand;"
+            " ze worden bij de volgende run automatisch weggeschreven."
+        )
+    if screenshot_failures:
+        print(f"\n{len(screenshot_failures)} screenshot(s) mislukt:")
+        for ticket, exc in screenshot_failures:
+            print(
+                f"  - {ticket.order_number} ({ticket.travel_date.strftime('%d/%m/%Y')}"
+                f" {ticket.from_station} -> {ticket.to_station}): {exc}"
+            )
+
+    if batch:
+        added_orders = {t.order_number for t in added_tickets}
+        for order, record in records.items():
+            if record["decision"] != ACCEPT:
+                continue
+            record["excel"] = "toegevoegd" if order in added_orders else "wachtrij"
+            result = screenshot_results.get(order)
+            record["screenshot"] = str(result) if isinstance(result, Path) else None
+            if isinstance(result, RuntimeError):
+                record["screenshot_error"] = str(result)
+        append_batch_log(
+            {
+                "added": added,
+                "skipped": skipped_weekend,
+                "review": len(to_review),
+                "queued": len(outbox),
+                "tickets": list(records.values()),
+            },
+            batch_log_file(config.STATE_FILE),
+        )
 
     # Samenvattingstabel
     if added_tickets:
@@ -218,10 +732,363 @@ def main(month_filter: tuple[int, int] | None = None) -> None:
                     added_tickets, reports_dir, screenshot_paths=screenshot_paths or None
                 )
                 print(f"\nHTML-rapport: {report_path}")
-                import webbrowser
-                webbrowser.open(str(report_path))
+                if not batch:
+                    import webbrowser
+                    webbrowser.open(str(report_path))
             except OSError as exc:
                 print(f"\nWaarschuwing: HTML-rapport kon niet worden aangemaakt: {exc}")
+            try:
+                update = update_dashboard(added_tickets, screenshot_paths, reports_dir, state)
+                print(f"Dashboard: {update.index} ({len(update.changed_months)} maand(en) bijgewerkt)")
+            except OSError as exc:
+                print(f"Waarschuwing: dashboard kon niet worden bijgewerkt: {exc}")
+
+
+def _watch_interval() -> float:
+    """WATCH_INTERVAL uit config (seconden), standaard 5 minuten."""
+    interval = getattr(config, "WATCH_INTERVAL", DEFAULT_WATCH_INTERVAL)
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+        return DEFAULT_WATCH_INTERVAL
+    return float(interval)
+
+
+def _watch_delay(interval: float, errors: int) -> float:
+    """Wachttijd tot de volgende cyclus: verdubbelt per opeenvolgende Gmail-fout."""
+    return min(interval * 2 ** min(errors, 16), max(interval, WATCH_MAX_BACKOFF))
+
+
+def watch(batch: bool = False, max_cycles: int | None = None) -> None:
+    """
+    Blijf draaien en verwerk nieuwe NMBS-mails zodra ze binnenkomen.
+
+    De Gmail-service wordt één keer opgebouwd en blijft open, net als de
+    Chrome-sessie voor screenshots. Na een eerste volledige ophaalronde kost
+    elke cyclus zonder nieuwe mail één history.list-aanroep; enkel als er iets
+    bijkwam wordt de lijst opgehaald en worden de nog onbekende berichten
+    gedownload. Nieuwe tickets worden klaargezet voor --review, of met
+    batch=True meteen volgens de regels verwerkt. Stop met Ctrl+C.
+
+    Een voorbijgaande Gmail-fout (netwerk, time-out, 5xx) stopt het volgen
+    niet: ze wordt gemeld en de volgende poging komt steeds later, tot het
+    weer lukt. Mails zonder leesbare HTML worden maar één keer gedownload.
+    """
+    from gmail_client import TRANSIENT_ERRORS
+
+    interval = _watch_interval()
+    print(f"NMBS Onkostennota -- Gmail volgen (elke {interval:.0f} s, stop met Ctrl+C)\n")
+    try:
+        service = get_gmail_service(
+            config.CLIENT_SECRET_PATH, config.TOKEN_PATH,
+            getattr(config, "GMAIL_API_ENDPOINT", None),
+        )
+    except FileNotFoundError as exc:
+        print(f"\nFout: {exc}")
+        sys.exit(1)
+
+    history_id: str | None = None  # pas opgevraagd in de eerste geslaagde cyclus
+    seen: set[str] = set()  # gedownloade berichten, ook die zonder leesbare HTML
+    changed = True  # eerste cyclus: alles bekijken
+    errors = 0      # opeenvolgende Gmail-fouten
+    cycle = 0
+
+    def report_error(exc: Exception) -> None:
+        delay = _watch_delay(interval, errors)
+        print(f"[{datetime.now():%H:%M:%S}] Gmail-fout: {exc}. Nieuwe poging over {delay:.0f} s.")
+
+    try:
+        while True:
+            cycle += 1
+            if changed:
+                unreadable: set[str] = set()
+                try:
+                    if history_id is None:
+                        # Vóór het ophalen: wat tijdens het ophalen binnenkomt, meldt de volgende check
+                        history_id = current_history_id(service)
+                    raw_emails = fetch_nmbs_emails(
+                        config.CLIENT_SECRET_PATH, config.TOKEN_PATH,
+                        service=service, skip_ids=seen, unreadable=unreadable,
+                    )
+                except TRANSIENT_ERRORS as exc:
+                    errors += 1
+                    report_error(exc)  # changed blijft True: volgende cyclus opnieuw
+                else:
+                    errors = 0
+                    changed = False
+                    seen.update(unreadable)
+                    seen.update(msg_id for msg_id, _, _ in raw_emails)
+                    if raw_emails:
+                        print(f"[{datetime.now():%H:%M:%S}] {len(raw_emails)} nieuwe mail(s).")
+                        if batch:
+                            main(batch=True, raw_emails=raw_emails)
+                        else:
+                            sync(raw_emails=raw_emails)
+                        print()
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+            time.sleep(_watch_delay(interval, errors))
+            if changed:
+                continue  # het ophalen mislukte; history_id is nog niet verder gezet
+            try:
+                changed, history_id = check_for_new_messages(service, history_id)
+                errors = 0
+            except TRANSIENT_ERRORS as exc:
+                errors += 1
+                report_error(exc)
+    except KeyboardInterrupt:
+        print("\nGestopt.")
+
+
+@contextmanager
+def using_config(cfg):
+    """Laat alle functies in deze module tijdelijk cfg gebruiken in plaats van config.py."""
+    global config
+    previous = config
+    config = cfg
+    try:
+        yield cfg
+    finally:
+        config = previous
+
+
+def prefetch_emails(profiles, max_workers: int = 4) -> dict[str, list[tuple[str, str, str]]]:
+    """
+    Haal de NMBS-mails van alle profielen tegelijk op, elk met zijn eigen token.
+
+    Het ophalen wacht vooral op het netwerk, dus een thread per mailbox
+    spaart bijna de hele wachttijd van de andere profielen uit. Het aanmelden
+    zelf (token verversen of de browser) gebeurt één profiel tegelijk. Profielen
+    zonder token.json (eerste aanmelding via de browser) en profielen waarbij
+    het ophalen mislukt, ontbreken in het resultaat; die halen hun mails
+    daarna zelf op, met de gewone foutmeldingen.
+    """
+    ready = [(name, cfg) for name, cfg in profiles if Path(cfg.TOKEN_PATH).exists()]
+    if not ready:
+        return {}
+    print(f"Mails ophalen voor {len(ready)} profiel(en)...")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ready)))) as pool:
+        futures = {
+            name: pool.submit(
+                fetch_nmbs_emails, cfg.CLIENT_SECRET_PATH, cfg.TOKEN_PATH,
+                api_endpoint=getattr(cfg, "GMAIL_API_ENDPOINT", None),
+            )
+            for name, cfg in ready
+        }
+    fetched: dict[str, list[tuple[str, str, str]]] = {}
+    for name, future in futures.items():
+        try:
+            fetched[name] = future.result()
+        except Exception as exc:
+            print(f"  {name}: ophalen mislukt ({exc}); wordt opnieuw geprobeerd.")
+    return fetched
+
+
+def run_profiles(profiles, command, fetch: bool = False) -> None:
+    """
+    Voer command(raw_emails) uit voor elk profiel, na elkaar in dit proces.
+
+    Met fetch=True worden de mails eerst voor alle profielen tegelijk
+    opgehaald (prefetch_emails). De rest deelt wat al warm is: de parser, de
+    feestdagenkalender en de Chrome-sessie voor screenshots, die pas na het
+    laatste profiel sluit. Beslissingen en vragen blijven per profiel na
+    elkaar, zodat de antwoorden niet door elkaar lopen.
+    """
+    prefetched = prefetch_emails(profiles) if fetch else {}
+    for name, cfg in profiles:
+        print(f"\n===== Profiel: {name} ({getattr(cfg, 'EMPLOYEE_NAME', name)}) =====\n")
+        Path(cfg.STATE_FILE).parent.mkdir(parents=True, exist_ok=True)
+        with using_config(cfg):
+            command(prefetched.get(name))
+
+
+def run_profiled(run, out: Path | None = None) -> None:
+    """
+    Voer run() uit met de meetpunten aan en toon daarna de tabel per stap.
+
+    Met out eindigend op .json komt er een JSON-trace bij; met een andere
+    extensie loopt ook cProfile mee en worden de statistieken daar bewaard
+    (te bekijken met `python -m pstats BESTAND`).
+    """
+    import cProfile
+
+    as_trace = out is not None and out.suffix.lower() == ".json"
+    profiler = cProfile.Profile() if out is not None and not as_trace else None
+    profiling.enable(trace=as_trace)
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        run()
+    finally:
+        if profiler:
+            profiler.disable()
+        profiling.disable()
+        print(f"\nProfiel ({time.perf_counter() - started:.2f} s totaal):")
+        print(profiling.format_profile_table())
+        if as_trace:
+            profiling.dump_json(out)
+            print(f"Trace bewaard: {out}")
+        elif profiler:
+            profiler.dump_stats(str(out))
+            print(f"cProfile-uitvoer bewaard: {out}")
+
+
+def run_memprofiled(run) -> None:
+    """Voer run() uit met tracemalloc aan en toon daarna het geheugengebruik per stap."""
+    memprofile.start()
+    try:
+        run()
+    finally:
+        memprofile.checkpoint("einde")
+        print("\nGeheugen per stap (tracemalloc, grootste modules):")
+        print(memprofile.format_memory_report())
+        memprofile.stop()
+
+
+def make_month_pdf(month: int, year: int) -> None:
+    """Maak of vul de PDF-bundel van één maand aan en meld het resultaat."""
+    state = load_state(config.STATE_FILE)
+    print(f"NMBS Onkostennota -- PDF voor {DUTCH_MONTHS[month]} {year}\n")
+    try:
+        result = build_month_pdf(state, month, year, config.SCREENSHOTS_DIR)
+    except (RuntimeError, OSError) as exc:
+        print(f"  Fout: {exc}")
+        return
+
+    if result.path is None and not result.failed:
+        print("  Geen verwerkte tickets voor deze maand.")
+        return
+    if result.added:
+        print(f"  {len(result.added)} ticket(s) toegevoegd.")
+    elif result.path is not None and not result.failed:
+        print("  Geen nieuwe tickets; de PDF is al volledig.")
+    for order, reason in sorted(result.failed.items()):
+        print(f"  Niet opgenomen: {order} -- {reason}")
+    if result.path is not None:
+        print(f"\nOK  {result.total} ticket(s) in {result.path}")
+
+
+def make_history_report() -> None:
+    """Maak een HTML-rapport van alle verwerkte tickets, over alle maanden."""
+    print("NMBS Onkostennota -- overzicht van alle maanden\n")
+    reports_dir = getattr(config, "REPORTS_DIR", None)
+    if not reports_dir:
+        print("  REPORTS_DIR is niet ingesteld in config.py; er wordt geen rapport gemaakt.")
+        return
+    state = load_state(config.STATE_FILE)
+    unreadable: dict[str, str] = {}
+    try:
+        report_path = generate_history_report(
+            state, config.EXCEL_DIR, config.SCREENSHOTS_DIR, reports_dir, unreadable
+        )
+    except OSError as exc:
+        print(f"  Fout: {exc}")
+        return
+    for name, error in sorted(unreadable.items()):
+        print(f"  Niet gelezen: {name} -- {error} (bedragen als -)")
+    print(f"OK  HTML-rapport: {report_path}")
+    import webbrowser
+    webbrowser.open(str(report_path))
+
+
+def show_summary() -> None:
+    """Toon de totalen per maand en per jaar uit de state, zonder een werkmap te openen."""
+    state = load_state(config.STATE_FILE)
+    print("NMBS Onkostennota -- totalen\n")
+    had_aggregates = "aggregates" in state
+    print(format_month_totals(month_aggregates(state)))
+    if not had_aggregates and state.get("metadata"):
+        # Eenmalig opgebouwd uit de metadata; bewaren zodat volgende keren meteen kunnen
+        save_state(state, config.STATE_FILE)
+
+
+def _rerender_screenshots(orders: list[str], state: dict) -> None:
+    """Maak ontbrekende screenshots opnieuw uit de bewaarde e-mails in screenshots/.cache."""
+    tickets: list[TicketData] = []
+    for order in orders:
+        digest = (get_metadata(order, state) or {}).get("html_sha256")
+        path = cached_html_path(config.SCREENSHOTS_DIR, digest) if digest else None
+        if path is None or not path.exists():
+            print(f"  {order}: e-mail niet bewaard, screenshot niet te herstellen.")
+            continue
+        try:
+            ticket = parse_nmbs_email(
+                path.read_text(encoding="utf-8"),
+                home_station=getattr(config, "HOME_STATION", None),
+                office_station=getattr(config, "OFFICE_STATION", None),
+            )
+        except ParseError as exc:
+            print(f"  {order}: {exc}")
+            continue
+        tickets.append(dataclasses.replace(ticket, order_number=order))
+    if not tickets:
+        return
+    results = save_screenshots(
+        tickets, config.SCREENSHOTS_DIR, render_settings_from_config(config)
+    )
+    for order, result in sorted(results.items()):
+        if isinstance(result, Path):
+            print(f"  OK  {order}: {result.name}")
+        else:
+            print(f"  {order}: {result}")
+
+
+def _refresh_dashboard(state: dict, months: set[str]) -> None:
+    """Werk een bestaand dashboard bij na een herstel: totalen uit de state, verwijderde tickets eruit."""
+    reports_dir = getattr(config, "REPORTS_DIR", None)
+    if not reports_dir or not (dashboard_dir(reports_dir) / "index.html").exists():
+        return
+    try:
+        update_dashboard([], None, reports_dir, state, refresh=months)
+        print("  Dashboard bijgewerkt.")
+    except OSError as exc:
+        print(f"  Waarschuwing: dashboard kon niet worden bijgewerkt: {exc}")
+
+
+def verify_state(repair: bool = False) -> bool:
+    """
+    Vergelijk state, Excel en screenshots en meld de verschillen (--verify).
+
+    Met repair worden tickets waarvan de Excel-rij verdwenen is uit de state
+    gehaald (de volgende run biedt ze opnieuw aan) en ontbrekende screenshots
+    opnieuw gemaakt uit de bewaarde e-mails. Onbekende Excel-rijen en
+    losse screenshots worden enkel gemeld. Geeft True als alles klopt.
+    """
+    print("NMBS Onkostennota -- controle van state, Excel en screenshots\n")
+    state = load_state(config.STATE_FILE)
+    pending = set(load_outbox(outbox_file(config.STATE_FILE)))
+    pending |= set(load_review_queue(review_file(config.STATE_FILE)))
+    report = verify(state, config.EXCEL_DIR, config.SCREENSHOTS_DIR, pending)
+    print(format_verify_report(report))
+    if report.ok or not repair:
+        if not report.ok:
+            print("\nHerstel met: python main.py --verify --repair")
+        return report.ok
+
+    print("\nHerstellen...")
+    if report.missing_rows:
+        months = set()
+        for order in report.missing_rows:
+            meta = get_metadata(order, state)
+            if meta is not None:
+                months.add(month_key(excel_serial_to_date(meta["travel_date_serial"])))
+            unmark_processed(order, state)
+        save_state(state, config.STATE_FILE)
+        print(
+            f"  {len(report.missing_rows)} ticket(s) uit de verwerkte lijst gehaald;"
+            " de volgende run biedt ze opnieuw aan."
+        )
+        _refresh_dashboard(state, months)
+    if report.missing_screenshots:
+        try:
+            _rerender_screenshots(report.missing_screenshots, state)
+        finally:
+            close_session()
+    if report.unknown_rows or report.orphan_screenshots:
+        print(
+            "  Onbekende Excel-rijen en losse screenshots worden niet automatisch"
+            " verwijderd; kijk ze na en verwijder ze eventueel met de hand."
+        )
+    return False
 
 
 def reset_state() -> None:
@@ -230,13 +1097,21 @@ def reset_state() -> None:
     processed_orders = state.get("processed", [])
     n_processed = len(processed_orders)
     n_skipped = len(state.get("skipped_weekend", []))
+    outbox_path = outbox_file(config.STATE_FILE)
+    n_pending = len(load_outbox(outbox_path))
+    review_path = review_file(config.STATE_FILE)
+    n_review = len(load_review_queue(review_path))
 
     print("NMBS Onkostennota -- verwerkte tickets wissen\n")
     print(f"  Verwerkte tickets   : {n_processed}")
     print(f"  Weekend-overgeslagen: {n_skipped}")
+    if n_pending:
+        print(f"  In de wachtrij      : {n_pending}")
+    if n_review:
+        print(f"  Klaargezet (review) : {n_review}")
     print()
 
-    if n_processed == 0 and n_skipped == 0:
+    if n_processed == 0 and n_skipped == 0 and n_pending == 0 and n_review == 0:
         print("Niets te wissen -- de lijst is al leeg.")
         return
 
@@ -277,10 +1152,19 @@ def reset_state() -> None:
             except OSError as exc:
                 print(f"\n  Fout: {exc}")
                 print("  Reset afgebroken. Los het probleem op en probeer opnieuw.")
+                # De al verwijderde rijen horen niet meer bij de verwerkte tickets
+                save_state(state, config.STATE_FILE)
                 return
+            unmark_processed(order, state)
 
     if config.STATE_FILE.exists():
         config.STATE_FILE.unlink()
+    outbox_path.unlink(missing_ok=True)
+    review_path.unlink(missing_ok=True)
+    reports_dir = getattr(config, "REPORTS_DIR", None)
+    if reports_dir:
+        # Het dashboard toont verwerkte tickets; het wordt bij volgende runs opnieuw opgebouwd
+        shutil.rmtree(dashboard_dir(reports_dir), ignore_errors=True)
     print(f"OK  {config.STATE_FILE.name} gewist. Alle tickets worden opnieuw aangeboden.")
 
 
@@ -297,10 +1181,149 @@ if __name__ == "__main__":
         default=None,
         help="Verwerk alleen tickets van deze maand (bijv. 'januari' of 'maart 2025')",
     )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wacht tot open Excel-bestanden gesloten zijn in plaats van ze in de wachtrij te laten",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Niet-interactief: aanvaard woon-werktickets, sla niet-werkdagen over, laat de rest staan",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Haal nieuwe tickets op en zet ze klaar voor --review, zonder vragen",
+    )
+    parser.add_argument(
+        "--review",
+        action="store_true",
+        help="Beoordeel de klaargezette tickets zonder Gmail te raadplegen",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Toon alle tickets in één tabel en beslis per bereik ('a 1-20', 's 21', 'a rest')",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Blijf draaien en haal nieuwe mails op zodra ze binnenkomen (met --batch: meteen verwerken)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Toon na afloop hoeveel tijd elke stap kostte (Gmail, parsen, Excel, screenshots, ...)",
+    )
+    parser.add_argument(
+        "--profile-out",
+        type=str,
+        default=None,
+        metavar="BESTAND",
+        help="Bewaar de meting: .json voor een trace (chrome://tracing), anders cProfile-uitvoer",
+    )
+    parser.add_argument(
+        "--history-report",
+        action="store_true",
+        help="Maak een HTML-rapport van alle verwerkte tickets, maand per maand",
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Toon de totalen per maand en per jaar (aantal, Vervoer, richtingen) zonder Excel te openen",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Vergelijk de state met de Excel-rijen en de screenshots en meld de verschillen",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Met --verify: haal tickets zonder Excel-rij uit de state en maak ontbrekende screenshots opnieuw",
+    )
+    parser.add_argument(
+        "--memprofile",
+        action="store_true",
+        help="Toon na afloop het geheugengebruik per stap en de modules die het meeste innemen",
+    )
+    parser.add_argument(
+        "--pdf",
+        type=str,
+        default=None,
+        metavar="MAAND",
+        help="Bundel de verwerkte tickets van deze maand in één PDF (bijv. 'februari 2026')",
+    )
+    parser.add_argument(
+        "--user",
+        action="append",
+        default=None,
+        metavar="PROFIEL",
+        help="Enkel dit profiel uit PROFILES in config.py (herhaalbaar); standaard alle profielen",
+    )
     args = parser.parse_args()
+    if args.repair and not args.verify:
+        parser.error("--repair werkt enkel samen met --verify")
+    try:
+        profiles = select_profiles(config, args.user)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.watch and len(profiles) > 1:
+        parser.error("--watch volgt één mailbox; kies een profiel met --user")
 
-    if args.reset:
-        reset_state()
+    failed = False
+
+    def run_command(raw_emails=None) -> None:
+        global failed
+        if args.reset:
+            reset_state()
+        elif args.sync:
+            sync(raw_emails=raw_emails)
+        elif args.watch:
+            watch(batch=args.batch)
+        elif args.history_report:
+            make_history_report()
+        elif args.summary:
+            show_summary()
+        elif args.verify:
+            if not verify_state(repair=args.repair):
+                failed = True
+        elif args.pdf:
+            make_month_pdf(*parse_month_arg(args.pdf))
+        else:
+            main(
+                month_filter=parse_month_arg(args.month) if args.month else None,
+                wait=args.wait,
+                batch=args.batch,
+                fetch=not args.review,
+                bulk=args.bulk,
+                raw_emails=raw_emails,
+            )
+
+    def run() -> None:
+        try:
+            if profiles:
+                fetches = args.sync or not (
+                    args.reset or args.watch or args.history_report or args.summary
+                    or args.verify or args.pdf or args.review
+                )
+                run_profiles(profiles, run_command, fetch=fetches)
+            else:
+                run_command()
+        finally:
+            close_session()
+
+    if args.profile or args.profile_out:
+        timed_run = run
+        out = Path(args.profile_out) if args.profile_out else None
+
+        def run() -> None:
+            run_profiled(timed_run, out)
+
+    if args.memprofile:
+        run_memprofiled(run)
     else:
-        month_filter = parse_month_arg(args.month) if args.month else None
-        main(month_filter=month_filter)
+        run()
+    if failed:
+        sys.exit(1)
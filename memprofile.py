@@ -0,0 +1,118 @@
+"""
+Geheugenmeting per verwerkingsstap (--memprofile), met tracemalloc.
+
+main zet op de grenzen van zijn stappen een checkpoint("ophalen"),
+checkpoint("excel"), ... Zolang de meting niet aan staat, kost dat enkel een
+vlagcontrole. Staat ze aan, dan wordt op elk checkpoint een snapshot genomen
+en per module opgeteld hoeveel geheugen er op dat moment in gebruik is
+(bijv. email_parser.py, bs4, openpyxl), plus de piek sinds de start.
+
+tracemalloc ziet enkel Python-allocaties (geen C-buffers van lxml) en
+vertraagt de run merkbaar; gebruik het om te vergelijken, niet als absolute RSS.
+"""
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+_PROJECT_DIR = Path(__file__).resolve().parent
+_STDLIB_DIR = Path(tracemalloc.__file__).resolve().parent
+
+
+@dataclass
+class Checkpoint:
+    label: str
+    current: int                 # bytes in gebruik op het checkpoint
+    peak: int                    # hoogste waarde sinds start()
+    by_module: dict[str, int]    # module -> bytes in gebruik
+
+
+_checkpoints: list[Checkpoint] = []
+
+
+def start(frames: int = 1) -> None:
+    """Start de meting (en wist eerdere checkpoints)."""
+    _checkpoints.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    tracemalloc.start(frames)
+
+
+def stop() -> None:
+    tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def module_name(filename: str) -> str:
+    """
+    Korte naam voor de bron van een allocatie: het bestand voor projectcode
+    (email_parser.py, tests/conftest.py), het topniveaupakket voor
+    geïnstalleerde pakketten (bs4, openpyxl) en de modulenaam voor de stdlib.
+    """
+    path = Path(filename)
+    if not path.is_absolute():
+        return filename  # bijv. <frozen importlib._bootstrap>
+    parts = path.parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            rest = parts[parts.index(marker) + 1:]
+            return rest[0].removesuffix(".py") if rest else filename
+    try:
+        return path.relative_to(_PROJECT_DIR).as_posix()
+    except ValueError:
+        pass
+    try:
+        return path.relative_to(_STDLIB_DIR).parts[0].removesuffix(".py")
+    except ValueError:
+        return path.name
+
+
+def checkpoint(label: str) -> Checkpoint | None:
+    """Neem een snapshot en tel het gebruik per module op; None als de meting uit staat."""
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    by_module: dict[str, int] = {}
+    for stat in snapshot.statistics("filename"):
+        name = module_name(stat.traceback[0].filename)
+        by_module[name] = by_module.get(name, 0) + stat.size
+    point = Checkpoint(label, current, peak, by_module)
+    _checkpoints.append(point)
+    return point
+
+
+def checkpoints() -> list[Checkpoint]:
+    return list(_checkpoints)
+
+
+def peak_bytes() -> int:
+    """Hoogste geheugengebruik sinds start() (0 als de meting uit staat)."""
+    return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def format_memory_report(top: int = 8) -> str:
+    """Per checkpoint het gebruik en de piek, met de grootste modules en hun verschil met het vorige."""
+    if not _checkpoints:
+        return "Geen geheugenmetingen."
+    lines = []
+    previous: dict[str, int] = {}
+    for point in _checkpoints:
+        lines.append(f"[{point.label}]  in gebruik {_mb(point.current)}, piek {_mb(point.peak)}")
+        ranked = sorted(point.by_module.items(), key=lambda item: -item[1])[:top]
+        width = max((len(name) for name, _ in ranked), default=0)
+        for name, size in ranked:
+            delta = size - previous.get(name, 0)
+            sign = "+" if delta >= 0 else "-"
+            lines.append(f"    {name:<{width}}  {_mb(size):>9}  ({sign}{_mb(abs(delta))})")
+        previous = point.by_module
+    return "\n".join(lines)
@@ -0,0 +1,59 @@
+"""
+Duurzame wachtrij (outbox) voor aanvaarde tickets die nog niet in Excel staan.
+
+Elk aanvaard ticket wordt meteen aan outbox.jsonl toegevoegd, naast het
+state-bestand. Pas nadat de rij in het maandbestand opgeslagen is, verdwijnt
+het ticket uit de outbox. Staat een maandbestand open in Excel, dan blijft het
+ticket gewoon in de outbox en wordt het bij de volgende run (of met --wait
+zodra het bestand gesloten is) alsnog weggeschreven, zonder opnieuw te vragen.
+"""
+import json
+import os
+from pathlib import Path
+
+from email_parser import TicketData, ticket_from_dict, ticket_to_dict
+
+
+def outbox_file(state_file: Path) -> Path:
+    """Het outbox-bestand hoort bij het state-bestand (zelfde map)."""
+    return state_file.with_name("outbox.jsonl")
+
+
+def load_outbox(path: Path) -> dict[str, TicketData]:
+    """Laad de openstaande tickets, geindexeerd op bestelnummer."""
+    outbox: dict[str, TicketData] = {}
+    if not path.exists():
+        return outbox
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                ticket = ticket_from_dict(json.loads(line))
+            except (json.JSONDecodeError, KeyError, ValueError) as exc:
+                # Een half geschreven laatste regel (bijv. na een crash)
+                print(f"  Waarschuwing: onleesbare regel in {path.name} ({exc}), overgeslagen.")
+                continue
+            outbox[ticket.order_number] = ticket
+    return outbox
+
+
+def append_to_outbox(ticket: TicketData, path: Path) -> None:
+    """Voeg een ticket toe aan de outbox (alleen een regel toevoegen, geen herschrijving)."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(ticket_to_dict(ticket), ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def save_outbox(outbox: dict[str, TicketData], path: Path) -> None:
+    """Herschrijf de outbox met de resterende tickets; verwijdert het bestand als ze leeg is."""
+    if not outbox:
+        path.unlink(missing_ok=True)
+        return
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for ticket in outbox.values():
+            f.write(json.dumps(ticket_to_dict(ticket), ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,149 @@
+"""
+Bundel alle tickets van een maand in één PDF om in te dienen,
+bijv. screenshots/Februari 2026/Tickets_Februari_2026.pdf.
+
+Elke ticket-e-mail wordt één keer afgedrukt via de gedeelde Chrome-sessie
+(screenshot_gen.save_pdf_pages) en in de cache bewaard. Een manifest houdt
+bij welke tickets al in de bundel zitten, zodat een volgende run alleen de
+pagina's van nieuwe tickets toevoegt, en welke niet afgedrukt konden worden:
+die worden bij elke volgende run opnieuw geprobeerd en gemeld.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from constants import DUTCH_MONTHS
+from excel_dates import excel_serial_to_date
+from screenshot_gen import CACHE_DIRNAME, save_pdf_pages
+
+
+@dataclass
+class BundleResult:
+    path: Path | None             # None als er (nog) geen bundel is
+    added: list[str]              # bestelnummers die deze keer toegevoegd zijn
+    total: int                    # aantal tickets in de bundel
+    failed: dict[str, str] = field(default_factory=dict)  # bestelnummer -> reden
+
+
+def bundle_path(screenshots_dir: Path, month: int, year: int) -> Path:
+    name = f"{DUTCH_MONTHS[month]} {year}"
+    return screenshots_dir / name / f"Tickets_{DUTCH_MONTHS[month]}_{year}.pdf"
+
+
+def _manifest_path(screenshots_dir: Path, month: int, year: int) -> Path:
+    return screenshots_dir / CACHE_DIRNAME / "pdf" / "bundles" / f"{year}-{month:02d}.json"
+
+
+def _load_manifest(path: Path) -> tuple[list[str], dict[str, str]]:
+    """(bestelnummers in de bundel, mislukte bestelnummers -> reden)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return list(data["orders"]), dict(data.get("failed") or {})
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+        return [], {}
+
+
+def _save_manifest(path: Path, orders: list[str], failed: dict[str, str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"orders": orders, "failed": failed}, f, indent=2)
+
+
+def month_entries(
+    state: dict, month: int, year: int
+) -> tuple[list[tuple[str, date, str]], list[str]]:
+    """
+    Zoek de verwerkte tickets van een maand in de state-metadata.
+
+    Geeft (bestelnummer, reisdatum, html_sha256) chronologisch terug, plus de
+    bestelnummers van die maand zonder html_sha256 (verwerkt voor de PDF-functie
+    bestond; hun e-mail is niet bewaard).
+    """
+    entries: list[tuple[str, date, str]] = []
+    without_html: list[str] = []
+    for order, meta in state.get("metadata", {}).items():
+        serial = meta.get("travel_date_serial")
+        if serial is None:
+            continue
+        travel_date = excel_serial_to_date(serial)
+        if (travel_date.month, travel_date.year) != (month, year):
+            continue
+        if meta.get("html_sha256"):
+            entries.append((order, travel_date, meta["html_sha256"]))
+        else:
+            without_html.append(order)
+    entries.sort(key=lambda e: (e[1], e[0]))
+    return entries, sorted(without_html)
+
+
+def build_month_pdf(
+    state: dict, month: int, year: int, screenshots_dir: Path
+) -> BundleResult:
+    """
+    Maak of vul de PDF-bundel van een maand aan.
+
+    Alleen tickets die nog niet in de bundel zitten worden afgedrukt en
+    achteraan toegevoegd. Valt een nieuw ticket vroeger dan het laatste in de
+    bundel, of is een ticket uit de bundel verdwenen (bijv. na --reset), dan
+    wordt de bundel opnieuw samengesteld uit de gecachete pagina's zodat de
+    volgorde chronologisch blijft; Chrome is daarvoor niet opnieuw nodig.
+
+    Pagina's die niet afgedrukt konden worden, komen als mislukt in het
+    manifest (en in BundleResult.failed); een volgende run probeert ze opnieuw.
+    Gooit een RuntimeError als pypdf niet geïnstalleerd is.
+    """
+    entries, without_html = month_entries(state, month, year)
+    target = bundle_path(screenshots_dir, month, year)
+    manifest_path = _manifest_path(screenshots_dir, month, year)
+    failed = {order: "e-mail niet bewaard (verwerkt met een oudere versie)" for order in without_html}
+
+    in_bundle, _ = _load_manifest(manifest_path)
+    bundled = in_bundle if target.exists() else []
+    dates = {order: travel_date for order, travel_date, _ in entries}
+    new = [e for e in entries if e[0] not in bundled]
+    if any(order not in dates for order in bundled) or (
+        new and bundled and min(e[1] for e in new) < max(dates[o] for o in bundled)
+    ):
+        bundled, new = [], entries
+
+    if not new:
+        return BundleResult(target if target.exists() else None, [], len(bundled), failed)
+
+    pages = save_pdf_pages([digest for _, _, digest in new], screenshots_dir)
+    ok: list[tuple[str, Path]] = []
+    for order, _, digest in new:
+        page = pages[digest]
+        if isinstance(page, Path):
+            ok.append((order, page))
+        else:
+            failed[order] = str(page)
+    # Enkel de afdrukfouten; tickets zonder bewaarde e-mail komen niet in het manifest
+    print_failures = {order: reason for order, reason in failed.items() if order in dates}
+    if not ok:
+        if target.exists():
+            # De bestaande bundel blijft; onthoud wat er nog ontbreekt
+            _save_manifest(manifest_path, in_bundle, print_failures)
+        return BundleResult(target if target.exists() else None, [], len(bundled), failed)
+
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("pypdf is niet geïnstalleerd. Voer uit: pip install pypdf")
+
+    writer = PdfWriter(clone_from=target) if bundled else PdfWriter()
+    for _, page in ok:
+        writer.append(page)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".pdf.tmp")
+    with open(tmp, "wb") as f:
+        writer.write(f)
+    os.replace(tmp, target)
+
+    orders = bundled + [order for order, _ in ok]
+    _save_manifest(manifest_path, orders, print_failures)
+
+    return BundleResult(target, [order for order, _ in ok], len(orders), failed)
@@ -0,0 +1,72 @@
+"""
+Meerdere profielen (collega's) in één installatie, via PROFILES in config.py.
+
+Elk profiel is een dict met instellingen die die van config.py overschrijven,
+bijv. EMPLOYEE_NAME, HOME_STATION of EXTRA_DAYS_OFF. Wat een profiel niet
+zelf opgeeft, komt uit config.py; enkel de mailbox en de bestanden krijgen
+standaard een eigen plaats onder profiles/<naam>/:
+
+  token.json       de Gmail-toegang van dat profiel (TOKEN_PATH)
+  processed.json   de verwerkte tickets (STATE_FILE), met wachtrij en reviewlijst ernaast
+  data/            de maandbestanden (EXCEL_DIR)
+  screenshots/     de screenshots (SCREENSHOTS_DIR)
+  reports/         de HTML-rapporten (REPORTS_DIR, tenzij uitgeschakeld)
+
+client_secret.json (de Google Cloud-app) wordt gedeeld. Zonder PROFILES
+werkt alles zoals voordien met config.py alleen.
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+PROFILES_DIRNAME = "profiles"
+
+# Instelling -> standaardpad binnen de profielmap
+_PER_PROFILE_PATHS = {
+    "TOKEN_PATH": "token.json",
+    "STATE_FILE": "processed.json",
+    "EXCEL_DIR": "data",
+    "SCREENSHOTS_DIR": "screenshots",
+    "REPORTS_DIR": "reports",
+}
+
+
+def profile_names(cfg) -> list[str]:
+    """De namen uit PROFILES, in de volgorde van config.py (leeg zonder profielen)."""
+    return list(getattr(cfg, "PROFILES", None) or {})
+
+
+def profile_dir(cfg, name: str) -> Path:
+    base = getattr(cfg, "BASE_DIR", None) or Path(cfg.STATE_FILE).parent
+    return Path(base) / PROFILES_DIRNAME / name
+
+
+def profile_config(cfg, name: str) -> SimpleNamespace:
+    """
+    De instellingen van één profiel: die van config.py, met de eigen paden
+    onder profiles/<naam>/ en daarover de waarden uit PROFILES[name].
+    Gooit een ValueError voor een onbekend profiel.
+    """
+    profiles = getattr(cfg, "PROFILES", None) or {}
+    if name not in profiles:
+        known = ", ".join(profiles) or "geen"
+        raise ValueError(f"Onbekend profiel '{name}' (in config.py: {known}).")
+
+    settings = {key: getattr(cfg, key) for key in dir(cfg) if key.isupper()}
+    settings.pop("PROFILES", None)
+    directory = profile_dir(cfg, name)
+    for key, relative in _PER_PROFILE_PATHS.items():
+        if key == "REPORTS_DIR" and not settings.get("REPORTS_DIR"):
+            continue  # rapporten staan uit in config.py: ook per profiel uit
+        settings[key] = directory / relative
+    settings.update(profiles[name])
+    settings["PROFILE_NAME"] = name
+    return SimpleNamespace(**settings)
+
+
+def select_profiles(cfg, names: list[str] | None = None) -> list[tuple[str, SimpleNamespace]]:
+    """
+    (naam, instellingen) van de gevraagde profielen, of van alle profielen
+    als names leeg is. Zonder PROFILES in config.py: een lege lijst.
+    """
+    wanted = names or profile_names(cfg)
+    return [(name, profile_config(cfg, name)) for name in wanted]
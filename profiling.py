@@ -0,0 +1,158 @@
+"""
+Lichte meetpunten per verwerkingsstap (--profile).
+
+Modules markeren hun stappen met `with stage("gmail.get") as s:` (optioneel
+`s.bytes = ...`) of met de decorator @timed("parse"). Zolang de profiler niet
+aan staat, kost een meetpunt enkel een functieaanroep en een vlagcontrole.
+
+Per stap worden de totale wandkloktijd, het aantal aanroepen en het aantal
+bytes bijgehouden. Stappen uit de screenshot-thread lopen parallel met de
+rest, dus de tijden tellen niet op tot de looptijd van de run.
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+
+
+class _Span:
+    """Wat een meetpunt teruggeeft; bytes mag binnen het with-blok ingevuld worden."""
+    __slots__ = ("bytes",)
+
+    def __init__(self, nbytes: int = 0):
+        self.bytes = nbytes
+
+
+_enabled = False
+_trace_enabled = False
+_started = 0.0
+_stats: dict[str, StageStats] = {}
+_events: list[dict] = []
+_lock = threading.Lock()
+
+
+def enable(trace: bool = False) -> None:
+    """Zet de meetpunten aan (en wist eerdere metingen). trace=True bewaart ook elk event."""
+    global _enabled, _trace_enabled, _started
+    reset()
+    _started = time.perf_counter()
+    _trace_enabled = trace
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+@contextmanager
+def stage(name: str, nbytes: int = 0):
+    """Meet de duur van het with-blok onder de naam van de stap."""
+    span = _Span(nbytes)
+    if not _enabled:
+        yield span
+        return
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            stats = _stats.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.bytes += span.bytes
+            if _trace_enabled:
+                _events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((start - _started) * 1e6),
+                    "dur": round(elapsed * 1e6),
+                    "pid": 1,
+                    "tid": threading.get_ident(),
+                    "args": {"bytes": span.bytes},
+                })
+
+
+def timed(name: str):
+    """Decorator-vorm van stage() voor functies die in hun geheel één stap zijn."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict[str, StageStats]:
+    """Kopie van de huidige metingen per stap."""
+    with _lock:
+        return {name: StageStats(s.calls, s.seconds, s.bytes) for name, s in _stats.items()}
+
+
+def _format_bytes(n: int) -> str:
+    if not n:
+        return ""
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_profile_table() -> str:
+    """ASCII-tabel met per stap tijd, aanroepen, gemiddelde en bytes; traagste eerst."""
+    stats = snapshot()
+    if not stats:
+        return "Geen metingen."
+    w_name = max(len("Stap"), *(len(n) for n in stats))
+    header = f"| {'Stap':<{w_name}} | {'Tijd (s)':>9} | {'Aantal':>7} | {'Gem. (ms)':>9} | {'Bytes':>9} |"
+    sep = f"+{'-' * (w_name + 2)}+{'-' * 11}+{'-' * 9}+{'-' * 11}+{'-' * 11}+"
+    lines = [sep, header, sep]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1].seconds):
+        avg_ms = s.seconds / s.calls * 1000 if s.calls else 0.0
+        lines.append(
+            f"| {name:<{w_name}} | {s.seconds:>9.3f} | {s.calls:>7} | {avg_ms:>9.2f}"
+            f" | {_format_bytes(s.bytes):>9} |"
+        )
+    lines.append(sep)
+    return "\n".join(lines)
+
+
+def dump_json(path: Path) -> None:
+    """
+    Schrijf de metingen als JSON: een samenvatting per stap plus (met trace=True)
+    alle events in het Chrome trace-formaat, te openen in chrome://tracing of Perfetto.
+    """
+    with _lock:
+        data = {
+            "stages": {
+                name: {"calls": s.calls, "seconds": s.seconds, "bytes": s.bytes}
+                for name, s in _stats.items()
+            },
+            "traceEvents": list(_events),
+        }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
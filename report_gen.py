@@ -1,14 +1,34 @@
 """
 Genereer een samenvattingstabel (terminal) en een HTML-rapport na verwerking.
+
+HTML-rapporten worden rij per rij naar het bestand geschreven (ReportWriter),
+zodat ook een overzicht van alle verwerkte maanden (generate_history_report)
+nooit alle tickets tegelijk in het geheugen nodig heeft.
 """
-from datetime import datetime
+import html
+import os
+import re
+from collections.abc import Iterable
+from datetime import date, datetime
 from pathlib import Path
+from string import Template
+from urllib.parse import quote
 
+from constants import DUTCH_MONTHS
 from email_parser import TicketData
+from excel_dates import excel_serial_to_date
+from excel_updater import scan_month_rows
+
 
+def format_summary_table(
+    tickets: list[TicketData], status: list[str] | None = None
+) -> str:
+    """
+    Geeft een ASCII-tabel terug met alle verwerkte tickets en een totaalrij.
 
-def format_summary_table(tickets: list[TicketData]) -> str:
-    """Geeft een ASCII-tabel terug met alle verwerkte tickets en een totaalrij."""
+    Met status (één tekst per ticket) komt er een extra kolom achteraan,
+    bijv. voor het beoordelingsscherm.
+    """
     if not tickets:
         return "Geen tickets verwerkt deze sessie."
 
@@ -17,13 +37,17 @@ def format_summary_table(tickets: list[TicketData]) -> str:
     w_datum = 12
     w_omschr = 40
     w_bedrag = 10
+    w_status = max([len("Status"), *(len(s) for s in status)]) if status else 0
 
     header = (
         f"| {'Nr':>{w_nr}} | {'Datum':<{w_datum}} | {'Omschrijving':<{w_omschr}} | {'Bedrag':>{w_bedrag}} |"
     )
     sep = f"+{'-' * (w_nr + 2)}+{'-' * (w_datum + 2)}+{'-' * (w_omschr + 2)}+{'-' * (w_bedrag + 2)}+"
+    status_sep = f"{'-' * (w_status + 2)}+" if status else ""
+    if status:
+        header += f" {'Status':<{w_status}} |"
 
-    lines = [sep, header, sep]
+    lines = [sep + status_sep, header, sep + status_sep]
 
     total = 0.0
     for i, t in enumerate(tickets, 1):
@@ -33,11 +57,12 @@ def format_summary_table(tickets: list[TicketData]) -> str:
         datum = t.travel_date.strftime("%d/%m/%Y")
         bedrag = f"{t.price:.2f}"
         total += t.price
-        lines.append(
-            f"| {i:>{w_nr}} | {datum:<{w_datum}} | {desc:<{w_omschr}} | {bedrag:>{w_bedrag}} |"
-        )
+        line = f"| {i:>{w_nr}} | {datum:<{w_datum}} | {desc:<{w_omschr}} | {bedrag:>{w_bedrag}} |"
+        if status:
+            line += f" {status[i - 1]:<{w_status}} |"
+        lines.append(line)
 
-    lines.append(sep)
+    lines.append(sep + status_sep)
     totaal_label = "Totaal:"
     padding = w_nr + 2 + w_datum + 2 + w_omschr + 2 + 3  # cols before bedrag
     lines.append(f"|{' ' * padding}{totaal_label:>{w_bedrag}} |")
@@ -47,73 +72,327 @@ def format_summary_table(tickets: list[TicketData]) -> str:
     return "\n".join(lines)
 
 
-def generate_html_report(
-    tickets: list[TicketData],
-    reports_dir: Path,
-    screenshot_paths: list[Path | None] | None = None,
-) -> Path:
-    """Genereer een HTML-rapport en sla op in reports_dir. Geeft het pad terug."""
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = reports_dir / f"run_{timestamp}.html"
+def format_month_totals(aggregates: dict[str, dict]) -> str:
+    """
+    ASCII-tabel met de totalen per maand en per jaar, uit de maandtotalen
+    in de state (state.month_aggregates). Opent geen enkele werkmap.
+    """
+    if not aggregates:
+        return "Nog geen verwerkte tickets."
 
-    screenshots = screenshot_paths or []
+    sep = f"+{'-' * 17}+{'-' * 9}+{'-' * 12}+{'-' * 12}+{'-' * 12}+{'-' * 7}+{'-' * 7}+{'-' * 7}+"
+    header = (
+        f"| {'Maand':<15} | {'Tickets':>7} | {'Vervoer':>10} | {'Van':<10} | {'Tot':<10}"
+        f" | {'heen':>5} | {'terug':>5} | {'h/t':>5} |"
+    )
 
-    total = sum(t.price for t in tickets)
-    rows_html = ""
+    def row(label: str, count: int, total: float, first: str, last: str, dirs: dict) -> str:
+        return (
+            f"| {label:<15} | {count:>7} | {total:>10.2f} | {first:<10} | {last:<10}"
+            f" | {dirs.get('heen', 0):>5} | {dirs.get('terug', 0):>5}"
+            f" | {dirs.get('heen/terug', 0):>5} |"
+        )
 
-    if not tickets:
-        rows_html = (
-            '<tr><td colspan="5" style="text-align:center;padding:12px;">'
-            "Geen tickets verwerkt deze sessie.</td></tr>"
+    def fmt(iso: str) -> str:
+        return date.fromisoformat(iso).strftime("%d/%m/%Y")
+
+    lines = [sep, header, sep]
+    unknown = 0
+    grand_count, grand_total = 0, 0.0
+    years: dict[str, list[str]] = {}
+    for key in sorted(aggregates):
+        years.setdefault(key[:4], []).append(key)
+
+    for year, keys in years.items():
+        count, total = 0, 0.0
+        dirs: dict[str, int] = {}
+        for key in keys:
+            agg = aggregates[key]
+            month = DUTCH_MONTHS[int(key[5:])]
+            label = f"{month} {year}" + ("*" if agg.get("unknown_price") else "")
+            lines.append(row(label, agg["count"], agg["vervoer"], fmt(agg["first"]), fmt(agg["last"]),
+                             agg["directions"]))
+            count += agg["count"]
+            total += agg["vervoer"]
+            unknown += agg.get("unknown_price", 0)
+            for direction, n in agg["directions"].items():
+                dirs[direction] = dirs.get(direction, 0) + n
+        first = min(aggregates[k]["first"] for k in keys)
+        last = max(aggregates[k]["last"] for k in keys)
+        lines.append(sep)
+        lines.append(row(f"Totaal {year}", count, total, fmt(first), fmt(last), dirs))
+        lines.append(sep)
+        grand_count += count
+        grand_total += total
+
+    if len(years) > 1:
+        lines.append(f"Alle jaren: {grand_count} ticket(s), EUR {grand_total:.2f}")
+    if unknown:
+        lines.append(
+            f"* {unknown} ticket(s) zonder bedrag in de state (verwerkt voor de"
+            " totalen bijgehouden werden); niet meegeteld in Vervoer."
         )
-    else:
-        for i, t in enumerate(tickets, 1):
-            desc = f"Trein {t.from_station} - {t.to_station} {t.direction}"
-            datum = t.travel_date.strftime("%d/%m/%Y")
-            screenshot_cell = ""
-            if i - 1 < len(screenshots) and screenshots[i - 1] is not None:
-                scr = screenshots[i - 1]
-                screenshot_cell = f'<a href="{scr}">{scr.name}</a>'
-            rows_html += (
-                f"<tr>"
-                f"<td>{i}</td>"
-                f"<td>{datum}</td>"
-                f"<td>{desc}</td>"
-                f"<td style='text-align:right'>{t.price:.2f}</td>"
-                f"<td>{screenshot_cell}</td>"
-                f"</tr>\n"
-            )
-
-    html = f"""<!DOCTYPE html>
+    return "\n".join(lines)
+
+
+# Sjablonen voor de HTML-rapporten; één keer opgebouwd bij het importeren.
+# Alle waarden worden vóór het invullen ge-escaped. Kop en voet komen één keer
+# per bestand voor (Template, want de CSS bevat accolades); de rijen gebruiken
+# de gebonden str.format van een vaste string, wat per rij veel sneller is.
+_PAGE_HEAD = Template("""<!DOCTYPE html>
 <html lang="nl">
 <head>
 <meta charset="utf-8">
-<title>NMBS Onkostennota - {timestamp}</title>
+<title>$title</title>
 <style>
-  body {{ font-family: Arial, sans-serif; margin: 20px; }}
-  table {{ border-collapse: collapse; width: 100%; max-width: 900px; }}
-  th, td {{ border: 1px solid #ccc; padding: 8px; }}
-  th {{ background: #f0f0f0; text-align: left; }}
-  tr:nth-child(even) {{ background: #fafafa; }}
-  .total {{ font-weight: bold; text-align: right; padding-top: 12px; }}
+  body { font-family: Arial, sans-serif; margin: 20px; }
+  table { border-collapse: collapse; width: 100%; max-width: 900px; }
+  th, td { border: 1px solid #ccc; padding: 8px; }
+  th { background: #f0f0f0; text-align: left; }
+  tr:nth-child(even) { background: #fafafa; }
+  tr.month td { background: #e8eef8; font-weight: bold; }
+  .total { font-weight: bold; text-align: right; padding-top: 12px; }
 </style>
 </head>
 <body>
-<h1>NMBS Onkostennota</h1>
-<p>Gegenereerd: {datetime.now().strftime("%d/%m/%Y %H:%M:%S")}</p>
-<p>Aantal tickets: {len(tickets)}</p>
+<h1>$heading</h1>
+<p>Gegenereerd: $generated</p>
+<p>Aantal tickets: $count</p>
 <table>
 <thead>
 <tr><th>Nr</th><th>Datum</th><th>Omschrijving</th><th>Bedrag (EUR)</th><th>Screenshot</th></tr>
 </thead>
 <tbody>
-{rows_html}
-</tbody>
+""")
+_ROW = (
+    "<tr><td>{nr}</td><td>{datum}</td><td>{description}</td>"
+    "<td style='text-align:right'>{price}</td><td>{screenshot}</td></tr>\n"
+).format
+_LINK = '<a href="{href}">{name}</a>'.format
+_MONTH_ROW = (
+    '<tr class="month"><td colspan="3">{label} ({count} tickets)</td>'
+    "<td style='text-align:right'>{total}</td><td></td></tr>\n"
+).format
+_EMPTY_ROW = '<tr><td colspan="5" style="text-align:center;padding:12px;">{message}</td></tr>\n'.format
+_PAGE_FOOT = Template("""</tbody>
 </table>
-<p class="total">Totaal: EUR {total:.2f}</p>
+<p class="total">Totaal: EUR $total</p>
 </body>
 </html>
-"""
-    report_path.write_text(html, encoding="utf-8")
+""")
+
+
+def relative_href(target: Path, base_dir: Path) -> str:
+    """Link van een bestand in base_dir naar target; relatief als dat kan (zelfde schijf)."""
+    try:
+        rel = os.path.relpath(target, base_dir)
+    except ValueError:  # Windows: andere schijf
+        return target.resolve().as_uri()
+    return quote(Path(rel).as_posix())
+
+
+class ReportWriter:
+    """
+    Schrijft een HTML-rapport rij per rij naar schijf.
+
+    Gebruik als context manager; het bestand verschijnt pas (atomair) als het
+    with-blok zonder fout afloopt. Het aantal tickets staat bovenaan, dus de
+    aanroeper geeft het vooraf mee (expected); het totaal wordt onderweg
+    bijgehouden en onderaan geschreven.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        heading: str,
+        empty_message: str = "Geen tickets.",
+        expected: int = 0,
+    ):
+        self.path = path
+        self.heading = heading
+        self.empty_message = empty_message
+        self.expected = expected
+        self.count = 0
+        self.total = 0.0
+        self._tmp = path.with_suffix(path.suffix + ".tmp")
+        self._file = None
+        # Screenshots van een maand delen hun map: de relatieve map één keer berekenen
+        self._folder_hrefs: dict[Path, str] = {}
+
+    def __enter__(self) -> "ReportWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp, "w", encoding="utf-8")
+        self._file.write(_PAGE_HEAD.substitute(
+            title=html.escape(f"{self.heading} - {datetime.now():%Y%m%d_%H%M%S}"),
+            heading=html.escape(self.heading),
+            generated=datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            count=self.expected,
+        ))
+        return self
+
+    def add(
+        self,
+        travel_date: date,
+        description: str,
+        price: float | None,
+        screenshot: Path | None = None,
+    ) -> None:
+        """Eén rij; price None betekent onbekend (telt niet mee in het totaal)."""
+        self.count += 1
+        if price is not None:
+            self.total += price
+        link = ""
+        if screenshot is not None:
+            folder = self._folder_hrefs.get(screenshot.parent)
+            if folder is None:
+                folder = self._folder_hrefs[screenshot.parent] = html.escape(
+                    relative_href(screenshot.parent, self.path.parent)
+                )
+            name = screenshot.name
+            link = _LINK(href=f"{folder}/{html.escape(quote(name))}", name=html.escape(name))
+        self._file.write(_ROW(
+            nr=self.count,
+            datum=travel_date.strftime("%d/%m/%Y"),
+            description=html.escape(description),
+            price=f"{price:.2f}" if price is not None else "-",
+            screenshot=link,
+        ))
+
+    def add_ticket(self, ticket: TicketData, screenshot: Path | None = None) -> None:
+        self.add(
+            ticket.travel_date,
+            f"Trein {ticket.from_station} - {ticket.to_station} {ticket.direction}",
+            ticket.price,
+            screenshot,
+        )
+
+    def add_month_total(self, label: str, total: float, count: int) -> None:
+        """Tussentotaal van een maand (telt niet als ticket)."""
+        self._file.write(_MONTH_ROW(
+            label=html.escape(label), count=count, total=f"{total:.2f}",
+        ))
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                if not self.count:
+                    self._file.write(_EMPTY_ROW(message=html.escape(self.empty_message)))
+                self._file.write(_PAGE_FOOT.substitute(total=f"{self.total:.2f}"))
+        finally:
+            self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
+
+
+def generate_html_report(
+    tickets: list[TicketData],
+    reports_dir: Path,
+    screenshot_paths: list[Path | None] | None = None,
+) -> Path:
+    """Genereer een HTML-rapport en sla op in reports_dir. Geeft het pad terug."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_path = reports_dir / f"run_{timestamp}.html"
+    screenshots = screenshot_paths or []
+
+    with ReportWriter(
+        report_path, "NMBS Onkostennota", "Geen tickets verwerkt deze sessie.", len(tickets)
+    ) as report:
+        for i, ticket in enumerate(tickets):
+            report.add_ticket(ticket, screenshots[i] if i < len(screenshots) else None)
+    return report_path
+
+
+# Zoals screenshot_gen._screenshot_filename, bijv. trein_130226_heenenterug_UPL1IGGK.png
+SCREENSHOT_NAME = re.compile(r"trein_\d{6}_[a-z]+_(?P<order>[A-Za-z0-9]+)\.(?:png|jpg|webp)")
+
+
+def screenshots_by_order(folder: Path, unmatched: list[Path] | None = None) -> dict[str, Path]:
+    """
+    Screenshots in een maandmap, op bestelnummer (trein_<datum>_<richting>_<bestelnummer>.<ext>).
+
+    Andere trein_-bestanden (bijv. van voor het bestelnummer in de naam stond)
+    worden overgeslagen en, als unmatched gegeven is, daaraan toegevoegd.
+    """
+    if not folder.is_dir():
+        return {}
+    found = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.startswith("trein_"):
+                continue
+            match = SCREENSHOT_NAME.fullmatch(entry.name)
+            if match:
+                found[match["order"]] = Path(entry.path)
+            elif unmatched is not None:
+                unmatched.append(Path(entry.path))
+    return found
+
+
+def _month_groups(state: dict) -> Iterable[tuple[str, list[tuple[int, str, str]]]]:
+    """
+    Per maandbestand (chronologisch) de verwerkte tickets als
+    (travel_date_serial, beschrijving, bestelnummer). Enkel de sleutels uit de
+    state, geen tickets of e-mails.
+    """
+    groups: dict[str, list[tuple[int, str, str]]] = {}
+    for order, meta in state.get("metadata", {}).items():
+        if meta.get("travel_date_serial") is None or not meta.get("filename"):
+            continue
+        groups.setdefault(meta["filename"], []).append(
+            (meta["travel_date_serial"], meta.get("description") or "", order)
+        )
+    for filename in sorted(groups, key=lambda f: min(groups[f])[0]):
+        yield filename, sorted(groups[filename])
+
+
+def generate_history_report(
+    state: dict,
+    excel_dir: Path,
+    screenshots_dir: Path,
+    reports_dir: Path,
+    unreadable: dict[str, str] | None = None,
+) -> Path:
+    """
+    Rapport van alle verwerkte tickets uit de state, maand per maand met tussentotalen.
+
+    De bedragen komen uit de maandbestanden (read-only gelezen), de links uit
+    de screenshotmappen. Er wordt één maand tegelijk gelezen en weggeschreven.
+    Tickets waarvan de rij niet (meer) in Excel staat, krijgen "-" als bedrag,
+    net als alle tickets van een maandbestand dat niet te lezen is (vergrendeld
+    of beschadigd); dat bestand komt met de fout in unreadable (indien gegeven).
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_path = reports_dir / f"history_{timestamp}.html"
+
+    groups = list(_month_groups(state))  # enkel sleutels; de bedragen komen per maand
+    with ReportWriter(
+        report_path, "NMBS Onkostennota - alle maanden", "Nog geen verwerkte tickets.",
+        sum(len(entries) for _, entries in groups),
+    ) as report:
+        for filename, entries in groups:
+            excel_path = excel_dir / filename
+            amounts: dict[tuple[date, str], list[float | None]] = {}
+            if excel_path.exists():
+                try:
+                    rows = scan_month_rows(excel_path)
+                except Exception as exc:  # vergrendeld of beschadigd: enkel deze maand zonder bedragen
+                    rows = []
+                    if unreadable is not None:
+                        unreadable[filename] = str(exc)
+                for row in rows:
+                    amounts.setdefault((row.travel_date, row.description or ""), []).append(row.amount)
+            first = excel_serial_to_date(entries[0][0])
+            month_label = f"{DUTCH_MONTHS[first.month]} {first.year}"
+            shots = screenshots_by_order(screenshots_dir / month_label)
+
+            month_total = 0.0
+            for serial, description, order in entries:
+                travel_date = excel_serial_to_date(serial)
+                matches = amounts.get((travel_date, description))
+                price = matches.pop(0) if matches else None
+                month_total += price or 0.0
+                report.add(travel_date, description, price, shots.get(order))
+            report.add_month_total(month_label, month_total, len(entries))
     return report_path
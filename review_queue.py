@@ -0,0 +1,41 @@
+"""
+Wachtrij van opgehaalde tickets die nog beoordeeld moeten worden (review.jsonl).
+
+`--sync` haalt nieuwe mails op, parseert ze en zet de tickets hier klaar,
+zonder iets te vragen. `--review` toont ze daarna meteen vanaf schijf, zonder
+Gmail. Het formaat is hetzelfde als de outbox: één ticket per JSON-regel,
+naast het state-bestand.
+"""
+from pathlib import Path
+
+from email_parser import TicketData
+from outbox import append_to_outbox, load_outbox, save_outbox
+
+
+def review_file(state_file: Path) -> Path:
+    """Het reviewbestand hoort bij het state-bestand (zelfde map)."""
+    return state_file.with_name("review.jsonl")
+
+
+def load_review_queue(path: Path) -> dict[str, TicketData]:
+    """Laad de te beoordelen tickets, geindexeerd op bestelnummer."""
+    return load_outbox(path)
+
+
+def enqueue_for_review(
+    tickets: list[TicketData], queue: dict[str, TicketData], path: Path
+) -> int:
+    """Voeg nieuwe tickets toe aan de wachtrij (en het bestand); geeft het aantal toegevoegde terug."""
+    added = 0
+    for ticket in tickets:
+        if ticket.order_number in queue:
+            continue
+        queue[ticket.order_number] = ticket
+        append_to_outbox(ticket, path)
+        added += 1
+    return added
+
+
+def save_review_queue(queue: dict[str, TicketData], path: Path) -> None:
+    """Herschrijf de wachtrij met de overgebleven tickets; verwijdert het bestand als ze leeg is."""
+    save_outbox(queue, path)
@@ -1,19 +1,95 @@
 """
 Maakt een PNG-screenshot van de NMBS-bevestigingsmail.
 Vereist dat Google Chrome geïnstalleerd is.
+
+Per run wordt één headless Chrome gestart (ChromeSession) en via het
+DevTools-protocol hergebruikt voor alle tickets. Lukt dat niet (geen
+websocket-client, Chrome start niet, verbinding valt weg), dan valt
+save_screenshot terug op de oude werkwijze: html2image per screenshot.
 """
+import atexit
+import base64
+import hashlib
+import json
+import math
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import astuple, dataclass
 from datetime import date
 from pathlib import Path
 
 from constants import DUTCH_MONTHS
 from email_parser import TicketData
+from profiling import stage
+
+SCREENSHOT_SIZE = (800, 1400)
+CHROME_FLAGS = ["--no-sandbox", "--disable-gpu"]
+PDF_PAPER_SIZE = (8.27, 11.69)  # A4 in inch, zoals printToPDF verwacht
+
+# Cache van renders, geadresseerd op inhoud (HTML + instellingen).
+# Staat binnen de screenshotsmap zodat harde links op hetzelfde volume liggen.
+CACHE_DIRNAME = ".cache"
+
+
+# Ondersteunde uitvoerformaten -> bestandsextensie
+IMAGE_FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """Alles wat het resultaat van een render beinvloedt (maakt deel uit van de cachesleutel)."""
+    width: int = SCREENSHOT_SIZE[0]
+    height: int = SCREENSHOT_SIZE[1]  # maximale hoogte
+    crop: bool = True                 # bijsnijden tot de hoogte van de inhoud
+    fmt: str = "png"                  # "png" | "jpeg" | "webp"
+    quality: int = 80                 # alleen voor jpeg/webp
+
+    @property
+    def extension(self) -> str:
+        return IMAGE_FORMATS[self.fmt]
 
 
-def _screenshot_filename(ticket: TicketData) -> str:
+DEFAULT_SETTINGS = RenderSettings()
+
+
+def render_settings_from_config(cfg) -> RenderSettings:
+    """Lees SCREENSHOT_FORMAT / SCREENSHOT_QUALITY / SCREENSHOT_CROP uit config (optioneel)."""
+    fmt = getattr(cfg, "SCREENSHOT_FORMAT", DEFAULT_SETTINGS.fmt)
+    fmt = fmt.lower() if isinstance(fmt, str) else DEFAULT_SETTINGS.fmt
+    fmt = {"jpg": "jpeg"}.get(fmt, fmt)
+    if fmt not in IMAGE_FORMATS:
+        print(f"  Waarschuwing: onbekend SCREENSHOT_FORMAT '{fmt}', PNG wordt gebruikt.")
+        fmt = DEFAULT_SETTINGS.fmt
+    quality = getattr(cfg, "SCREENSHOT_QUALITY", DEFAULT_SETTINGS.quality)
+    if not isinstance(quality, int) or not 1 <= quality <= 100:
+        quality = DEFAULT_SETTINGS.quality
+    crop = getattr(cfg, "SCREENSHOT_CROP", DEFAULT_SETTINGS.crop)
+    return RenderSettings(
+        crop=crop if isinstance(crop, bool) else DEFAULT_SETTINGS.crop,
+        fmt=fmt,
+        quality=quality,
+    )
+
+
+def _screenshot_filename(ticket: TicketData, extension: str = "png") -> str:
     """Bijv. trein_130226_heenenterug_UPL1IGGK.png"""
     date_str = ticket.travel_date.strftime("%d%m%y")
     direction_slug = ticket.direction.replace("/", "en")  # heen/terug → heenenterug
-    return f"trein_{date_str}_{direction_slug}_{ticket.order_number}.png"
+    return f"trein_{date_str}_{direction_slug}_{ticket.order_number}.{extension}"
+
+
+def screenshot_path(
+    ticket: TicketData, screenshots_dir: Path, settings: RenderSettings = DEFAULT_SETTINGS
+) -> Path:
+    """Waar de screenshot van dit ticket staat (of zal staan); maakt geen mappen aan."""
+    folder = screenshots_dir / f"{DUTCH_MONTHS[ticket.travel_date.month]} {ticket.travel_date.year}"
+    return folder / _screenshot_filename(ticket, settings.extension)
 
 
 def _month_folder(d: date, screenshots_dir: Path) -> Path:
@@ -23,11 +99,332 @@ def _month_folder(d: date, screenshots_dir: Path) -> Path:
     return folder
 
 
-def save_screenshot(ticket: TicketData, screenshots_dir: Path) -> Path:
+def html_digest(html: str) -> str:
+    """SHA-256 van de e-mail HTML; identificeert de bron los van de instellingen."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def render_key(html: str, settings: RenderSettings = DEFAULT_SETTINGS) -> str:
+    """Cachesleutel: dezelfde HTML met dezelfde instellingen geeft dezelfde afbeelding."""
+    material = f"{html_digest(html)}|{astuple(settings)!r}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def cached_html_path(screenshots_dir: Path, digest: str) -> Path:
+    """Waar de bron-HTML van een render in de cache staat."""
+    return screenshots_dir / CACHE_DIRNAME / "html" / f"{digest}.html"
+
+
+def cached_pdf_path(screenshots_dir: Path, digest: str) -> Path:
+    """Waar de PDF-pagina('s) van een ticket in de cache staan."""
+    return screenshots_dir / CACHE_DIRNAME / "pdf" / f"{digest}.pdf"
+
+
+def _cache_html(html: str, screenshots_dir: Path) -> None:
+    """Bewaar de bron-HTML zodat latere renders (andere instellingen, PDF) geen Gmail nodig hebben."""
+    path = cached_html_path(screenshots_dir, html_digest(html))
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Maak dst als harde link naar src; kopieer als linken niet kan (bijv. FAT32)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ChromeSession:
     """
-    Render de e-mail HTML naar een PNG en sla op in de juiste maandmap.
-    Geeft het pad naar de opgeslagen PNG terug.
-    Gooit een RuntimeError als Chrome niet beschikbaar is.
+    Een headless Chrome-proces dat voor alle screenshots van een run hergebruikt wordt.
+
+    Chrome wordt één keer gestart met --remote-debugging-port=0; de gekozen
+    poort staat in DevToolsActivePort in het tijdelijke profiel. Daarna gaat
+    elke screenshot over dezelfde websocket en hetzelfde tabblad.
+    """
+
+    def __init__(self, executable: str | None = None, timeout: float = 20.0):
+        self.executable = executable
+        self.timeout = timeout
+        self._proc: subprocess.Popen | None = None
+        self._ws = None
+        self._profile_dir: Path | None = None
+        self._session_id: str | None = None
+        self._next_id = 0
+        self._events: list[dict] = []
+
+    def start(self) -> None:
+        """Start Chrome en open een tabblad. Gooit een RuntimeError bij problemen."""
+        try:
+            from websocket import create_connection
+            from html2image.browsers.search_utils import find_chrome
+        except ImportError as exc:
+            raise RuntimeError(f"DevTools-verbinding niet beschikbaar: {exc}") from exc
+
+        try:
+            executable = find_chrome(self.executable)
+        except FileNotFoundError as exc:
+            raise RuntimeError(f"Chrome niet gevonden: {exc}") from exc
+
+        self._profile_dir = Path(tempfile.mkdtemp(prefix="onkosten_chrome_"))
+        self._proc = subprocess.Popen(
+            [
+                executable,
+                "--headless=new",
+                "--remote-debugging-port=0",
+                "--remote-allow-origins=*",
+                f"--user-data-dir={self._profile_dir}",
+                "--hide-scrollbars",
+                "--no-first-run",
+                "--no-default-browser-check",
+                *CHROME_FLAGS,
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        port_file = self._profile_dir / "DevToolsActivePort"
+        deadline = time.monotonic() + self.timeout
+        while True:
+            lines = port_file.read_text().splitlines() if port_file.exists() else []
+            if len(lines) >= 2:
+                break
+            if self._proc.poll() is not None:
+                raise RuntimeError("Chrome is onverwacht gestopt tijdens het opstarten.")
+            if time.monotonic() > deadline:
+                raise RuntimeError("Chrome startte niet binnen de verwachte tijd.")
+            time.sleep(0.05)
+
+        port, browser_path = lines[0].strip(), lines[1].strip()
+        self._ws = create_connection(
+            f"ws://127.0.0.1:{port}{browser_path}", timeout=self.timeout
+        )
+        target_id = self._send("Target.createTarget", url="about:blank")["targetId"]
+        self._session_id = self._send(
+            "Target.attachToTarget", targetId=target_id, flatten=True
+        )["sessionId"]
+        self._send("Page.enable", on_page=True)
+
+    def _send(self, method: str, on_page: bool = False, **params) -> dict:
+        """Stuur een DevTools-commando en wacht op het antwoord."""
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params}
+        if on_page:
+            message["sessionId"] = self._session_id
+        self._ws.send(json.dumps(message))
+        while True:
+            reply = json.loads(self._ws.recv())
+            if reply.get("id") == self._next_id:
+                if "error" in reply:
+                    raise RuntimeError(
+                        f"{method} mislukt: {reply['error'].get('message', reply['error'])}"
+                    )
+                return reply.get("result", {})
+            if "method" in reply:
+                self._events.append(reply)
+
+    def _wait_event(self, method: str) -> dict:
+        """Wacht op een event van het tabblad (events die al binnen zijn tellen mee)."""
+        while True:
+            for i, event in enumerate(self._events):
+                if event["method"] == method:
+                    return self._events.pop(i)
+            reply = json.loads(self._ws.recv())
+            if "method" in reply:
+                self._events.append(reply)
+
+    def _set_viewport(self, width: int, height: int) -> None:
+        self._send(
+            "Emulation.setDeviceMetricsOverride",
+            on_page=True,
+            width=width,
+            height=height,
+            deviceScaleFactor=1,
+            mobile=False,
+        )
+
+    def _load(self, html: str, settings: RenderSettings, height: int | None = None) -> None:
+        """Laad de HTML in het tabblad en wacht tot de pagina klaar is (standaard volle hoogte)."""
+        page_file = self._profile_dir / "ticket.html"
+        page_file.write_text(html, encoding="utf-8")
+
+        self._set_viewport(settings.width, height or settings.height)
+        self._events.clear()
+        self._send("Page.navigate", on_page=True, url=page_file.as_uri())
+        self._wait_event("Page.loadEventFired")
+
+    def screenshot(
+        self, html: str, output_path: Path, settings: RenderSettings = DEFAULT_SETTINGS
+    ) -> None:
+        """Render de HTML in het tabblad en schrijf de afbeelding naar output_path."""
+        height = settings.height
+        if settings.crop:
+            # Meten met een viewport van 1 px hoog: de inhoudshoogte van Chrome
+            # is nooit kleiner dan de viewport, dus met de volle hoogte is er
+            # niets bij te snijden. Daarna de viewport op de echte hoogte zetten.
+            self._load(html, settings, height=1)
+            metrics = self._send("Page.getLayoutMetrics", on_page=True)
+            content = metrics.get("cssContentSize") or metrics.get("contentSize") or {}
+            content_height = content.get("height") or settings.height
+            height = max(1, min(settings.height, math.ceil(content_height)))
+            self._set_viewport(settings.width, height)
+        else:
+            self._load(html, settings)
+
+        params = {
+            "format": settings.fmt,
+            "clip": {"x": 0, "y": 0, "width": settings.width, "height": height, "scale": 1},
+        }
+        if settings.fmt != "png":
+            params["quality"] = settings.quality
+        data = self._send("Page.captureScreenshot", on_page=True, **params)["data"]
+        output_path.write_bytes(base64.b64decode(data))
+        if settings.fmt == "png":
+            _optimize_png(output_path)
+
+    def print_pdf(self, html: str, output_path: Path) -> None:
+        """Druk de HTML af als PDF (A4, met achtergrondkleuren) naar output_path."""
+        self._load(html, DEFAULT_SETTINGS)
+        data = self._send(
+            "Page.printToPDF",
+            on_page=True,
+            printBackground=True,
+            paperWidth=PDF_PAPER_SIZE[0],
+            paperHeight=PDF_PAPER_SIZE[1],
+            marginTop=0.4,
+            marginBottom=0.4,
+            marginLeft=0.4,
+            marginRight=0.4,
+        )["data"]
+        output_path.write_bytes(base64.b64decode(data))
+
+    def close(self) -> None:
+        """Sluit de verbinding en Chrome. Veilig om meermaals aan te roepen."""
+        if self._ws is not None:
+            try:
+                self._send("Browser.close")
+            except Exception:
+                pass  # Chrome kan al weg zijn
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+            self._ws = None
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.terminate()
+                try:
+                    self._proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+            self._proc = None
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+
+# De gedeelde sessie voor deze run. Wordt pas bij de eerste screenshot gestart.
+_session: ChromeSession | None = None
+_session_unavailable = False
+_session_lock = threading.Lock()
+# Verhoogd door close_session; een lopende reeks renders stopt als dit verandert
+_session_generation = 0
+
+
+def _get_session() -> ChromeSession | None:
+    """Geeft de draaiende sessie, start ze indien nodig, of None bij terugval."""
+    global _session, _session_unavailable
+    if _session is None and not _session_unavailable:
+        session = ChromeSession()
+        try:
+            with stage("screenshot.chrome_start"):
+                session.start()
+        except Exception:
+            session.close()
+            _session_unavailable = True
+            return None
+        _session = session
+        atexit.register(close_session)
+    return _session
+
+
+def close_session() -> None:
+    """
+    Sluit de gedeelde Chrome-sessie (aan het einde van de run).
+
+    Wacht hoogstens op de render die nog bezig is; een reeks die de
+    achtergrondwerker nog aan het renderen is, stopt na die render.
+    """
+    global _session, _session_generation
+    _session_generation += 1  # buiten het slot: de werker ziet het na zijn huidige render
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _optimize_png(path: Path) -> None:
+    """Herschrijf een PNG met maximale compressie als Pillow beschikbaar is (optioneel)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+    try:
+        with Image.open(path) as img:
+            img.load()
+        img.save(path, format="PNG", optimize=True)
+    except OSError:
+        pass  # best effort: de onbewerkte PNG van Chrome blijft bruikbaar
+
+
+def _postprocess_image(src: Path, dst: Path, settings: RenderSettings) -> None:
+    """
+    Snij een html2image-PNG bij tot de inhoud en zet om naar het gevraagde formaat.
+
+    Vereist Pillow. Zonder Pillow wordt een PNG ongewijzigd overgenomen;
+    voor JPEG/WebP is Pillow dan verplicht.
+    """
+    try:
+        from PIL import Image, ImageChops
+    except ImportError:
+        if settings.fmt != "png":
+            raise RuntimeError(
+                f"Screenshots als {settings.fmt} zonder Chrome-sessie vereisen Pillow."
+                " Voer uit: pip install pillow"
+            )
+        os.replace(src, dst)
+        return
+
+    with Image.open(src) as opened:
+        img = opened.convert("RGB")
+    src.unlink()
+    if settings.crop:
+        # Alles onder de laatste rij die afwijkt van de achtergrond is leeg
+        background = Image.new("RGB", img.size, img.getpixel((img.width - 1, img.height - 1)))
+        bbox = ImageChops.difference(img, background).getbbox()
+        if bbox:
+            img = img.crop((0, 0, img.width, bbox[3]))
+    if settings.fmt == "png":
+        img.save(dst, format="PNG", optimize=True)
+    else:
+        img.save(dst, format=settings.fmt.upper(), quality=settings.quality)
+
+
+def _screenshot_per_call(
+    htmls: list[str],
+    output_dir: Path,
+    filenames: list[str],
+    settings: RenderSettings = DEFAULT_SETTINGS,
+) -> None:
+    """
+    Terugvalpad via html2image: één Html2Image voor een hele map.
+
+    html2image start intern nog steeds een Chrome-proces per bestand; alleen de
+    opzet (zoeken naar Chrome, tijdelijke bestanden) wordt gedeeld. Chrome
+    levert altijd een PNG op volle hoogte; bijsnijden en omzetten gebeurt achteraf.
     """
     try:
         from html2image import Html2Image
@@ -36,29 +433,326 @@ def save_screenshot(ticket: TicketData, screenshots_dir: Path) -> Path:
             "html2image is niet geïnstalleerd. Voer uit: pip install html2image"
         )
 
-    output_dir = _month_folder(ticket.travel_date, screenshots_dir)
-    filename = _screenshot_filename(ticket)
-    output_path = output_dir / filename
+    raw_names = [f"{Path(name).stem}.raw.png" for name in filenames]
+    hti = Html2Image(
+        output_path=str(output_dir),
+        custom_flags=CHROME_FLAGS,
+    )
+    hti.screenshot(
+        html_str=htmls,
+        save_as=raw_names,
+        size=(settings.width, settings.height),
+    )
+    for raw_name, filename in zip(raw_names, filenames):
+        _postprocess_image(output_dir / raw_name, output_dir / filename, settings)
 
-    if output_path.exists():
-        # Al aanwezig (bijv. bij herverwerking); niet overschrijven
-        return output_path
 
-    try:
-        hti = Html2Image(
-            output_path=str(output_dir),
-            custom_flags=["--no-sandbox", "--disable-gpu"],
-        )
-        hti.screenshot(
-            html_str=ticket.email_html,
-            save_as=filename,
-            size=(800, 1400),
-        )
-    except Exception as exc:
-        raise RuntimeError(
-            f"Screenshot mislukt voor {ticket.order_number}. "
-            "Controleer of Google Chrome geïnstalleerd is.\n"
-            f"Technische details: {exc}"
-        ) from exc
+def _render_error(ticket: TicketData, exc: Exception) -> RuntimeError:
+    if isinstance(exc, RuntimeError):
+        return exc
+    error = RuntimeError(
+        f"Screenshot mislukt voor {ticket.order_number}. "
+        "Controleer of Google Chrome geïnstalleerd is.\n"
+        f"Technische details: {exc}"
+    )
+    error.__cause__ = exc
+    return error
+
+
+def _render_with_session(
+    jobs: list[tuple[TicketData, Path]], results: dict, settings: RenderSettings
+) -> list[tuple[TicketData, Path]]:
+    """Render zoveel mogelijk via de gedeelde sessie; geeft de rest terug."""
+    global _session, _session_unavailable
+
+    with _session_lock:
+        session = _get_session()
+        generation = _session_generation
+    if session is None:
+        return jobs
+    for i, (ticket, output_path) in enumerate(jobs):
+        # Het slot per render, niet voor de hele reeks: close_session moet
+        # bij het afsluiten (of Ctrl+C) niet op alle renders wachten.
+        with _session_lock:
+            if _session_generation != generation:
+                for stopped, _ in jobs[i:]:
+                    results[stopped.order_number] = RuntimeError(
+                        f"Screenshot niet gemaakt voor {stopped.order_number}:"
+                        " de Chrome-sessie werd gesloten."
+                    )
+                return []
+            try:
+                with stage("screenshot.render") as span:
+                    session.screenshot(ticket.email_html, output_path, settings)
+                    span.bytes = output_path.stat().st_size
+            except Exception:
+                # Sessie onbruikbaar geworden: opruimen en de rest via terugval
+                session.close()
+                _session = None
+                _session_unavailable = True
+                return jobs[i:]
+        results[ticket.order_number] = output_path
+    return []
+
+
+def _render_per_call(
+    jobs: list[tuple[TicketData, Path]], results: dict, settings: RenderSettings
+) -> None:
+    """Render via html2image, gegroepeerd per doelmap."""
+    by_folder: dict[Path, list[tuple[TicketData, Path]]] = {}
+    for ticket, output_path in jobs:
+        by_folder.setdefault(output_path.parent, []).append((ticket, output_path))
+
+    for output_dir, folder_jobs in by_folder.items():
+        try:
+            with stage("screenshot.html2image"):
+                _screenshot_per_call(
+                    [t.email_html for t, _ in folder_jobs],
+                    output_dir,
+                    [p.name for _, p in folder_jobs],
+                    settings,
+                )
+        except Exception as exc:
+            if len(folder_jobs) == 1:
+                results[folder_jobs[0][0].order_number] = _render_error(folder_jobs[0][0], exc)
+                continue
+            # Batch mislukt: per ticket opnieuw, zodat elke fout bij het juiste ticket hoort
+            _render_per_call_one_by_one(folder_jobs, results, settings)
+            continue
+        for ticket, output_path in folder_jobs:
+            results[ticket.order_number] = output_path
+
+
+def _render_per_call_one_by_one(
+    jobs: list[tuple[TicketData, Path]], results: dict, settings: RenderSettings
+) -> None:
+    for ticket, output_path in jobs:
+        try:
+            _screenshot_per_call(
+                [ticket.email_html], output_path.parent, [output_path.name], settings
+            )
+            results[ticket.order_number] = output_path
+        except Exception as exc:
+            results[ticket.order_number] = _render_error(ticket, exc)
+
+
+def save_screenshots(
+    tickets: list[TicketData],
+    screenshots_dir: Path,
+    settings: RenderSettings = DEFAULT_SETTINGS,
+) -> dict[str, Path | RuntimeError]:
+    """
+    Render meerdere tickets in zo weinig Chrome-opstarts als mogelijk.
+
+    Renders worden bewaard in een cache op basis van de HTML en de instellingen
+    (screenshots/.cache). Een ticket waarvan die combinatie al eens gerenderd
+    is, krijgt meteen een harde link (of kopie) in zijn maandmap, ook als de
+    bestandsnaam intussen veranderd is (bijv. heen -> terug). Identieke HTML
+    binnen dezelfde batch wordt maar één keer gerenderd.
+
+    Via de gedeelde sessie gaat de hele reeks door één Chrome-proces; bij
+    terugval wordt één html2image-batch gebruikt. Bestandsnamen en mappen zijn
+    dezelfde als bij save_screenshot. Geeft per bestelnummer het pad van de
+    PNG of de RuntimeError terug; gooit zelf niets.
+    """
+    results: dict[str, Path | RuntimeError] = {}
+    img_dir = screenshots_dir / CACHE_DIRNAME / "img"
+
+    # Per cachesleutel: het ticket dat gerenderd wordt en wie erop wacht
+    to_render: dict[str, tuple[TicketData, Path]] = {}
+    waiting: dict[str, list[tuple[TicketData, Path]]] = {}
+
+    for ticket in tickets:
+        try:
+            output_path = _month_folder(ticket.travel_date, screenshots_dir) / (
+                _screenshot_filename(ticket, settings.extension)
+            )
+            _cache_html(ticket.email_html, screenshots_dir)
+            if output_path.exists():
+                # Al aanwezig (bijv. bij herverwerking); niet overschrijven
+                results[ticket.order_number] = output_path
+                continue
+            key = render_key(ticket.email_html, settings)
+            cached = img_dir / f"{key}.{settings.extension}"
+            if cached.exists():
+                _link_or_copy(cached, output_path)
+                results[ticket.order_number] = output_path
+                continue
+        except OSError as exc:
+            results[ticket.order_number] = _render_error(ticket, exc)
+            continue
+        to_render.setdefault(key, (ticket, cached))
+        waiting.setdefault(key, []).append((ticket, output_path))
+
+    if to_render:
+        img_dir.mkdir(parents=True, exist_ok=True)
+        jobs = list(to_render.values())
+        rendered: dict[str, Path | RuntimeError] = {}
+        remaining = _render_with_session(jobs, rendered, settings)
+        if remaining:
+            _render_per_call(remaining, rendered, settings)
+
+        for key, (rep, cached) in to_render.items():
+            outcome = rendered.get(rep.order_number)
+            for ticket, output_path in waiting[key]:
+                if not isinstance(outcome, Path):
+                    results[ticket.order_number] = outcome if outcome is not None else (
+                        RuntimeError(f"Geen screenshot gemaakt voor {ticket.order_number}.")
+                    )
+                    continue
+                try:
+                    _link_or_copy(cached, output_path)
+                    results[ticket.order_number] = output_path
+                except OSError as exc:
+                    results[ticket.order_number] = _render_error(ticket, exc)
+    return results
+
+
+def save_pdf_pages(digests: list[str], screenshots_dir: Path) -> dict[str, Path | RuntimeError]:
+    """
+    Druk de gecachete HTML van elk ticket af als PDF via de gedeelde Chrome-sessie.
+
+    Tickets worden aangeduid met html_digest van hun e-mail; de HTML komt uit
+    screenshots/.cache/html, het resultaat gaat naar screenshots/.cache/pdf.
+    Al afgedrukte tickets kosten niets. html2image kan geen PDF maken, dus
+    zonder sessie krijgt elk nog niet afgedrukt ticket een RuntimeError.
+    Geeft per digest het pad van de PDF of de fout terug; gooit zelf niets.
+    """
+    global _session, _session_unavailable
+
+    results: dict[str, Path | RuntimeError] = {}
+    todo: list[tuple[str, Path, Path]] = []
+    for digest in dict.fromkeys(digests):
+        output_path = cached_pdf_path(screenshots_dir, digest)
+        source = cached_html_path(screenshots_dir, digest)
+        if output_path.exists():
+            results[digest] = output_path
+        elif not source.exists():
+            results[digest] = RuntimeError(
+                f"Geen bewaarde e-mail voor {digest[:12]}; verwerk het ticket opnieuw."
+            )
+        else:
+            todo.append((digest, source, output_path))
+
+    if not todo:
+        return results
+
+    with _session_lock:
+        session = _get_session()
+        for i, (digest, source, output_path) in enumerate(todo):
+            if session is None:
+                results[digest] = RuntimeError(
+                    "PDF maken vereist Google Chrome (DevTools-verbinding niet beschikbaar)."
+                )
+                continue
+            try:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with stage("pdf.print") as span:
+                    session.print_pdf(source.read_text(encoding="utf-8"), output_path)
+                    span.bytes = output_path.stat().st_size
+                results[digest] = output_path
+            except OSError as exc:
+                results[digest] = RuntimeError(f"PDF mislukt voor {digest[:12]}: {exc}")
+            except Exception as exc:
+                # Sessie onbruikbaar geworden: opruimen, de rest krijgt een fout
+                session.close()
+                _session = None
+                _session_unavailable = True
+                session = None
+                results[digest] = RuntimeError(f"PDF mislukt voor {digest[:12]}: {exc}")
+    return results
+
+
+def save_screenshot(
+    ticket: TicketData,
+    screenshots_dir: Path,
+    settings: RenderSettings = DEFAULT_SETTINGS,
+) -> Path:
+    """
+    Render de e-mail HTML naar een afbeelding en sla op in de juiste maandmap.
+    Geeft het pad naar de opgeslagen afbeelding terug.
+    Gooit een RuntimeError als Chrome niet beschikbaar is.
+    """
+    result = save_screenshots([ticket], screenshots_dir, settings)[ticket.order_number]
+    if isinstance(result, RuntimeError):
+        raise result
+    return result
+
+
+class ScreenshotQueue:
+    """
+    Rendert screenshots op een achtergrondthread, zodat de vraaglus niet op Chrome wacht.
+
+    Eén werker volstaat: alle screenshots gaan toch door dezelfde Chrome-sessie.
+    De werker neemt telkens alles wat al in de wachtrij staat in één batch
+    (save_screenshots). Fouten worden per ticket bewaard en pas bij wait()
+    teruggegeven.
+    """
+
+    def __init__(
+        self,
+        screenshots_dir: Path,
+        render_many=save_screenshots,
+        settings: RenderSettings = DEFAULT_SETTINGS,
+    ):
+        self.screenshots_dir = screenshots_dir
+        self.settings = settings
+        self._render_many = render_many
+        self._queue: queue.Queue = queue.Queue()
+        self._futures: dict[str, Future] = {}
+        self._worker: threading.Thread | None = None
+
+    def submit(self, ticket: TicketData) -> None:
+        """Zet een ticket in de wachtrij; keert meteen terug. Een tweede keer doet niets."""
+        if ticket.order_number in self._futures:
+            return
+        future: Future = Future()
+        self._futures[ticket.order_number] = future
+        self._queue.put((ticket, future))
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="screenshot", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            tickets = [ticket for ticket, _ in batch]
+            try:
+                results = self._render_many(tickets, self.screenshots_dir, self.settings)
+            except Exception as exc:
+                results = {t.order_number: _render_error(t, exc) for t in tickets}
+            for ticket, future in batch:
+                future.set_result(
+                    results.get(
+                        ticket.order_number,
+                        RuntimeError(f"Geen screenshot gemaakt voor {ticket.order_number}."),
+                    )
+                )
+
+    def pending(self) -> int:
+        """Aantal screenshots dat nog niet klaar is."""
+        return sum(1 for f in self._futures.values() if not f.done())
 
-    return output_path
+    def wait(self) -> dict[str, Path | RuntimeError]:
+        """Wacht op alle screenshots. Geeft per bestelnummer het pad of de fout terug."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        return {order: future.result() for order, future in self._futures.items()}
@@ -1,17 +1,34 @@
 """
 Bijhoudt welke NMBS-bestellingen al verwerkt zijn, zodat er nooit dubbele
 rijen in de onkostennota terechtkomen.
+
+Naast de lijst van verwerkte bestellingen houdt de state per maand een
+totaal bij (state["aggregates"]["JJJJ-MM"]): aantal tickets, som van de
+kolom Vervoer, eerste/laatste reisdag en het aantal per richting. Het wordt
+bijgewerkt bij elke mark_processed/unmark_processed, zodat --summary de
+totalen kent zonder een werkmap te openen (de totaalcellen in Excel zijn
+formules die openpyxl niet uitrekent).
+
+Een tweede index (state["trips"]) koppelt elke rit (reisdag, van, naar,
+prijs) aan de bestellingen die ze dekken. Zo valt een rit die onder een
+ander bestelnummer terugkomt (heruitgegeven ticket, of een mail waarvan het
+onderwerp niet herkend werd) meteen op, zonder alle metadata te doorlopen.
 """
 import json
+from datetime import date
 from pathlib import Path
 
+from excel_dates import excel_serial_to_date
+from profiling import stage
+
 
 def load_state(state_file: Path) -> dict:
     """Laad de verwerkte bestellingen uit het state-bestand."""
     empty: dict = {"processed": [], "skipped_weekend": [], "metadata": {}}
     if state_file.exists():
         try:
-            with open(state_file, "r", encoding="utf-8") as f:
+            with stage("state.load", state_file.stat().st_size), \
+                    open(state_file, "r", encoding="utf-8") as f:
                 return json.load(f)
         except (json.JSONDecodeError, OSError) as exc:
             print(f"  Waarschuwing: state-bestand onleesbaar ({exc}), start met lege state.")
@@ -21,8 +38,9 @@ def load_state(state_file: Path) -> dict:
 
 def save_state(state: dict, state_file: Path) -> None:
     """Sla de huidige state op."""
-    with open(state_file, "w", encoding="utf-8") as f:
+    with stage("state.save") as span, open(state_file, "w", encoding="utf-8") as f:
         json.dump(state, f, indent=2, ensure_ascii=False)
+        span.bytes = f.tell()
 
 
 def is_processed(order_number: str, state: dict) -> bool:
@@ -39,7 +57,26 @@ def mark_processed(
     if order_number not in state["processed"]:
         state["processed"].append(order_number)
     if metadata is not None:
-        state.setdefault("metadata", {})[order_number] = metadata
+        aggregates = month_aggregates(state)
+        trips = trip_index(state)
+        previous = state.setdefault("metadata", {}).get(order_number)
+        if previous is not None:
+            _aggregate_remove(aggregates, previous)
+            _trip_remove(trips, previous, order_number)
+        state["metadata"][order_number] = metadata
+        _aggregate_add(aggregates, metadata)
+        _trip_add(trips, metadata, order_number)
+
+
+def unmark_processed(order_number: str, state: dict) -> None:
+    """Maak mark_processed ongedaan (bijv. nadat de Excel-rij verwijderd is)."""
+    if order_number in state.get("processed", []):
+        state["processed"].remove(order_number)
+    meta = state.get("metadata", {}).get(order_number)
+    if meta is not None:
+        _aggregate_remove(month_aggregates(state), meta)
+        _trip_remove(trip_index(state), meta, order_number)
+        del state["metadata"][order_number]
 
 
 def get_metadata(order_number: str, state: dict) -> dict | None:
@@ -51,3 +88,127 @@ def mark_skipped_weekend(order_number: str, state: dict) -> None:
     """Markeer een weekend/feestdag-ticket als permanent overgeslagen."""
     if order_number not in state.setdefault("skipped_weekend", []):
         state["skipped_weekend"].append(order_number)
+
+
+def _month_key(meta: dict) -> str:
+    d = excel_serial_to_date(meta["travel_date_serial"])
+    return f"{d.year}-{d.month:02d}"
+
+
+def _aggregate_add(aggregates: dict, meta: dict) -> None:
+    agg = aggregates.setdefault(_month_key(meta), {
+        "count": 0, "vervoer": 0.0, "first": None, "last": None,
+        "days": {}, "directions": {}, "unknown_price": 0,
+    })
+    day = excel_serial_to_date(meta["travel_date_serial"]).isoformat()
+    agg["count"] += 1
+    if meta.get("price") is None:
+        agg["unknown_price"] += 1  # metadata van voor de totalen bestonden
+    else:
+        agg["vervoer"] = round(agg["vervoer"] + meta["price"], 2)
+    agg["days"][day] = agg["days"].get(day, 0) + 1
+    direction = meta.get("direction", "?")
+    agg["directions"][direction] = agg["directions"].get(direction, 0) + 1
+    agg["first"] = day if agg["first"] is None else min(agg["first"], day)
+    agg["last"] = day if agg["last"] is None else max(agg["last"], day)
+
+
+def _aggregate_remove(aggregates: dict, meta: dict) -> None:
+    key = _month_key(meta)
+    agg = aggregates.get(key)
+    if agg is None:
+        return
+    agg["count"] -= 1
+    if agg["count"] <= 0:
+        del aggregates[key]
+        return
+    if meta.get("price") is None:
+        agg["unknown_price"] -= 1
+    else:
+        agg["vervoer"] = round(agg["vervoer"] - meta["price"], 2)
+    day = excel_serial_to_date(meta["travel_date_serial"]).isoformat()
+    if agg["days"].get(day, 0) > 1:
+        agg["days"][day] -= 1
+    else:
+        agg["days"].pop(day, None)
+        # Enkel eerste/laatste dag kunnen veranderen; hooguit 31 dagen om te doorlopen
+        agg["first"], agg["last"] = min(agg["days"]), max(agg["days"])
+    direction = meta.get("direction", "?")
+    if agg["directions"].get(direction, 0) > 1:
+        agg["directions"][direction] -= 1
+    else:
+        agg["directions"].pop(direction, None)
+
+
+def rebuild_aggregates(state: dict) -> dict:
+    """Bereken de maandtotalen opnieuw uit alle metadata."""
+    aggregates: dict = {}
+    for meta in state.get("metadata", {}).values():
+        _aggregate_add(aggregates, meta)
+    state["aggregates"] = aggregates
+    return aggregates
+
+
+def month_aggregates(state: dict) -> dict:
+    """
+    De maandtotalen, per "JJJJ-MM". Een state van voor de totalen krijgt ze
+    eenmalig berekend uit de metadata (tickets zonder prijs in de metadata
+    tellen mee als unknown_price).
+    """
+    if "aggregates" not in state:
+        return rebuild_aggregates(state)
+    return state["aggregates"]
+
+
+def trip_key(travel_date: date, from_station: str, to_station: str, price: float) -> str:
+    """Sleutel van een rit voor de duplicaatindex, bijv. "2026-02-13|zottegem|antwerpen-zuid|28.00"."""
+    return f"{travel_date.isoformat()}|{from_station.casefold()}|{to_station.casefold()}|{price:.2f}"
+
+
+def _meta_trip(meta: dict) -> str | None:
+    """De ritsleutel uit de metadata; voor oudere metadata afgeleid uit de omschrijving."""
+    if meta.get("trip"):
+        return meta["trip"]
+    description = meta.get("description") or ""
+    if meta.get("price") is None or not description.startswith("Trein "):
+        return None
+    stations = description[len("Trein "):].rsplit(" ", 1)[0]
+    from_station, sep, to_station = stations.partition(" - ")
+    if not sep:
+        return None
+    travel_date = excel_serial_to_date(meta["travel_date_serial"])
+    return trip_key(travel_date, from_station, to_station, meta["price"])
+
+
+def _trip_add(trips: dict, meta: dict, order_number: str) -> None:
+    key = _meta_trip(meta)
+    if key is not None and order_number not in trips.setdefault(key, []):
+        trips[key].append(order_number)
+
+
+def _trip_remove(trips: dict, meta: dict, order_number: str) -> None:
+    key = _meta_trip(meta)
+    orders = trips.get(key)
+    if orders and order_number in orders:
+        orders.remove(order_number)
+        if not orders:
+            del trips[key]
+
+
+def trip_index(state: dict) -> dict:
+    """
+    Ritsleutel -> bestelnummers. Net als de maandtotalen eenmalig opgebouwd
+    uit de metadata voor een state van voor de index.
+    """
+    if "trips" not in state:
+        trips: dict = {}
+        for order, meta in state.get("metadata", {}).items():
+            _trip_add(trips, meta, order)
+        state["trips"] = trips
+    return state["trips"]
+
+
+def duplicate_of(key: str, state: dict) -> str | None:
+    """Het bestelnummer van een al verwerkte bestelling voor dezelfde rit, of None."""
+    orders = trip_index(state).get(key)
+    return orders[0] if orders else None
@@ -114,6 +114,11 @@ SAMPLE_HTML_WRONG_LABEL = """<!DOCTYPE html>
 </html>"""
 
 
+def fake_save_screenshots(tickets, screenshots_dir, settings=None):
+    """Vervangt screenshot_gen.save_screenshots in tests: geen Chrome nodig."""
+    return {t.order_number: Path("/fake/screenshot.png") for t in tickets}
+
+
 # ---------------------------------------------------------------------------
 # Minimale Excel-fixture die de structuur van de echte onkostennota nabootst
 # ---------------------------------------------------------------------------
@@ -0,0 +1,74 @@
+"""
+Tests voor batch.py — regels en resultatenlogboek.
+"""
+import json
+from datetime import date
+
+from batch import (
+    ACCEPT,
+    REVIEW,
+    SKIP,
+    Rule,
+    append_batch_log,
+    batch_log_file,
+    classify,
+    default_rules,
+)
+from email_parser import TicketData
+
+
+def _make_ticket(from_station="Zottegem", to_station="Antwerpen-Zuid", travel_date=date(2026, 2, 4)):
+    return TicketData(
+        order_number="TST001",
+        from_station=from_station,
+        to_station=to_station,
+        direction="heen",
+        travel_date=travel_date,
+        price=14.0,
+        email_html="<html></html>",
+    )
+
+
+class TestDefaultRules:
+    rules = default_rules("Zottegem", "Antwerpen-Zuid")
+
+    def test_commute_on_work_day_accepted(self):
+        assert classify(_make_ticket(), self.rules) == (ACCEPT, "woon-werk")
+
+    def test_return_trip_accepted(self):
+        ticket = _make_ticket("Antwerpen-Zuid", "Zottegem")
+        assert classify(ticket, self.rules)[0] == ACCEPT
+
+    def test_station_case_ignored(self):
+        ticket = _make_ticket("ZOTTEGEM", "antwerpen-zuid")
+        assert classify(ticket, self.rules)[0] == ACCEPT
+
+    def test_weekend_skipped_even_for_commute(self):
+        ticket = _make_ticket(travel_date=date(2026, 2, 7))
+        assert classify(ticket, self.rules) == (SKIP, "niet-werkdag")
+
+    def test_other_route_needs_review(self):
+        ticket = _make_ticket("Zottegem", "Gent-Sint-Pieters")
+        assert classify(ticket, self.rules) == (REVIEW, "geen regel")
+
+    def test_without_stations_nothing_accepted(self):
+        assert classify(_make_ticket(), default_rules(None, None))[0] == REVIEW
+
+
+def test_first_matching_rule_wins():
+    rules = [
+        Rule("eerst", REVIEW, lambda t: t.price > 10),
+        Rule("daarna", ACCEPT, lambda t: True),
+    ]
+    assert classify(_make_ticket(), rules) == (REVIEW, "eerst")
+
+
+def test_log_appends_one_line_per_run(tmp_path):
+    path = batch_log_file(tmp_path / "processed.json")
+    append_batch_log({"added": 1}, path)
+    append_batch_log({"added": 0}, path)
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert path == tmp_path / "batch_log.jsonl"
+    assert [line["added"] for line in lines] == [1, 0]
+    assert "timestamp" in lines[0]
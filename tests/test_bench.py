@@ -0,0 +1,87 @@
+"""
+Tests voor bench/ (synthetische data en de vergelijking met de referentie)
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from bench.memory import DEFAULT_BUDGET_MB, resource
+from bench.run import compare, format_results_table, run_benchmarks
+from bench.synthetic import (
+    HOME_STATION,
+    OFFICE_STATION,
+    build_workbooks,
+    synthetic_mails,
+    synthetic_state,
+    synthetic_tickets,
+)
+from email_parser import parse_nmbs_email
+from excel_updater import DATA_END_ROW, DATA_START_ROW, scan_month_files
+from holidays_be import is_work_day
+
+
+def test_synthetic_mails_parse_to_synthetic_tickets():
+    mails = synthetic_mails(12)
+    tickets = synthetic_tickets(12)
+    assert len({order for _, order, _ in mails}) == 12
+    for (_, order, html), expected in zip(mails, tickets):
+        parsed = parse_nmbs_email(html, HOME_STATION, OFFICE_STATION)
+        assert parsed.order_number == order == expected.order_number
+        assert parsed.travel_date == expected.travel_date
+        assert parsed.direction == expected.direction
+        assert parsed.price == expected.price
+        assert is_work_day(parsed.travel_date)
+
+
+def test_synthetic_state_has_metadata_per_ticket():
+    tickets = synthetic_tickets(5)
+    state = synthetic_state(tickets)
+    assert state["processed"] == [t.order_number for t in tickets]
+    assert set(state["metadata"]) == set(state["processed"])
+
+
+def test_workbooks_overflow(tmp_path):
+    tickets = synthetic_tickets(40)
+    paths = build_workbooks(tickets, tmp_path)
+    rows = scan_month_files(paths)
+    assert sum(len(r) for r in rows.values()) == 40
+    assert max(len(r) for r in rows.values()) > DATA_END_ROW - DATA_START_ROW + 1
+
+
+def test_run_benchmarks_small_scale():
+    results = run_benchmarks((3,), ["parse", "state.lookup"], repeat=1, log=lambda _: None)
+    assert set(results) == {"parse", "state.lookup"}
+    assert results["parse"]["3"] > 0
+    assert "state.lookup" in format_results_table(results)
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"parse": {"100": 0.10, "1000": 1.0}, "excel.write": {"10": 0.001}}
+    results = {
+        "parse": {"100": 0.11, "1000": 1.5},
+        "excel.write": {"10": 0.002},  # x2, maar onder de ruisdrempel
+        "report": {"10": 5.0},         # geen referentie
+    }
+    assert compare(results, baseline) == [("parse", "1000", 1.5, 1.0)]
+
+
+def test_sync_case_runs_against_stub():
+    results = run_benchmarks((4,), ["gmail.fetch", "sync"], repeat=1, log=lambda _: None)
+    assert results["sync"]["4"] > 0
+
+
+@pytest.mark.skipif(resource is None, reason="geen resource-module (Windows)")
+def test_sync_peak_memory_for_5000_mails_within_budget():
+    """Regressietest: 5000 mails parsen en klaarzetten mag het piekgeheugen niet te veel doen stijgen."""
+    project = Path(__file__).resolve().parent.parent
+    proc = subprocess.run(
+        [sys.executable, "-m", "bench.memory", "--mails", "5000", "--json"],
+        cwd=project, capture_output=True, text=True, timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads(proc.stdout)
+    assert result["queued"] == 5000
+    assert result["growth_mb"] < DEFAULT_BUDGET_MB
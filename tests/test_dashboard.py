@@ -0,0 +1,113 @@
+"""
+Tests voor dashboard.py — cumulatief dashboard over alle runs.
+"""
+from datetime import date
+
+from dashboard import dashboard_dir, month_key, update_dashboard
+from email_parser import TicketData
+from excel_updater import date_to_excel_serial
+from state import mark_processed, month_aggregates, unmark_processed
+
+
+def _make_ticket(order, travel_date, price=14.0, direction="heen", to_s="Antwerpen-Zuid"):
+    return TicketData(
+        order_number=order,
+        from_station="Zottegem",
+        to_station=to_s,
+        direction=direction,
+        travel_date=travel_date,
+        price=price,
+        email_html="",
+    )
+
+
+JAN = [_make_ticket("JAN1", date(2026, 1, 7)), _make_ticket("JAN2", date(2026, 1, 8), 28.0)]
+FEB = [_make_ticket("FEB1", date(2026, 2, 3), 15.5)]
+
+
+def _processed(state, tickets):
+    """Zoals main: markeer de tickets als verwerkt, met metadata voor de maandtotalen."""
+    for t in tickets:
+        mark_processed(t.order_number, state, {
+            "filename": "x.xlsx",
+            "travel_date_serial": date_to_excel_serial(t.travel_date),
+            "description": f"Trein {t.from_station} - {t.to_station} {t.direction}",
+            "price": t.price,
+            "direction": t.direction,
+        })
+    return state
+
+
+def _state(tickets):
+    return _processed({"processed": [], "skipped_weekend": [], "metadata": {}}, tickets)
+
+
+class TestUpdateDashboard:
+    def test_creates_index_with_month_totals(self, tmp_path):
+        update = update_dashboard(JAN + FEB, None, tmp_path, _state(JAN + FEB))
+        assert update.index == dashboard_dir(tmp_path) / "index.html"
+        assert update.changed_months == ["2026-01", "2026-02"]
+        assert update.added == 3
+
+        # Geen eigen kopie van de totalen naast de state
+        assert not (dashboard_dir(tmp_path) / "aggregates.json").exists()
+        content = update.index.read_text(encoding="utf-8")
+        assert "42.00" in content and "15.50" in content
+        assert "Januari 2026" in content and "Februari 2026" in content
+        assert "57.50" in content  # totaal over alle maanden
+        # Nieuwste maand eerst
+        assert content.index('id="m2026-02"') < content.index('id="m2026-01"')
+
+    def test_only_changed_months_are_rerendered(self, tmp_path):
+        state = _state(JAN + FEB)
+        update_dashboard(JAN + FEB, None, tmp_path, state)
+        fragment = dashboard_dir(tmp_path) / "months" / "2026-01.html"
+        fragment.write_text("<tr><td>ONGEWIJZIGD</td></tr>\n", encoding="utf-8")
+
+        feb2 = _make_ticket("FEB2", date(2026, 2, 4))
+        update = update_dashboard([feb2], None, tmp_path, _processed(state, [feb2]))
+        assert update.changed_months == ["2026-02"]
+        assert fragment.read_text(encoding="utf-8").count("ONGEWIJZIGD") == 1
+        content = update.index.read_text(encoding="utf-8")
+        assert "ONGEWIJZIGD" in content  # bestaand fragment hergebruikt
+        assert "2 ticket(s)" in content.split('id="m2026-02"')[1].split("</p>")[0]
+
+    def test_known_tickets_are_not_added_twice(self, tmp_path):
+        state = _state(JAN)
+        update_dashboard(JAN, None, tmp_path, state)
+        update = update_dashboard(JAN, None, tmp_path, state)
+        assert update.changed_months == []
+        assert update.added == 0
+        assert month_aggregates(state)["2026-01"]["count"] == 2
+
+    def test_totals_follow_state_after_repair(self, tmp_path):
+        state = _state(JAN + FEB)
+        update_dashboard(JAN + FEB, None, tmp_path, state)
+        unmark_processed("JAN2", state)
+        unmark_processed("FEB1", state)
+
+        update = update_dashboard([], None, tmp_path, state, refresh={"2026-01"})
+        assert update.changed_months == ["2026-01"]
+        content = update.index.read_text(encoding="utf-8")
+        assert "28.00" not in content  # rij en totaal van JAN2 weg
+        assert 'id="m2026-02"' not in content  # maand zonder tickets meer
+        assert "14.00" in content
+
+    def test_screenshot_linked_relative_to_dashboard(self, tmp_path):
+        shot = tmp_path / "screenshots" / "2026-01" / "JAN1.png"
+        shot.parent.mkdir(parents=True)
+        shot.write_bytes(b"geen echte png")  # Pillow faalt: de screenshot zelf wordt getoond
+        update = update_dashboard(JAN, [shot, None], tmp_path / "reports", _state(JAN))
+        content = update.index.read_text(encoding="utf-8")
+        assert 'href="../../screenshots/2026-01/JAN1.png"' in content
+
+    def test_values_are_escaped(self, tmp_path):
+        ticket = _make_ticket("ESC1", date(2026, 3, 2), to_s="<b>Gent</b>")
+        update = update_dashboard([ticket], None, tmp_path, _state([ticket]))
+        content = update.index.read_text(encoding="utf-8")
+        assert "&lt;b&gt;Gent&lt;/b&gt;" in content
+        assert "<b>Gent</b>" not in content
+
+
+def test_month_key():
+    assert month_key(date(2026, 3, 31)) == "2026-03"
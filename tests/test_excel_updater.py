@@ -2,6 +2,7 @@
 Tests voor excel_updater.py (per-maand Excel-bestanden).
 """
 from datetime import date
+from unittest.mock import patch
 
 import openpyxl
 import pytest
@@ -9,8 +10,15 @@ import pytest
 from email_parser import TicketData
 from excel_updater import (
     add_ticket_to_excel,
+    add_tickets_by_month,
+    add_tickets_to_excel,
     excel_path_for_date,
+    excel_serial_to_date,
+    is_excel_locked,
+    month_excel_files,
     remove_ticket_from_excel,
+    scan_month_files,
+    scan_month_rows,
     date_to_excel_serial,
     sheet_name_for_date,
     _is_date_cell,
@@ -66,6 +74,12 @@ class TestDateToExcelSerial:
         assert date_to_excel_serial(date(1900, 1, 1)) == 2
 
 
+class TestExcelSerialToDate:
+    def test_round_trip(self):
+        d = date(2026, 2, 13)
+        assert excel_serial_to_date(date_to_excel_serial(d)) == d
+
+
 class TestAddTicketToExcel:
     def test_row_written(self, tmp_path):
         ticket = _make_ticket()
@@ -173,6 +187,112 @@ class TestAddTicketToExcel:
         assert filled_rows == 9
 
 
+def _lock_file(locked_path):
+    """Laat load_workbook een PermissionError geven voor een bepaald bestand."""
+    real_load = openpyxl.load_workbook
+
+    def fake_load(path, *args, **kwargs):
+        if str(path) == str(locked_path):
+            raise PermissionError(13, "Permission denied", str(path))
+        return real_load(path, *args, **kwargs)
+
+    return patch("openpyxl.load_workbook", side_effect=fake_load)
+
+
+class TestIsExcelLocked:
+    def test_missing_file_not_locked(self, tmp_path):
+        assert is_excel_locked(tmp_path / "Onkosten_Januari_2026.xlsx") is False
+
+    def test_closed_file_not_locked(self, temp_excel):
+        assert is_excel_locked(temp_excel) is False
+
+    def test_owner_file_means_locked(self, temp_excel):
+        (temp_excel.parent / f"~${temp_excel.name}").write_bytes(b"")
+        assert is_excel_locked(temp_excel) is True
+
+    def test_permission_error_means_locked(self, temp_excel):
+        with patch("builtins.open", side_effect=PermissionError):
+            assert is_excel_locked(temp_excel) is True
+
+
+class TestAddTicketsToExcel:
+    def test_writes_all_rows_with_single_save(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        tickets = [
+            _make_ticket(order=f"TST{i}", travel_date=date(2026, 1, i + 1))
+            for i in range(10)
+        ]
+        with patch("openpyxl.workbook.workbook.Workbook.save", autospec=True,
+                   side_effect=openpyxl.workbook.workbook.Workbook.save) as save:
+            path = add_tickets_to_excel(tickets, excel_dir)
+        # Eén save voor het aanmaken van het bestand, één voor de rijen
+        assert save.call_count == 2
+
+        rows = scan_month_rows(path)
+        assert [r.nr for r in rows] == list(range(1, 11))
+
+    def test_rejects_mixed_months(self, tmp_path):
+        tickets = [
+            _make_ticket(order="JAN", travel_date=date(2026, 1, 5)),
+            _make_ticket(order="FEB", travel_date=date(2026, 2, 5)),
+        ]
+        with pytest.raises(ValueError):
+            add_tickets_to_excel(tickets, tmp_path)
+
+
+class TestAddTicketsByMonth:
+    def test_writes_each_month_file(self, tmp_path):
+        tickets = [
+            _make_ticket(order="JAN1", travel_date=date(2026, 1, 5)),
+            _make_ticket(order="FEB1", travel_date=date(2026, 2, 5)),
+            _make_ticket(order="JAN2", travel_date=date(2026, 1, 6)),
+        ]
+        results = add_tickets_by_month(tickets, tmp_path)
+
+        jan = excel_path_for_date(tmp_path, date(2026, 1, 1))
+        feb = excel_path_for_date(tmp_path, date(2026, 2, 1))
+        assert results == {jan: None, feb: None}
+        assert len(scan_month_rows(jan)) == 2
+        assert len(scan_month_rows(feb)) == 1
+
+    def test_locked_month_does_not_block_others(self, tmp_path):
+        jan = add_ticket_to_excel(_make_ticket(order="OLD", travel_date=date(2026, 1, 2)), tmp_path)
+        tickets = [
+            _make_ticket(order="JAN1", travel_date=date(2026, 1, 5)),
+            _make_ticket(order="FEB1", travel_date=date(2026, 2, 5)),
+        ]
+        with _lock_file(jan):
+            results = add_tickets_by_month(tickets, tmp_path)
+
+        feb = excel_path_for_date(tmp_path, date(2026, 2, 1))
+        assert isinstance(results[jan], OSError)
+        assert "vergrendeld" in str(results[jan])
+        assert results[feb] is None
+        assert len(scan_month_rows(jan)) == 1
+
+    def test_corrupt_month_does_not_block_others(self, tmp_path):
+        jan = excel_path_for_date(tmp_path, date(2026, 1, 1))
+        jan.write_bytes(b"geen xlsx")
+        tickets = [
+            _make_ticket(order="JAN1", travel_date=date(2026, 1, 5)),
+            _make_ticket(order="FEB1", travel_date=date(2026, 2, 5)),
+        ]
+        results = add_tickets_by_month(tickets, tmp_path)
+
+        feb = excel_path_for_date(tmp_path, date(2026, 2, 1))
+        assert results[jan] is not None
+        assert results[feb] is None
+        assert len(scan_month_rows(feb)) == 1
+
+    def test_empty_list(self, tmp_path):
+        assert add_tickets_by_month([], tmp_path) == {}
+
+    def test_employee_name_in_new_files(self, tmp_path):
+        add_tickets_by_month([_make_ticket()], tmp_path, employee_name="An Peeters")
+        wb = openpyxl.load_workbook(excel_path_for_date(tmp_path, date(2026, 1, 1)))
+        assert wb.active["B4"].value == "An Peeters"
+
+
 class TestRemoveTicketFromExcel:
     def _add_and_get_path(self, excel_dir, ticket):
         """Voeg ticket toe en geef het bestandspad terug."""
@@ -354,3 +474,66 @@ class TestExcelStyling:
         ws = self._create_styled_ws(tmp_path)
         assert ws.column_dimensions["A"].width == 14
         assert ws.column_dimensions["C"].width == 42
+
+
+class TestScanMonthRows:
+    def test_returns_written_rows(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        excel_dir.mkdir()
+        for i in range(3):
+            add_ticket_to_excel(
+                _make_ticket(order=f"TST{i}", travel_date=date(2026, 1, i + 5), price=14.0),
+                excel_dir,
+            )
+
+        rows = scan_month_rows(excel_path_for_date(excel_dir, date(2026, 1, 1)))
+        assert [r.travel_date for r in rows] == [
+            date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7),
+        ]
+        assert [r.nr for r in rows] == [1, 2, 3]
+        assert rows[0].description == "Trein Zottegem - Antwerpen-Zuid heen/terug"
+        assert rows[0].amount == 14.0
+
+    def test_includes_overflow_rows(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        excel_dir.mkdir()
+        for i in range(10):
+            add_ticket_to_excel(
+                _make_ticket(order=f"TST{i:04d}", travel_date=date(2026, 1, i + 1)),
+                excel_dir,
+            )
+
+        rows = scan_month_rows(excel_path_for_date(excel_dir, date(2026, 1, 1)))
+        assert len(rows) == 10
+        assert rows[-1].nr == 10
+
+    def test_serial_int_dates(self, temp_excel_full):
+        """Oudere bestanden bewaren de datum als serieel getal."""
+        rows = scan_month_rows(temp_excel_full)
+        assert len(rows) == 8
+        assert rows[0].travel_date == date(2026, 1, 1)
+
+    def test_empty_month(self, temp_excel):
+        assert scan_month_rows(temp_excel) == []
+
+
+class TestScanMonthFiles:
+    def test_scans_multiple_months_and_skips_missing(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        excel_dir.mkdir()
+        add_ticket_to_excel(_make_ticket(order="JAN", travel_date=date(2026, 1, 5)), excel_dir)
+        add_ticket_to_excel(_make_ticket(order="FEB", travel_date=date(2026, 2, 5)), excel_dir)
+        missing = excel_path_for_date(excel_dir, date(2026, 3, 1))
+
+        result = scan_month_files(month_excel_files(excel_dir) + [missing])
+
+        assert set(result) == {
+            excel_path_for_date(excel_dir, date(2026, 1, 1)),
+            excel_path_for_date(excel_dir, date(2026, 2, 1)),
+        }
+        assert all(len(rows) == 1 for rows in result.values())
+
+    def test_month_files_ignore_lock_files(self, tmp_path):
+        (tmp_path / "Onkosten_Januari_2026.xlsx").write_bytes(b"")
+        (tmp_path / "~$Onkosten_Januari_2026.xlsx").write_bytes(b"")
+        assert [p.name for p in month_excel_files(tmp_path)] == ["Onkosten_Januari_2026.xlsx"]
@@ -1,11 +1,15 @@
 """Tests voor gmail_client.py -- OAuth2 token handling."""
 
+import base64
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
 
-from gmail_client import get_gmail_service
+from gmail_client import check_for_new_messages, fetch_nmbs_emails, get_gmail_service
 
 
 @pytest.fixture
@@ -82,3 +86,107 @@ def test_retryable_refresh_error_is_reraised(
 
     # Re-auth flow should NOT have been triggered
     mock_flow_cls.from_client_secrets_file.assert_not_called()
+
+
+@patch("gmail_client.build")
+def test_parallel_profiles_authenticate_one_at_a_time(mock_build, tmp_path):
+    """Threads van verschillende profielen melden na elkaar aan, niet tegelijk."""
+    active = []
+    overlap = []
+
+    def slow_credentials(client_secret_path, token_path):
+        active.append(token_path)
+        overlap.append(len(active))
+        time.sleep(0.05)
+        active.remove(token_path)
+        return MagicMock()
+
+    with patch("gmail_client._credentials", side_effect=slow_credentials):
+        threads = [
+            threading.Thread(
+                target=get_gmail_service,
+                args=(tmp_path / "client_secret.json", tmp_path / f"token_{i}.json"),
+            )
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert overlap == [1, 1, 1]
+    assert mock_build.call_count == 3
+
+
+def _raw_message(order):
+    raw = (
+        f"Subject: {order} - NMBS Mobile Ticket\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n\r\n"
+        f"<html>{order}</html>"
+    ).encode()
+    return {"raw": base64.urlsafe_b64encode(raw).decode().rstrip("=")}
+
+
+def _fake_service(message_ids, history_pages=None):
+    service = MagicMock()
+    messages = service.users.return_value.messages.return_value
+    messages.list.return_value.execute.return_value = {
+        "messages": [{"id": i} for i in message_ids]
+    }
+    messages.get.side_effect = lambda userId, id, format: MagicMock(
+        execute=MagicMock(return_value=_raw_message(f"ORDER{id}"))
+    )
+    history = service.users.return_value.history.return_value
+    history.list.return_value.execute.side_effect = history_pages or []
+    return service
+
+
+def test_fetch_reuses_service_and_skips_known_ids():
+    service = _fake_service(["1", "2", "3"])
+
+    with patch("gmail_client.get_gmail_service") as get_service:
+        emails = fetch_nmbs_emails(None, None, service=service, skip_ids={"2"})
+
+    get_service.assert_not_called()
+    assert [(m, o) for m, o, _ in emails] == [("1", "ORDER1"), ("3", "ORDER3")]
+    messages = service.users.return_value.messages.return_value
+    assert messages.get.call_count == 2
+
+
+def test_unreadable_messages_are_reported():
+    service = _fake_service(["1", "2"])
+    messages = service.users.return_value.messages.return_value
+    messages.get.side_effect = lambda userId, id, format: MagicMock(
+        execute=MagicMock(return_value={"raw": ""} if id == "2" else _raw_message(f"ORDER{id}"))
+    )
+    unreadable = set()
+
+    emails = fetch_nmbs_emails(None, None, service=service, unreadable=unreadable)
+
+    assert [m for m, _, _ in emails] == ["1"]
+    assert unreadable == {"2"}
+
+
+def test_no_history_means_nothing_new():
+    service = _fake_service([], history_pages=[{"historyId": "101"}])
+    assert check_for_new_messages(service, "100") == (False, "101")
+
+
+def test_history_with_added_messages():
+    service = _fake_service([], history_pages=[
+        {"history": [{"id": "101"}], "historyId": "102", "nextPageToken": "p2"},
+        {"historyId": "103"},
+    ])
+    assert check_for_new_messages(service, "100") == (True, "103")
+
+
+def test_expired_history_id_triggers_full_check():
+    service = _fake_service([])
+    history = service.users.return_value.history.return_value
+    history.list.return_value.execute.side_effect = HttpError(
+        MagicMock(status=404), b"historyId te oud"
+    )
+    service.users.return_value.getProfile.return_value.execute.return_value = {
+        "historyId": "500"
+    }
+    assert check_for_new_messages(service, "1") == (True, "500")
@@ -0,0 +1,83 @@
+"""
+Tests voor bench/gmail_stub.py: gmail_client over echte HTTP tegen de lokale stand-in
+"""
+from unittest.mock import patch
+
+import pytest
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+
+from bench.gmail_stub import GmailStub
+from bench.synthetic import synthetic_raw_messages
+from gmail_client import (
+    check_for_new_messages,
+    current_history_id,
+    fetch_nmbs_emails,
+    local_gmail_service,
+)
+
+
+@pytest.fixture
+def messages():
+    return synthetic_raw_messages(5)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    """googleapiclient wacht tussen herhalingen; in tests hoeft dat niet."""
+    with patch("googleapiclient.http.time.sleep"):
+        yield
+
+
+def test_fetch_follows_pagination(messages):
+    with GmailStub(messages, page_size=2) as stub:
+        emails = fetch_nmbs_emails(None, None, api_endpoint=stub.endpoint)
+    assert [order for _, order, _ in emails] == ["B0000000", "B0000001", "B0000002", "B0000003", "B0000004"]
+    assert "Bestelnummer: B0000000" in emails[0][2]
+    assert stub.requests["list"] == 3
+    assert stub.requests["get"] == 5
+
+
+def test_injected_errors_are_retried(messages):
+    with GmailStub(messages, error_rate=0.3, seed=3) as stub:
+        emails = fetch_nmbs_emails(None, None, api_endpoint=stub.endpoint)
+    assert len(emails) == 5
+    assert sum(stub.errors.values()) > 0
+
+
+def test_persistent_errors_surface_as_http_error(messages):
+    with GmailStub(messages, error_rate=1.0, error_status=500) as stub:
+        with pytest.raises(HttpError) as exc_info:
+            fetch_nmbs_emails(None, None, api_endpoint=stub.endpoint)
+    assert exc_info.value.resp.status == 500
+    assert stub.requests["list"] == 4  # eerste poging + 3 herhalingen
+
+
+def test_history_reports_new_and_expired(messages):
+    with GmailStub(messages[:3]) as stub:
+        service = local_gmail_service(stub.endpoint)
+        start = current_history_id(service)
+        assert check_for_new_messages(service, start) == (False, start)
+
+        latest = stub.add_messages(messages[3:])
+        assert check_for_new_messages(service, start) == (True, latest)
+
+        stub.expire_history()
+        assert check_for_new_messages(service, start) == (True, latest)
+
+
+def test_batch_endpoint(messages):
+    results = {}
+    with GmailStub(messages) as stub:
+        service = local_gmail_service(stub.endpoint)
+        batch = BatchHttpRequest(
+            callback=lambda rid, resp, exc: results.__setitem__(rid, (resp, exc)),
+            batch_uri=stub.endpoint + "batch/gmail/v1",
+        )
+        for msg_id in ("msg00000000", "msg00000004", "bestaat-niet"):
+            batch.add(service.users().messages().get(userId="me", id=msg_id, format="raw"))
+        batch.execute()
+    assert results["1"][0]["id"] == "msg00000000"
+    assert results["2"][0]["id"] == "msg00000004"
+    assert results["3"][1].resp.status == 404
+    assert stub.requests["batch"] == 1
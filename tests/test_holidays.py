@@ -2,8 +2,21 @@
 Tests voor holidays_be.py
 """
 from datetime import date
+from unittest.mock import MagicMock, patch
 
-from holidays_be import is_work_day, day_type_label
+import pytest
+
+import holidays_be
+from holidays_be import (
+    WorkCalendar,
+    calendar_from_config,
+    configure_calendar,
+    day_type_label,
+    holiday_table,
+    is_work_day,
+    refresh,
+    work_day_mask,
+)
 
 
 class TestIsWorkDay:
@@ -45,3 +58,120 @@ class TestDayTypeLabel:
 
     def test_workday_label(self):
         assert day_type_label(date(2026, 2, 2)) == "werkdag"
+
+
+class TestHolidayTable:
+    def test_built_once_per_year(self):
+        refresh()
+        with patch("holidays_be.holidays.Belgium", wraps=holidays_be.holidays.Belgium) as belgium:
+            for day in range(1, 29):
+                is_work_day(date(2026, 2, day))
+                day_type_label(date(2026, 2, day))
+        assert belgium.call_count == 1
+
+    def test_refresh_rebuilds(self):
+        holiday_table(2026)
+        refresh()
+        with patch("holidays_be.holidays.Belgium", wraps=holidays_be.holidays.Belgium) as belgium:
+            holiday_table(2026)
+        assert belgium.call_count == 1
+
+    def test_table_is_read_only(self):
+        table = holiday_table(2026)
+        assert date(2026, 1, 1) in table
+        with pytest.raises(TypeError):
+            table[date(2026, 2, 2)] = "verzonnen"
+
+
+class TestWorkDayMask:
+    def test_matches_is_work_day(self):
+        dates = [
+            date(2026, 2, 2),    # maandag
+            date(2026, 2, 7),    # zaterdag
+            date(2026, 1, 1),    # Nieuwjaar
+            date(2025, 12, 25),  # Kerstmis, ander jaar
+            date(2025, 12, 24),  # woensdag
+        ]
+        assert work_day_mask(dates) == [is_work_day(d) for d in dates]
+        assert work_day_mask(dates) == [True, False, False, False, True]
+
+    def test_empty(self):
+        assert work_day_mask([]) == []
+
+
+class TestWorkCalendar:
+    def test_bridge_day_is_off(self):
+        cal = WorkCalendar({date(2026, 5, 15): "brugdag"})
+        assert cal.is_work_day(date(2026, 5, 15)) is False
+        assert cal.label(date(2026, 5, 15)) == "vrije dag (brugdag)"
+        assert cal.is_work_day(date(2026, 5, 18)) is True
+
+    def test_forced_work_day_wins(self):
+        cal = WorkCalendar(
+            {date(2026, 11, 11): "verlof"},
+            forced_work_days=[date(2026, 2, 7), date(2026, 11, 11)],
+        )
+        assert cal.is_work_day(date(2026, 2, 7)) is True    # zaterdag
+        assert cal.is_work_day(date(2026, 11, 11)) is True  # feestdag en verlof
+        assert cal.label(date(2026, 2, 7)) == "werkdag"
+
+    def test_labels_without_extra_layers(self):
+        cal = WorkCalendar()
+        assert cal.label(date(2026, 2, 8)) == "zondag"
+        assert cal.label(date(2026, 12, 25)).startswith("feestdag (")
+
+    def test_bitmap_built_once_per_year(self):
+        cal = WorkCalendar()
+        cal.is_work_day(date(2028, 2, 29))
+        with patch("holidays_be.holiday_table") as table:
+            assert cal.work_day_mask([date(2028, 2, 29), date(2028, 12, 31)]) == [True, False]
+        table.assert_not_called()
+
+
+class TestCalendarFromConfig:
+    def test_days_ranges_and_forced(self):
+        cfg = MagicMock(
+            EXTRA_DAYS_OFF={"2026-05-15": "brugdag", ("2026-07-20", "2026-07-22"): "verlof"},
+            FORCED_WORK_DAYS=["2026-02-07", date(2026, 2, 8)],
+        )
+        cal = calendar_from_config(cfg)
+        assert cal.extra_days_off == {
+            date(2026, 5, 15): "brugdag",
+            date(2026, 7, 20): "verlof",
+            date(2026, 7, 21): "verlof",
+            date(2026, 7, 22): "verlof",
+        }
+        assert cal.forced_work_days == {date(2026, 2, 7), date(2026, 2, 8)}
+
+    def test_list_form_and_invalid_entries(self, capsys):
+        cfg = MagicMock(EXTRA_DAYS_OFF=["2026-05-15", "15/05/2026"], FORCED_WORK_DAYS=None)
+        cal = calendar_from_config(cfg)
+        assert cal.extra_days_off == {date(2026, 5, 15): ""}
+        assert cal.label(date(2026, 5, 15)) == "vrije dag"
+        assert "15/05/2026" in capsys.readouterr().out
+
+    def test_list_form_with_list_period(self):
+        cfg = MagicMock(EXTRA_DAYS_OFF=[["2026-07-20", "2026-07-22"], "2026-05-15"], FORCED_WORK_DAYS=None)
+        cal = calendar_from_config(cfg)
+        assert set(cal.extra_days_off) == {
+            date(2026, 5, 15), date(2026, 7, 20), date(2026, 7, 21), date(2026, 7, 22),
+        }
+
+    def test_reversed_period_is_reported(self, capsys):
+        cfg = MagicMock(
+            EXTRA_DAYS_OFF=[["2026-07-24", "2026-07-20"]],
+            FORCED_WORK_DAYS=[("2026-02-08", "2026-02-07")],
+        )
+        cal = calendar_from_config(cfg)
+        assert cal.extra_days_off == {}
+        assert cal.forced_work_days == set()
+        out = capsys.readouterr().out
+        assert "EXTRA_DAYS_OFF" in out and "2026-07-24" in out
+        assert "FORCED_WORK_DAYS" in out
+
+    def test_configure_backs_module_functions(self, monkeypatch):
+        monkeypatch.setattr(holidays_be, "_calendar", holidays_be._calendar)
+        configure_calendar(WorkCalendar({date(2026, 2, 2): "verlof"}))
+        assert is_work_day(date(2026, 2, 2)) is False
+        assert day_type_label(date(2026, 2, 2)) == "vrije dag (verlof)"
+        assert work_day_mask([date(2026, 2, 2), date(2026, 2, 3)]) == [False, True]
@@ -2,14 +2,18 @@
 Tests voor main.py — mock de Gmail client en gebruikersinput.
 """
 from datetime import date
-from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 
 from email_parser import TicketData
 from excel_updater import excel_path_for_date
-from tests.conftest import SAMPLE_HTML_ROUND_TRIP, SAMPLE_HTML_SINGLE_HEEN, SAMPLE_HTML_WRONG_LABEL
+from tests.conftest import (
+    SAMPLE_HTML_ROUND_TRIP,
+    SAMPLE_HTML_SINGLE_HEEN,
+    SAMPLE_HTML_WRONG_LABEL,
+    fake_save_screenshots,
+)
 
 
 def _make_raw_email_list(*html_samples):
@@ -28,6 +32,15 @@ def mock_config(tmp_path):
     mock.EXCEL_DIR.mkdir()
     mock.SCREENSHOTS_DIR = tmp_path / "screenshots"
     mock.SCREENSHOTS_DIR.mkdir()
+    mock.SCREENSHOT_FORMAT = "png"
+    mock.SCREENSHOT_QUALITY = 80
+    mock.SCREENSHOT_CROP = True
+    mock.EXTRA_DAYS_OFF = {}
+    mock.FORCED_WORK_DAYS = []
+    mock.WATCH_INTERVAL = 300
+    mock.GMAIL_API_ENDPOINT = None
+    mock.REPORTS_DIR = None
+    mock.EMPLOYEE_NAME = "Stijn Van der Spiegel"
     mock.CLIENT_SECRET_PATH = tmp_path / "credentials" / "client_secret.json"
     mock.TOKEN_PATH = tmp_path / "credentials" / "token.json"
     mock.STATE_FILE = tmp_path / "processed.json"
@@ -36,6 +49,25 @@ def mock_config(tmp_path):
     return mock
 
 
+class TestParseBulkCommand:
+    def test_range_and_single(self):
+        import main
+        assert main.parse_bulk_command("a 1-3", 5, [1, 2, 3, 4, 5]) == ("accept", [1, 2, 3])
+        assert main.parse_bulk_command("s 4", 5, [4, 5]) == ("skip", [4])
+        assert main.parse_bulk_command("l 1,3-4", 5, []) == ("review", [1, 3, 4])
+
+    def test_rest_means_undecided(self):
+        import main
+        assert main.parse_bulk_command("A rest", 5, [2, 5]) == ("accept", [2, 5])
+        assert main.parse_bulk_command("s alles", 3, [3]) == ("skip", [1, 2, 3])
+
+    @pytest.mark.parametrize("command", ["x 1", "a", "a 0", "a 2-9", "a 3-1", "a een"])
+    def test_invalid_commands(self, command):
+        import main
+        with pytest.raises(ValueError):
+            main.parse_bulk_command(command, 5, [1, 2, 3, 4, 5])
+
+
 class TestMainFlow:
     def test_ticket_added_on_yes(self, mock_config):
         """Ticket wordt aan het per-maand Excel-bestand toegevoegd als gebruiker 'j' antwoordt."""
@@ -47,7 +79,7 @@ class TestMainFlow:
         with (
             patch("main.config", mock_config),
             patch("main.fetch_nmbs_emails", return_value=raw_emails),
-            patch("main.save_screenshot", return_value=Path("/fake/screenshot.png")),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
             patch("builtins.input", return_value="j"),
         ):
             import main
@@ -59,6 +91,27 @@ class TestMainFlow:
         ws = wb.active
         assert ws.cell(row=DATA_START_ROW, column=COL_VERVOER).value == 28.0
 
+    def test_reports_and_dashboard_written(self, mock_config):
+        """Met REPORTS_DIR komt er een run-rapport en wordt het dashboard bijgewerkt."""
+        from dashboard import dashboard_dir
+
+        mock_config.REPORTS_DIR = mock_config.EXCEL_DIR.parent / "reports"
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+            patch("webbrowser.open"),
+        ):
+            import main
+            main.main()
+
+        assert list(mock_config.REPORTS_DIR.glob("run_*.html"))
+        index = dashboard_dir(mock_config.REPORTS_DIR) / "index.html"
+        assert "Februari 2026" in index.read_text(encoding="utf-8")
+
     def test_ticket_skipped_on_no(self, mock_config):
         """Ticket wordt NIET toegevoegd als gebruiker 'n' antwoordt."""
         raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
@@ -98,6 +151,287 @@ class TestMainFlow:
         assert "UPL1IGGK" in state.get("skipped_weekend", []) or \
                "UPL1IGGK" in state.get("processed", [])
 
+    def test_configured_day_off_asks_first(self, mock_config, monkeypatch, capsys):
+        """Een brugdag uit EXTRA_DAYS_OFF wordt nagevraagd zoals een weekenddag."""
+        import holidays_be
+        from state import load_state
+
+        monkeypatch.setattr(holidays_be, "_calendar", holidays_be.WorkCalendar())
+        mock_config.EXTRA_DAYS_OFF = {"2026-02-13": "brugdag"}
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("builtins.input", return_value="n"),
+        ):
+            import main
+            main.main()
+
+        assert "vrije dag (brugdag)" in capsys.readouterr().out
+        assert "UPL1IGGK" in load_state(mock_config.STATE_FILE)["skipped_weekend"]
+
+    def test_batch_applies_rules_without_input(self, mock_config):
+        """--batch: woon-werk aanvaard, weekend overgeslagen, rest ter controle, met logboek."""
+        import json
+        from batch import batch_log_file
+        from state import load_state
+
+        saturday_html = SAMPLE_HTML_ROUND_TRIP.replace("13/02/2026", "14/02/2026")
+        other_route = SAMPLE_HTML_ROUND_TRIP.replace("ANTWERPEN-ZUID", "GENT-SINT-PIETERS")
+        raw_emails = _make_raw_email_list(
+            ("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP),
+            ("ZATERDAG", saturday_html.replace("UPL1IGGK", "ZATERDAG")),
+            ("GENTGENT", other_route.replace("UPL1IGGK", "GENTGENT")),
+        )
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", side_effect=AssertionError("geen input in batch")),
+            patch("webbrowser.open") as browser,
+        ):
+            import main
+            main.main(batch=True)
+
+        state = load_state(mock_config.STATE_FILE)
+        assert state["processed"] == ["UPL1IGGK"]
+        assert state["skipped_weekend"] == ["ZATERDAG"]
+        browser.assert_not_called()
+
+        log = json.loads(batch_log_file(mock_config.STATE_FILE).read_text(encoding="utf-8"))
+        assert (log["added"], log["skipped"], log["review"]) == (1, 1, 1)
+        by_order = {t["order_number"]: t for t in log["tickets"]}
+        assert by_order["UPL1IGGK"]["excel"] == "toegevoegd"
+        assert by_order["UPL1IGGK"]["screenshot"].endswith("screenshot.png")
+        assert by_order["GENTGENT"]["decision"] == "review"
+
+        from review_queue import load_review_queue, review_file
+        assert list(load_review_queue(review_file(mock_config.STATE_FILE))) == ["GENTGENT"]
+
+    def test_batch_holds_back_duplicate_trip(self, mock_config):
+        """Dezelfde rit onder een ander bestelnummer wordt in batch niet weggeschreven."""
+        from state import load_state
+
+        raw_emails = _make_raw_email_list(
+            ("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP),
+            ("HERUITG1", SAMPLE_HTML_ROUND_TRIP.replace("UPL1IGGK", "HERUITG1")),
+        )
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+        ):
+            import main
+            main.main(batch=True)
+
+        assert load_state(mock_config.STATE_FILE)["processed"] == ["UPL1IGGK"]
+        from review_queue import load_review_queue, review_file
+        assert list(load_review_queue(review_file(mock_config.STATE_FILE))) == ["HERUITG1"]
+
+    def test_duplicate_trip_defaults_to_no(self, mock_config, capsys):
+        """Interactief: een rit die al verwerkt is, wordt gemeld en Enter slaat ze over."""
+        from state import load_state
+
+        first = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+        again = _make_raw_email_list(("HERUITG1", SAMPLE_HTML_ROUND_TRIP.replace("UPL1IGGK", "HERUITG1")))
+        with (
+            patch("main.config", mock_config),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value=""),
+        ):
+            import main
+            with patch("main.fetch_nmbs_emails", return_value=first):
+                main.main()
+            with patch("main.fetch_nmbs_emails", return_value=again):
+                main.main()
+
+        assert load_state(mock_config.STATE_FILE)["processed"] == ["UPL1IGGK"]
+        assert "Mogelijk dubbel" in capsys.readouterr().out
+
+    def test_batch_logs_empty_run(self, mock_config):
+        """Ook een run zonder nieuwe tickets laat een regel in het logboek na."""
+        from batch import batch_log_file
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=[]),
+        ):
+            import main
+            main.main(batch=True)
+
+        assert batch_log_file(mock_config.STATE_FILE).exists()
+
+    def test_sync_then_review_without_gmail(self, mock_config):
+        """--sync zet tickets klaar zonder vragen; --review toont ze zonder Gmail."""
+        from review_queue import load_review_queue, review_file
+        from state import load_state
+
+        raw_emails = _make_raw_email_list(
+            ("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP),
+            ("TST00001", SAMPLE_HTML_SINGLE_HEEN),
+        )
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails) as fetch,
+            patch("builtins.input", side_effect=AssertionError("sync vraagt niets")),
+        ):
+            import main
+            assert main.sync() == 2
+            assert main.sync() == 0  # al klaargezet, niet opnieuw geparsed
+        assert fetch.call_count == 2
+
+        answers = iter(["j", "n"])
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", side_effect=AssertionError("geen Gmail")),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", side_effect=lambda _prompt: next(answers)),
+        ):
+            main.main(fetch=False)
+
+        state = load_state(mock_config.STATE_FILE)
+        assert len(state["processed"]) == 1
+        remaining = load_review_queue(review_file(mock_config.STATE_FILE))
+        assert len(remaining) == 1
+        assert not set(remaining) & set(state["processed"])
+
+    def test_stale_review_entries_are_pruned(self, mock_config):
+        """Een ticket dat al verwerkt is, verdwijnt uit de reviewwachtrij."""
+        from review_queue import enqueue_for_review, load_review_queue, review_file
+        from state import load_state, mark_processed, save_state
+        from email_parser import parse_nmbs_email
+
+        path = review_file(mock_config.STATE_FILE)
+        ticket = parse_nmbs_email(SAMPLE_HTML_ROUND_TRIP)
+        enqueue_for_review([ticket], {}, path)
+        state = load_state(mock_config.STATE_FILE)
+        mark_processed(ticket.order_number, state)
+        save_state(state, mock_config.STATE_FILE)
+
+        with patch("main.config", mock_config):
+            import main
+            main.main(fetch=False)
+
+        assert load_review_queue(path) == {}
+
+    def test_bulk_review_writes_approved_set_at_once(self, mock_config, capsys):
+        """--bulk: één tabel, bereikcommando's, één schrijfactie voor de aanvaarde tickets."""
+        from review_queue import load_review_queue, review_file
+        from state import load_state
+
+        raw_emails = _make_raw_email_list(
+            ("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP),
+            ("TST00001", SAMPLE_HTML_SINGLE_HEEN),
+            ("ZATERDAG", SAMPLE_HTML_ROUND_TRIP.replace("13/02/2026", "14/02/2026")
+                .replace("UPL1IGGK", "ZATERDAG")),
+        )
+        answers = iter(["a 9", "s 3", "a 1", "klaar"])
+
+        import main
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("main.add_tickets_by_month", wraps=main.add_tickets_by_month) as add,
+            patch("builtins.input", side_effect=lambda _prompt: next(answers)),
+        ):
+            main.main(bulk=True)
+
+        state = load_state(mock_config.STATE_FILE)
+        out = capsys.readouterr().out
+        assert "Status" in out
+        assert "(!!) zaterdag" in out
+        assert "buiten 1-3" in out
+        assert state["skipped_weekend"] == ["ZATERDAG"]
+        assert len(state["processed"]) == 1
+        assert add.call_count == 1
+        # Het ticket zonder beslissing blijft klaarstaan
+        assert len(load_review_queue(review_file(mock_config.STATE_FILE))) == 1
+
+    def test_watch_polls_history_and_fetches_only_when_changed(self, mock_config):
+        """--watch: eerste cyclus volledig, daarna enkel ophalen als history iets meldt."""
+        from review_queue import load_review_queue, review_file
+
+        fetch_results = [
+            _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP)),
+            [("msg_new", "TST00001", SAMPLE_HTML_SINGLE_HEEN)],
+        ]
+        with (
+            patch("main.config", mock_config),
+            patch("main.get_gmail_service", return_value="SERVICE"),
+            patch("main.current_history_id", return_value="1"),
+            patch("main.check_for_new_messages", side_effect=[(False, "1"), (True, "2")]) as check,
+            patch("main.fetch_nmbs_emails", side_effect=fetch_results) as fetch,
+            patch("main.time.sleep") as sleep,
+            patch("builtins.input", side_effect=AssertionError("watch vraagt niets")),
+        ):
+            import main
+            main.watch(max_cycles=3)
+
+        assert check.call_count == 2
+        assert fetch.call_count == 2
+        assert fetch.call_args_list[1].kwargs["service"] == "SERVICE"
+        assert fetch.call_args_list[1].kwargs["skip_ids"] == {"msg_id_0", "msg_new"}
+        sleep.assert_called_with(300.0)
+        queued = load_review_queue(review_file(mock_config.STATE_FILE))
+        assert len(queued) == 2
+
+    def test_watch_survives_gmail_errors(self, mock_config, capsys):
+        """--watch: netwerkfouten worden gemeld met een langere wachttijd, niet fataal."""
+        import socket
+
+        skipped = []
+
+        def fetch(*_args, skip_ids=(), unreadable=None, **_kwargs):
+            skipped.append(set(skip_ids))
+            if len(skipped) == 1:
+                raise OSError("netwerk weg")
+            unreadable.add("msg_zonder_html")
+            return []
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.get_gmail_service", return_value="SERVICE"),
+            patch("main.current_history_id", return_value="1"),
+            patch(
+                "main.check_for_new_messages",
+                side_effect=[socket.timeout("timed out"), (True, "2")],
+            ),
+            patch("main.fetch_nmbs_emails", side_effect=fetch),
+            patch("main.time.sleep") as sleep,
+        ):
+            import main
+            main.watch(max_cycles=4)
+
+        # 1: ophalen mislukt; 2: opnieuw, lukt; 3: controle mislukt; 4: controle meldt iets, ophalen
+        assert len(skipped) == 3
+        assert "msg_zonder_html" in skipped[2]  # niet opnieuw gedownload
+        assert [c.args[0] for c in sleep.call_args_list] == [600.0, 300.0, 600.0]
+        out = capsys.readouterr().out
+        assert "netwerk weg" in out
+        assert "timed out" in out
+
+    def test_watch_survives_gmail_error_at_startup(self, mock_config, capsys):
+        """Een fout bij het eerste historyId stopt --watch niet: de volgende cyclus probeert opnieuw."""
+        with (
+            patch("main.config", mock_config),
+            patch("main.get_gmail_service", return_value="SERVICE"),
+            patch("main.current_history_id", side_effect=[OSError("netwerk weg"), "1"]) as current,
+            patch("main.check_for_new_messages", return_value=(False, "1")) as check,
+            patch("main.fetch_nmbs_emails", return_value=[]) as fetch,
+            patch("main.time.sleep"),
+        ):
+            import main
+            main.watch(max_cycles=3)
+
+        assert current.call_count == 2
+        assert fetch.call_count == 1
+        check.assert_called_once_with("SERVICE", "1")
+        assert "netwerk weg" in capsys.readouterr().out
+
     def test_already_processed_skipped(self, mock_config):
         """Al-verwerkte tickets worden stilzwijgend overgeslagen."""
         from state import load_state, save_state, mark_processed
@@ -133,6 +467,150 @@ class TestMainFlow:
         assert "geen nieuwe tickets" in out.lower()
 
 
+    def test_locked_month_not_marked_processed(self, mock_config, capsys):
+        """Een vergrendeld maandbestand blokkeert alleen de tickets van die maand."""
+        from outbox import load_outbox, outbox_file
+        from state import load_state
+
+        raw_emails = _make_raw_email_list(
+            ("ABC12345", SAMPLE_HTML_SINGLE_HEEN),  # 07/01/2026
+            ("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP),   # 13/02/2026
+        )
+        jan_path = excel_path_for_date(mock_config.EXCEL_DIR, date(2026, 1, 1))
+
+        import excel_updater
+        real_add = excel_updater.add_tickets_to_excel
+
+        def fake_add(tickets, excel_dir, *args):
+            if excel_path_for_date(excel_dir, tickets[0].travel_date) == jan_path:
+                raise OSError(f"Het Excel-bestand is vergrendeld: {jan_path}")
+            return real_add(tickets, excel_dir, *args)
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("excel_updater.add_tickets_to_excel", side_effect=fake_add),
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+
+        state = load_state(mock_config.STATE_FILE)
+        assert "UPL1IGGK" in state["processed"]
+        assert "ABC12345" not in state["processed"]
+        assert set(load_outbox(outbox_file(mock_config.STATE_FILE))) == {"ABC12345"}
+        out = capsys.readouterr().out
+        assert "Onkosten_Januari_2026.xlsx" in out
+        assert "wachtrij" in out
+
+    def test_outbox_flushed_on_next_run_without_prompt(self, mock_config):
+        """Een eerder aanvaard ticket uit de wachtrij wordt weggeschreven zonder nieuwe vraag."""
+        from email_parser import parse_nmbs_email
+        from outbox import append_to_outbox, load_outbox, outbox_file
+        from state import load_state
+
+        ticket = parse_nmbs_email(SAMPLE_HTML_SINGLE_HEEN)
+        append_to_outbox(ticket, outbox_file(mock_config.STATE_FILE))
+        raw_emails = _make_raw_email_list(("ABC12345", SAMPLE_HTML_SINGLE_HEEN))
+        input_calls = []
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots) as shots,
+            patch("builtins.input", side_effect=lambda _: input_calls.append(1) or "j"),
+        ):
+            import main
+            main.main()
+
+        assert input_calls == []
+        # De vorige run kwam niet meer aan de screenshot toe: alsnog gemaakt
+        assert [t.order_number for t in shots.call_args.args[0]] == ["ABC12345"]
+        assert "ABC12345" in load_state(mock_config.STATE_FILE)["processed"]
+        assert load_outbox(outbox_file(mock_config.STATE_FILE)) == {}
+        jan_path = excel_path_for_date(mock_config.EXCEL_DIR, date(2026, 1, 1))
+        assert jan_path.exists()
+
+    def test_crash_between_state_and_outbox_save_writes_no_duplicate(self, mock_config):
+        """Een crash na save_state maar vóór save_outbox geeft geen tweede Excel-rij."""
+        from email_parser import parse_nmbs_email
+        from excel_updater import scan_month_rows
+        from outbox import append_to_outbox, load_outbox, outbox_file
+
+        ticket = parse_nmbs_email(SAMPLE_HTML_SINGLE_HEEN)
+        append_to_outbox(ticket, outbox_file(mock_config.STATE_FILE))
+        jan_path = excel_path_for_date(mock_config.EXCEL_DIR, date(2026, 1, 1))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=[]),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("main.save_outbox", side_effect=KeyboardInterrupt),
+        ):
+            import main
+            with pytest.raises(KeyboardInterrupt):
+                main.main()
+        assert set(load_outbox(outbox_file(mock_config.STATE_FILE))) == {"ABC12345"}
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=[]),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+        ):
+            main.main()
+
+        assert len(list(scan_month_rows(jan_path))) == 1
+        assert load_outbox(outbox_file(mock_config.STATE_FILE)) == {}
+
+    def test_file_locked_before_run_goes_to_outbox(self, mock_config, capsys):
+        """Een bestand dat al open staat in Excel wordt niet eens geprobeerd."""
+        from outbox import load_outbox, outbox_file
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("main.is_excel_locked", return_value=True),
+            patch("main.add_tickets_by_month") as add_mock,
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+
+        add_mock.assert_not_called()
+        assert set(load_outbox(outbox_file(mock_config.STATE_FILE))) == {"UPL1IGGK"}
+        assert "geopend in Excel" in capsys.readouterr().out
+
+    def test_screenshot_failure_reported_in_summary(self, mock_config, capsys):
+        """Een mislukte achtergrond-screenshot blokkeert niets en staat in de samenvatting."""
+        from state import load_state
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch(
+                "main.save_screenshots",
+                side_effect=lambda tickets, _dir, _settings=None: {
+                    t.order_number: RuntimeError("Chrome niet gevonden") for t in tickets
+                },
+            ),
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+
+        assert "UPL1IGGK" in load_state(mock_config.STATE_FILE)["processed"]
+        out = capsys.readouterr().out
+        assert "1 screenshot(s) mislukt" in out
+        assert "UPL1IGGK" in out.split("screenshot(s) mislukt")[1]
+        assert "Chrome niet gevonden" in out
+
+
 class TestDirectionCorrection:
     def test_wrong_label_corrected_to_terug(self, mock_config):
         """
@@ -147,7 +625,7 @@ class TestDirectionCorrection:
         with (
             patch("main.config", mock_config),
             patch("main.fetch_nmbs_emails", return_value=raw_emails),
-            patch("main.save_screenshot", return_value=Path("/fake/screenshot.png")),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
             patch("builtins.input", return_value="j"),
         ):
             import main
@@ -177,7 +655,7 @@ class TestDirectionCorrection:
         with (
             patch("main.config", mock_config),
             patch("main.fetch_nmbs_emails", return_value=raw_emails),
-            patch("main.save_screenshot", return_value=Path("/fake/screenshot.png")),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
             patch("builtins.input", return_value="j"),
         ):
             import main
@@ -331,3 +809,298 @@ class TestResetState:
 
         # State mag NIET verwijderd zijn na een mislukte Excel-operatie
         assert mock_config.STATE_FILE.exists()
+
+    def test_reset_abort_keeps_only_remaining_tickets(self, mock_config, capsys):
+        """Tickets die al uit Excel verwijderd zijn, verdwijnen ook uit de state en de totalen."""
+        from state import load_state, save_state, mark_processed, month_aggregates
+        import main
+
+        state = load_state(mock_config.STATE_FILE)
+        for order, serial in (("TST1", 46028), ("TST2", 46029)):
+            mark_processed(order, state, metadata={
+                "filename": "Onkosten_Januari_2026.xlsx",
+                "travel_date_serial": serial,
+                "description": "Trein X - Y heen",
+                "price": 14.0,
+                "direction": "heen",
+            })
+        save_state(state, mock_config.STATE_FILE)
+
+        with (
+            patch("main.config", mock_config),
+            patch("builtins.input", return_value="j"),
+            patch(
+                "main.remove_ticket_from_excel",
+                side_effect=[True, OSError("bestand vergrendeld")],
+            ),
+        ):
+            main.reset_state()
+
+        state = load_state(mock_config.STATE_FILE)
+        assert state["processed"] == ["TST2"]
+        assert month_aggregates(state)["2026-01"]["count"] == 1
+
+    def test_summary_without_opening_excel(self, mock_config, capsys):
+        """--summary toont de maandtotalen uit de state, ook als het Excel-bestand weg is."""
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+            excel_path_for_date(mock_config.EXCEL_DIR, date(2026, 2, 1)).unlink()
+            capsys.readouterr()
+            main.show_summary()
+
+        out = capsys.readouterr().out
+        februari = next(line for line in out.splitlines() if "Februari 2026" in line)
+        assert "28.00" in februari and "13/02/2026" in februari
+
+    def test_verify_repair_reoffers_ticket_without_row(self, mock_config, capsys):
+        """--verify --repair haalt een ticket waarvan de rij met de hand gewist is uit de state."""
+        from excel_updater import remove_ticket_from_excel
+        from state import get_metadata, is_processed, load_state
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+            meta = get_metadata("UPL1IGGK", load_state(mock_config.STATE_FILE))
+            remove_ticket_from_excel(
+                mock_config.EXCEL_DIR / meta["filename"], meta["travel_date_serial"], meta["description"]
+            )
+            assert main.verify_state() is False
+            assert is_processed("UPL1IGGK", load_state(mock_config.STATE_FILE))
+            main.verify_state(repair=True)
+
+        assert not is_processed("UPL1IGGK", load_state(mock_config.STATE_FILE))
+        assert "opnieuw aan" in capsys.readouterr().out
+
+    def test_verify_repair_updates_dashboard(self, mock_config, capsys):
+        """Na --verify --repair volgen de dashboardtotalen de state."""
+        from dashboard import dashboard_dir
+        from excel_updater import remove_ticket_from_excel
+        from state import get_metadata, load_state
+
+        mock_config.REPORTS_DIR = mock_config.STATE_FILE.parent / "reports"
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+            patch("webbrowser.open"),
+        ):
+            import main
+            main.main()
+            index = dashboard_dir(mock_config.REPORTS_DIR) / "index.html"
+            assert "Februari 2026" in index.read_text(encoding="utf-8")
+            meta = get_metadata("UPL1IGGK", load_state(mock_config.STATE_FILE))
+            remove_ticket_from_excel(
+                mock_config.EXCEL_DIR / meta["filename"], meta["travel_date_serial"], meta["description"]
+            )
+            main.verify_state(repair=True)
+
+        assert "Februari 2026" not in index.read_text(encoding="utf-8")
+        assert "Dashboard bijgewerkt" in capsys.readouterr().out
+
+    def test_metadata_points_to_cached_email(self, mock_config):
+        """De metadata bewaart de digest van de e-mail, zodat --pdf ze terugvindt."""
+        from screenshot_gen import html_digest
+        from state import get_metadata, load_state
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+        ):
+            import main
+            main.main()
+
+        meta = get_metadata("UPL1IGGK", load_state(mock_config.STATE_FILE))
+        assert meta["html_sha256"] == html_digest(SAMPLE_HTML_ROUND_TRIP)
+
+    def test_pdf_reports_result(self, mock_config, capsys):
+        """--pdf meldt toegevoegde en ontbrekende tickets."""
+        from pdf_bundle import BundleResult
+        import main
+
+        result = BundleResult(
+            mock_config.SCREENSHOTS_DIR / "Februari 2026" / "Tickets_Februari_2026.pdf",
+            added=["A", "B"],
+            total=2,
+            failed={"OUD": "e-mail niet bewaard"},
+        )
+        with (
+            patch("main.config", mock_config),
+            patch("main.build_month_pdf", return_value=result) as build,
+        ):
+            main.make_month_pdf(2, 2026)
+
+        build.assert_called_once()
+        out = capsys.readouterr().out
+        assert "2 ticket(s) toegevoegd" in out
+        assert "OUD" in out
+        assert "Tickets_Februari_2026.pdf" in out
+
+
+class TestProfile:
+    def test_startup_does_not_load_gmail_or_openpyxl(self):
+        """--review en co. starten zonder de zware bibliotheken; die laden pas bij gebruik."""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        heavy = ("gmail_client", "googleapiclient", "openpyxl", "bs4")
+        result = subprocess.run(
+            [sys.executable, "-c", f"import sys, main; print([m for m in {heavy!r} if m in sys.modules])"],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_run_profiled_prints_table(self, capsys):
+        import main
+        import profiling
+
+        def run():
+            with profiling.stage("gmail.list"):
+                pass
+
+        main.run_profiled(run)
+        out = capsys.readouterr().out
+        assert "Profiel" in out
+        assert "gmail.list" in out
+        assert not profiling.is_enabled()
+
+    def test_run_profiled_writes_json_trace(self, tmp_path):
+        import json
+        import main
+        import profiling
+
+        def run():
+            with profiling.stage("excel.save"):
+                pass
+
+        main.run_profiled(run, tmp_path / "trace.json")
+        data = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+        assert data["traceEvents"][0]["name"] == "excel.save"
+
+    def test_run_profiled_writes_cprofile(self, tmp_path):
+        import pstats
+        import main
+
+        main.run_profiled(lambda: sum(range(10)), tmp_path / "run.prof")
+        assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+    def test_pipeline_stages_are_measured(self, mock_config):
+        import main
+        import profiling
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+            patch("webbrowser.open"),
+        ):
+            main.run_profiled(main.main)
+
+        # De tabel is afgedrukt; de metingen blijven beschikbaar tot de volgende enable()
+        stats = profiling.snapshot()
+        for name in ("parse.html", "kalender", "excel.load", "excel.save", "state.save", "invoer"):
+            assert stats[name].calls >= 1, name
+        assert stats["parse.html"].bytes == len(SAMPLE_HTML_ROUND_TRIP)
+
+
+class TestProfiles:
+    def test_each_profile_gets_its_own_mailbox_state_and_excel(self, mock_config, tmp_path):
+        import openpyxl
+        import main
+        from profiles import select_profiles
+        from state import load_state
+
+        mock_config.BASE_DIR = tmp_path
+        mock_config.PROFILES = {"stijn": {}, "an": {"EMPLOYEE_NAME": "An Peeters"}}
+        mailboxes = {
+            "stijn": _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP)),
+            "an": _make_raw_email_list(("ABC12345", SAMPLE_HTML_SINGLE_HEEN)),
+        }
+        profiles = select_profiles(mock_config)
+        for _, cfg in profiles:
+            cfg.TOKEN_PATH.parent.mkdir(parents=True)
+            cfg.TOKEN_PATH.write_text("{}", encoding="utf-8")
+
+        def fake_fetch(client_secret, token_path, api_endpoint=None):
+            return mailboxes[token_path.parent.name]
+
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", side_effect=fake_fetch) as fetch,
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+        ):
+            main.run_profiles(
+                profiles, lambda raw: main.main(batch=True, raw_emails=raw), fetch=True
+            )
+            assert main.config is mock_config
+
+        assert fetch.call_count == 2
+        stijn, an = (cfg for _, cfg in profiles)
+        assert load_state(stijn.STATE_FILE)["processed"] == ["UPL1IGGK"]
+        assert load_state(an.STATE_FILE)["processed"] == ["ABC12345"]
+        jan = excel_path_for_date(an.EXCEL_DIR, date(2026, 1, 1))
+        assert openpyxl.load_workbook(jan).active["B4"].value == "An Peeters"
+        assert not excel_path_for_date(stijn.EXCEL_DIR, date(2026, 1, 1)).exists()
+
+    def test_failed_prefetch_falls_back_to_own_fetch(self, mock_config, tmp_path, capsys):
+        import main
+        from profiles import select_profiles
+
+        mock_config.BASE_DIR = tmp_path
+        mock_config.PROFILES = {"an": {}}
+        profiles = select_profiles(mock_config)
+        profiles[0][1].TOKEN_PATH.parent.mkdir(parents=True)
+        profiles[0][1].TOKEN_PATH.write_text("{}", encoding="utf-8")
+        received = []
+
+        with patch("main.fetch_nmbs_emails", side_effect=OSError("netwerk weg")):
+            main.run_profiles(profiles, received.append, fetch=True)
+
+        assert received == [None]
+        assert "ophalen mislukt" in capsys.readouterr().out
+
+
+class TestMemprofile:
+    def test_checkpoints_at_pipeline_boundaries(self, mock_config, capsys):
+        import main
+        import memprofile
+
+        raw_emails = _make_raw_email_list(("UPL1IGGK", SAMPLE_HTML_ROUND_TRIP))
+        with (
+            patch("main.config", mock_config),
+            patch("main.fetch_nmbs_emails", return_value=raw_emails),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
+            patch("builtins.input", return_value="j"),
+            patch("webbrowser.open"),
+        ):
+            main.run_memprofiled(main.main)
+
+        labels = [p.label for p in memprofile.checkpoints()]
+        assert labels == ["start", "ophalen", "beslissingen", "excel", "screenshots", "einde"]
+        assert not memprofile.is_enabled()
+        assert "Geheugen per stap" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+"""
+Tests voor memprofile.py
+"""
+import re
+
+import pytest
+
+import memprofile
+from memprofile import checkpoint, format_memory_report, module_name
+
+
+@pytest.fixture(autouse=True)
+def tracing_off():
+    yield
+    if memprofile.is_enabled():
+        memprofile.stop()
+
+
+def test_checkpoint_without_tracing_is_noop():
+    assert not memprofile.is_enabled()
+    assert checkpoint("start") is None
+    assert memprofile.peak_bytes() == 0
+
+
+def test_checkpoint_attributes_memory_to_allocating_module():
+    memprofile.start()
+    checkpoint("start")
+    data = [bytearray(1024) for _ in range(1000)]  # ~1 MB in dit testbestand
+    point = checkpoint("na")
+
+    assert point.current >= 1000 * 1024
+    assert point.peak >= point.current
+    assert point.by_module["tests/test_memprofile.py"] >= 1000 * 1024
+    assert [p.label for p in memprofile.checkpoints()] == ["start", "na"]
+    del data
+
+
+def test_start_clears_previous_checkpoints():
+    memprofile.start()
+    checkpoint("een")
+    memprofile.start()
+    assert memprofile.checkpoints() == []
+
+
+def test_module_name(tmp_path):
+    assert module_name("/usr/lib/python3/site-packages/bs4/element.py") == "bs4"
+    assert module_name("/venv/lib/site-packages/six.py") == "six"
+    assert module_name(memprofile.__file__) == "memprofile.py"
+    assert module_name("<frozen importlib._bootstrap>") == "<frozen importlib._bootstrap>"
+
+
+def test_report_shows_delta_per_module():
+    memprofile.start()
+    checkpoint("start")
+    data = [bytearray(1024) for _ in range(2000)]
+    checkpoint("ophalen")
+    report = format_memory_report()
+    del data
+
+    assert "[start]" in report
+    assert "[ophalen]" in report
+    assert "tests/test_memprofile.py" in report
+    assert re.search(r"tests/test_memprofile\.py\s+2\.\d MB  \(\+2\.\d MB\)", report)
+
+
+def test_report_without_checkpoints():
+    memprofile.start()
+    memprofile.stop()
+    assert format_memory_report() == "Geen geheugenmetingen."
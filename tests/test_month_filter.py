@@ -2,7 +2,6 @@
 Tests voor de --month maandfilter en per-maand Excel-bestanden.
 """
 from datetime import date
-from pathlib import Path
 
 import openpyxl
 import pytest
@@ -292,6 +291,15 @@ class TestMonthFilterIntegration:
         mock.EXCEL_DIR.mkdir()
         mock.SCREENSHOTS_DIR = tmp_path / "screenshots"
         mock.SCREENSHOTS_DIR.mkdir()
+        mock.SCREENSHOT_FORMAT = "png"
+        mock.SCREENSHOT_QUALITY = 80
+        mock.SCREENSHOT_CROP = True
+        mock.EXTRA_DAYS_OFF = {}
+        mock.FORCED_WORK_DAYS = []
+        mock.WATCH_INTERVAL = 300
+        mock.GMAIL_API_ENDPOINT = None
+        mock.REPORTS_DIR = None
+        mock.EMPLOYEE_NAME = "Stijn Van der Spiegel"
         mock.CLIENT_SECRET_PATH = tmp_path / "credentials" / "client_secret.json"
         mock.TOKEN_PATH = tmp_path / "credentials" / "token.json"
         mock.STATE_FILE = tmp_path / "processed.json"
@@ -304,7 +312,11 @@ class TestMonthFilterIntegration:
     def test_month_filter_only_processes_matching(self, tmp_path):
         """With --month januari, only January tickets are processed."""
         from unittest.mock import patch
-        from tests.conftest import SAMPLE_HTML_SINGLE_HEEN, SAMPLE_HTML_ROUND_TRIP
+        from tests.conftest import (
+            SAMPLE_HTML_SINGLE_HEEN,
+            SAMPLE_HTML_ROUND_TRIP,
+            fake_save_screenshots,
+        )
 
         mock_config = self._make_mock_config(tmp_path)
 
@@ -318,7 +330,7 @@ class TestMonthFilterIntegration:
         with (
             patch("main.config", mock_config),
             patch("main.fetch_nmbs_emails", return_value=raw_emails),
-            patch("main.save_screenshot", return_value=Path("/fake/screenshot.png")),
+            patch("main.save_screenshots", side_effect=fake_save_screenshots),
             patch("builtins.input", return_value="j"),
         ):
             import main
@@ -0,0 +1,62 @@
+"""
+Tests voor outbox.py
+"""
+from datetime import date
+
+from email_parser import TicketData
+from outbox import append_to_outbox, load_outbox, outbox_file, save_outbox
+
+
+def _make_ticket(order="TST001", travel_date=date(2026, 1, 7)):
+    return TicketData(
+        order_number=order,
+        from_station="Zottegem",
+        to_station="Antwerpen-Zuid",
+        direction="heen",
+        travel_date=travel_date,
+        price=14.0,
+        email_html="<html>ticket</html>",
+    )
+
+
+def test_outbox_file_next_to_state(tmp_path):
+    assert outbox_file(tmp_path / "processed.json") == tmp_path / "outbox.jsonl"
+
+
+def test_missing_file_is_empty(tmp_path):
+    assert load_outbox(tmp_path / "outbox.jsonl") == {}
+
+
+def test_append_and_load_round_trip(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    ticket = _make_ticket()
+    append_to_outbox(ticket, path)
+    append_to_outbox(_make_ticket("TST002"), path)
+
+    outbox = load_outbox(path)
+    assert list(outbox) == ["TST001", "TST002"]
+    assert outbox["TST001"] == ticket
+
+
+def test_save_rewrites_and_removes_when_empty(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    append_to_outbox(_make_ticket("TST001"), path)
+    append_to_outbox(_make_ticket("TST002"), path)
+
+    outbox = load_outbox(path)
+    del outbox["TST001"]
+    save_outbox(outbox, path)
+    assert list(load_outbox(path)) == ["TST002"]
+
+    save_outbox({}, path)
+    assert not path.exists()
+
+
+def test_truncated_line_is_skipped(tmp_path, capsys):
+    path = tmp_path / "outbox.jsonl"
+    append_to_outbox(_make_ticket("TST001"), path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"order_number": "TST0')
+
+    assert list(load_outbox(path)) == ["TST001"]
+    assert "onleesbare regel" in capsys.readouterr().out
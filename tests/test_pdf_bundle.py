@@ -0,0 +1,157 @@
+"""
+Tests voor pdf_bundle.py — Chrome wordt vervangen door een nep-printer.
+"""
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+pypdf = pytest.importorskip("pypdf")
+
+import pdf_bundle
+from excel_updater import date_to_excel_serial
+from pdf_bundle import build_month_pdf, bundle_path, month_entries
+
+
+def _state(*tickets):
+    """tickets: (bestelnummer, reisdatum, html_sha256 of None)"""
+    metadata = {}
+    for order, travel_date, digest in tickets:
+        meta = {
+            "filename": "Onkosten_Februari_2026.xlsx",
+            "travel_date_serial": date_to_excel_serial(travel_date),
+            "description": "Trein Zottegem - Antwerpen-Zuid heen",
+        }
+        if digest:
+            meta["html_sha256"] = digest
+        metadata[order] = meta
+    return {"processed": list(metadata), "skipped_weekend": [], "metadata": metadata}
+
+
+@pytest.fixture
+def printer(tmp_path, monkeypatch):
+    """Vervangt save_pdf_pages: één pagina per digest, breedte = volgnummer van de digest."""
+    printed = []
+
+    def fake_save_pdf_pages(digests, screenshots_dir):
+        results = {}
+        for digest in digests:
+            if digest.startswith("bad"):
+                results[digest] = RuntimeError("Chrome weg")
+                continue
+            path = tmp_path / "pages" / f"{digest}.pdf"
+            if not path.exists():
+                printed.append(digest)
+                path.parent.mkdir(exist_ok=True)
+                writer = pypdf.PdfWriter()
+                writer.add_blank_page(width=100 + int(digest[1:]), height=100)
+                writer.write(path)
+            results[digest] = path
+        return results
+
+    monkeypatch.setattr(pdf_bundle, "save_pdf_pages", fake_save_pdf_pages)
+    return printed
+
+
+def _page_widths(path: Path) -> list[int]:
+    return [int(page.mediabox.width) - 100 for page in pypdf.PdfReader(path).pages]
+
+
+def test_month_entries_filters_and_sorts():
+    state = _state(
+        ("B", date(2026, 2, 10), "d2"),
+        ("A", date(2026, 2, 3), "d1"),
+        ("M", date(2026, 3, 3), "d3"),
+        ("OUD", date(2026, 2, 5), None),
+    )
+    entries, without_html = month_entries(state, 2, 2026)
+    assert [e[0] for e in entries] == ["A", "B"]
+    assert without_html == ["OUD"]
+
+
+def test_builds_bundle_in_date_order(tmp_path, printer):
+    state = _state(("B", date(2026, 2, 10), "d2"), ("A", date(2026, 2, 3), "d1"))
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert result.path == bundle_path(tmp_path, 2, 2026)
+    assert result.path == tmp_path / "Februari 2026" / "Tickets_Februari_2026.pdf"
+    assert result.added == ["A", "B"]
+    assert _page_widths(result.path) == [1, 2]
+
+
+def test_second_run_only_adds_new_tickets(tmp_path, printer):
+    state = _state(("A", date(2026, 2, 3), "d1"))
+    build_month_pdf(state, 2, 2026, tmp_path)
+    state["metadata"].update(_state(("B", date(2026, 2, 10), "d2"))["metadata"])
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert result.added == ["B"]
+    assert result.total == 2
+    assert printer == ["d1", "d2"]
+    assert _page_widths(result.path) == [1, 2]
+
+
+def test_nothing_new_leaves_bundle_alone(tmp_path, printer):
+    state = _state(("A", date(2026, 2, 3), "d1"))
+    first = build_month_pdf(state, 2, 2026, tmp_path)
+    mtime = first.path.stat().st_mtime_ns
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert result.added == []
+    assert result.total == 1
+    assert first.path.stat().st_mtime_ns == mtime
+
+
+def test_earlier_ticket_rebuilds_from_cached_pages(tmp_path, printer):
+    state = _state(("B", date(2026, 2, 10), "d2"))
+    build_month_pdf(state, 2, 2026, tmp_path)
+    state["metadata"].update(_state(("A", date(2026, 2, 3), "d1"))["metadata"])
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert _page_widths(result.path) == [1, 2]
+    assert printer == ["d2", "d1"]  # d2 niet opnieuw afgedrukt
+
+
+def test_failed_and_unknown_tickets_reported(tmp_path, printer):
+    state = _state(
+        ("A", date(2026, 2, 3), "d1"),
+        ("KAPOT", date(2026, 2, 4), "bad1"),
+        ("OUD", date(2026, 2, 5), None),
+    )
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert result.added == ["A"]
+    assert set(result.failed) == {"KAPOT", "OUD"}
+    assert "Chrome weg" in result.failed["KAPOT"]
+
+
+def test_empty_month_makes_no_file(tmp_path, printer):
+    result = build_month_pdf(_state(), 2, 2026, tmp_path)
+    assert result.path is None
+    assert not bundle_path(tmp_path, 2, 2026).exists()
+
+
+def test_failed_page_kept_in_manifest_and_retried(tmp_path, printer):
+    state = _state(("A", date(2026, 2, 3), "d1"), ("B", date(2026, 2, 10), "d2"))
+    build_month_pdf(state, 2, 2026, tmp_path)
+    # Rebuild (B verdwijnt uit de state, C is nieuw) terwijl A niet afgedrukt kan worden
+    state = _state(("A", date(2026, 2, 3), "bad1"), ("C", date(2026, 2, 12), "d3"))
+
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+
+    assert result.added == ["C"]
+    assert set(result.failed) == {"A"}
+    manifest = pdf_bundle._load_manifest(pdf_bundle._manifest_path(tmp_path, 2, 2026))
+    assert manifest == (["C"], {"A": "Chrome weg"})
+
+    # Volgende run: A lukt weer en komt op zijn plaats terug
+    state["metadata"]["A"]["html_sha256"] = "d1"
+    result = build_month_pdf(state, 2, 2026, tmp_path)
+    assert result.failed == {}
+    assert _page_widths(result.path) == [1, 3]
+    assert pdf_bundle._load_manifest(pdf_bundle._manifest_path(tmp_path, 2, 2026))[1] == {}
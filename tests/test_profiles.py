@@ -0,0 +1,78 @@
+"""
+Tests voor profiles.py — instellingen per profiel.
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from profiles import profile_config, profile_names, select_profiles
+
+
+def _config(tmp_path, **extra):
+    return SimpleNamespace(
+        BASE_DIR=tmp_path,
+        EXCEL_DIR=tmp_path / "data",
+        SCREENSHOTS_DIR=tmp_path / "screenshots",
+        REPORTS_DIR=tmp_path / "reports",
+        STATE_FILE=tmp_path / "processed.json",
+        TOKEN_PATH=tmp_path / "credentials" / "token.json",
+        CLIENT_SECRET_PATH=tmp_path / "credentials" / "client_secret.json",
+        EMPLOYEE_NAME="Stijn Van der Spiegel",
+        HOME_STATION="Zottegem",
+        OFFICE_STATION="Antwerpen-Zuid",
+        PROFILES={
+            "stijn": {},
+            "an": {"EMPLOYEE_NAME": "An Peeters", "HOME_STATION": "Gent-Sint-Pieters"},
+        },
+        **extra,
+    )
+
+
+def test_own_files_per_profile(tmp_path):
+    cfg = profile_config(_config(tmp_path), "an")
+    base = tmp_path / "profiles" / "an"
+    assert cfg.TOKEN_PATH == base / "token.json"
+    assert cfg.STATE_FILE == base / "processed.json"
+    assert (cfg.EXCEL_DIR, cfg.SCREENSHOTS_DIR, cfg.REPORTS_DIR) == (
+        base / "data", base / "screenshots", base / "reports"
+    )
+    assert cfg.PROFILE_NAME == "an"
+    assert not hasattr(cfg, "PROFILES")
+
+
+def test_overrides_and_shared_settings(tmp_path):
+    cfg = profile_config(_config(tmp_path), "an")
+    assert (cfg.EMPLOYEE_NAME, cfg.HOME_STATION) == ("An Peeters", "Gent-Sint-Pieters")
+    assert cfg.OFFICE_STATION == "Antwerpen-Zuid"
+    assert cfg.CLIENT_SECRET_PATH == tmp_path / "credentials" / "client_secret.json"
+
+
+def test_explicit_path_in_profile_wins(tmp_path):
+    base = _config(tmp_path)
+    base.PROFILES["an"]["EXCEL_DIR"] = Path("S:/Onkosten/An")
+    assert profile_config(base, "an").EXCEL_DIR == Path("S:/Onkosten/An")
+
+
+def test_reports_stay_off(tmp_path):
+    assert profile_config(_config(tmp_path), "stijn").REPORTS_DIR is not None
+    base = _config(tmp_path)
+    base.REPORTS_DIR = None
+    assert profile_config(base, "stijn").REPORTS_DIR is None
+
+
+def test_select_profiles(tmp_path):
+    base = _config(tmp_path)
+    assert profile_names(base) == ["stijn", "an"]
+    assert [name for name, _ in select_profiles(base)] == ["stijn", "an"]
+    assert [name for name, _ in select_profiles(base, ["an"])] == ["an"]
+    with pytest.raises(ValueError, match="Onbekend profiel 'piet'"):
+        select_profiles(base, ["piet"])
+
+
+def test_without_profiles(tmp_path):
+    base = _config(tmp_path)
+    base.PROFILES = {}
+    assert select_profiles(base) == []
+    del base.PROFILES
+    assert select_profiles(base) == []
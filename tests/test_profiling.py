@@ -0,0 +1,97 @@
+"""
+Tests voor profiling.py
+"""
+import json
+import threading
+
+import pytest
+
+import profiling
+from profiling import format_profile_table, snapshot, stage, timed
+
+
+@pytest.fixture(autouse=True)
+def profiler_off():
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled_records_nothing():
+    with stage("gmail.get") as span:
+        span.bytes = 10
+    assert snapshot() == {}
+
+
+def test_stage_counts_time_and_bytes():
+    profiling.enable()
+    for n in (100, 50):
+        with stage("gmail.get") as span:
+            span.bytes = n
+    with stage("parse.html", 7):
+        pass
+
+    stats = snapshot()
+    assert stats["gmail.get"].calls == 2
+    assert stats["gmail.get"].bytes == 150
+    assert stats["gmail.get"].seconds >= 0
+    assert stats["parse.html"].bytes == 7
+
+
+def test_stage_recorded_when_block_raises():
+    profiling.enable()
+    with pytest.raises(ValueError):
+        with stage("excel.save"):
+            raise ValueError("vergrendeld")
+    assert snapshot()["excel.save"].calls == 1
+
+
+def test_timed_decorator():
+    @timed("kalender")
+    def lookup(x):
+        return x * 2
+
+    assert lookup(2) == 4
+    profiling.enable()
+    assert lookup(3) == 6
+    assert snapshot()["kalender"].calls == 1
+
+
+def test_threads_add_up():
+    profiling.enable()
+
+    def work():
+        for _ in range(100):
+            with stage("screenshot.render"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert snapshot()["screenshot.render"].calls == 400
+
+
+def test_table_lists_stages():
+    assert format_profile_table() == "Geen metingen."
+    profiling.enable()
+    with stage("state.load", 2048):
+        pass
+    table = format_profile_table()
+    assert "state.load" in table
+    assert "2.0 KB" in table
+
+
+def test_json_dump_with_trace_events(tmp_path):
+    profiling.enable(trace=True)
+    with stage("gmail.list"):
+        pass
+    path = tmp_path / "trace.json"
+    profiling.dump_json(path)
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["stages"]["gmail.list"]["calls"] == 1
+    assert data["traceEvents"][0]["name"] == "gmail.list"
+    assert data["traceEvents"][0]["ph"] == "X"
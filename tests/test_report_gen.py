@@ -7,7 +7,14 @@ from pathlib import Path
 import pytest
 
 from email_parser import TicketData
-from report_gen import format_summary_table, generate_html_report
+from excel_updater import add_tickets_by_month, date_to_excel_serial, excel_path_for_date
+from report_gen import (
+    ReportWriter,
+    format_month_totals,
+    format_summary_table,
+    generate_history_report,
+    generate_html_report,
+)
 
 
 def _make_ticket(
@@ -99,6 +106,35 @@ class TestFormatSummaryTable:
             assert len(line) <= 90
 
 
+class TestFormatMonthTotals:
+    AGGREGATES = {
+        "2025-12": {"count": 2, "vervoer": 28.0, "first": "2025-12-01", "last": "2025-12-02",
+                    "days": {}, "directions": {"heen": 1, "terug": 1}, "unknown_price": 0},
+        "2026-01": {"count": 3, "vervoer": 56.0, "first": "2026-01-05", "last": "2026-01-20",
+                    "days": {}, "directions": {"heen/terug": 2, "heen": 1}, "unknown_price": 0},
+        "2026-02": {"count": 1, "vervoer": 14.5, "first": "2026-02-03", "last": "2026-02-03",
+                    "days": {}, "directions": {"terug": 1}, "unknown_price": 0},
+    }
+
+    def test_months_and_year_totals(self):
+        result = format_month_totals(self.AGGREGATES)
+        lines = result.splitlines()
+        assert any("December 2025" in l and "28.00" in l for l in lines)
+        total_2026 = next(l for l in lines if "Totaal 2026" in l)
+        assert "70.50" in total_2026 and "05/01/2026" in total_2026 and "03/02/2026" in total_2026
+        assert "Alle jaren: 6 ticket(s), EUR 98.50" in result
+        result.encode("ascii")
+
+    def test_unknown_prices_are_marked(self):
+        aggregates = {"2026-01": dict(self.AGGREGATES["2026-01"], unknown_price=1)}
+        result = format_month_totals(aggregates)
+        assert "Januari 2026*" in result
+        assert "1 ticket(s) zonder bedrag" in result
+
+    def test_empty(self):
+        assert "Nog geen" in format_month_totals({})
+
+
 class TestGenerateHtmlReport:
     def test_creates_file(self, tmp_path):
         tickets = [_make_ticket()]
@@ -150,3 +186,129 @@ class TestGenerateHtmlReport:
         assert "<html" in html
         assert "</html>" in html
         assert "<table" in html
+
+
+class TestStatusColumn:
+    def test_status_column_added(self):
+        tickets = [_make_ticket(order="T1"), _make_ticket(order="T2")]
+        result = format_summary_table(tickets, status=["aanvaard", "(!!) zaterdag"])
+        lines = result.split("\n")
+        assert "Status" in lines[1]
+        assert lines[3].rstrip().endswith("aanvaard      |")
+        assert "(!!) zaterdag" in lines[4]
+        assert len({len(line) for line in lines[:6]}) == 1
+
+    def test_without_status_unchanged(self):
+        tickets = [_make_ticket()]
+        assert "Status" not in format_summary_table(tickets)
+
+
+class TestReportWriter:
+    def test_values_are_escaped(self, tmp_path):
+        ticket = _make_ticket(from_s="<script>alert(1)</script>", to_s="A & B")
+        html = generate_html_report([ticket], tmp_path).read_text(encoding="utf-8")
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+        assert "A &amp; B" in html
+
+    def test_screenshot_link_is_relative_to_report(self, tmp_path):
+        shot = tmp_path / "screenshots" / "Januari 2026" / "trein_070126_heen_TST001.png"
+        report = generate_html_report([_make_ticket()], tmp_path / "reports", [shot])
+        html = report.read_text(encoding="utf-8")
+        assert 'href="../screenshots/Januari%202026/trein_070126_heen_TST001.png"' in html
+
+    def test_ticket_count_above_table(self, tmp_path):
+        report = generate_html_report([_make_ticket(), _make_ticket()], tmp_path)
+        html = report.read_text(encoding="utf-8")
+        assert html.index("<p>Aantal tickets: 2</p>") < html.index("<table>")
+
+    def test_failed_write_leaves_no_file(self, tmp_path):
+        path = tmp_path / "rapport.html"
+        with pytest.raises(RuntimeError):
+            with ReportWriter(path, "Test") as report:
+                report.add_ticket(_make_ticket())
+                raise RuntimeError("onderbroken")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_unknown_price_not_in_total(self, tmp_path):
+        path = tmp_path / "rapport.html"
+        with ReportWriter(path, "Test") as report:
+            report.add(date(2026, 1, 7), "Trein X - Y heen", 14.0)
+            report.add(date(2026, 1, 8), "Trein X - Y heen", None)
+        assert (report.count, report.total) == (2, 14.0)
+        assert "Totaal: EUR 14.00" in path.read_text(encoding="utf-8")
+
+
+class TestHistoryReport:
+    def _processed(self, tickets, excel_dir):
+        add_tickets_by_month(tickets, excel_dir)
+        return {
+            "processed": [t.order_number for t in tickets],
+            "skipped_weekend": [],
+            "metadata": {
+                t.order_number: {
+                    "filename": excel_path_for_date(excel_dir, t.travel_date).name,
+                    "travel_date_serial": date_to_excel_serial(t.travel_date),
+                    "description": f"Trein {t.from_station} - {t.to_station} {t.direction}",
+                }
+                for t in tickets
+            },
+        }
+
+    def test_all_months_with_subtotals_in_order(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        tickets = [
+            _make_ticket(order="FEB1", travel_date=date(2026, 2, 3), price=14.0),
+            _make_ticket(order="JAN1", travel_date=date(2026, 1, 7), price=14.0),
+            _make_ticket(order="JAN2", direction="terug", from_s="Antwerpen-Zuid",
+                         to_s="Zottegem", travel_date=date(2026, 1, 7), price=15.5),
+        ]
+        state = self._processed(tickets, excel_dir)
+        shot = tmp_path / "screenshots" / "Februari 2026" / "trein_030226_heen_FEB1.png"
+        shot.parent.mkdir(parents=True)
+        shot.write_bytes(b"png")
+
+        report = generate_history_report(state, excel_dir, tmp_path / "screenshots", tmp_path / "reports")
+        html = report.read_text(encoding="utf-8")
+
+        assert report.name.startswith("history_")
+        assert html.index("Januari 2026 (2 tickets)") < html.index("Februari 2026 (1 tickets)")
+        assert "29.50" in html
+        assert "Totaal: EUR 43.50" in html
+        assert "trein_030226_heen_FEB1.png" in html
+
+    def test_row_missing_from_excel_has_no_amount(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        state = self._processed([_make_ticket(order="JAN1")], excel_dir)
+        state["metadata"]["GONE"] = dict(state["metadata"]["JAN1"], description="Trein weg heen")
+
+        html = generate_history_report(
+            state, excel_dir, tmp_path / "screenshots", tmp_path / "reports"
+        ).read_text(encoding="utf-8")
+        assert "<td style='text-align:right'>-</td>" in html
+        assert "Totaal: EUR 14.00" in html
+
+    def test_corrupt_month_file_renders_without_amounts(self, tmp_path):
+        excel_dir = tmp_path / "data"
+        tickets = [
+            _make_ticket(order="JAN1", travel_date=date(2026, 1, 7), price=14.0),
+            _make_ticket(order="FEB1", travel_date=date(2026, 2, 3), price=15.5),
+        ]
+        state = self._processed(tickets, excel_dir)
+        jan = excel_path_for_date(excel_dir, date(2026, 1, 1))
+        jan.write_bytes(b"half gesynchroniseerd, geen zip")
+        unreadable = {}
+
+        html = generate_history_report(
+            state, excel_dir, tmp_path / "screenshots", tmp_path / "reports", unreadable
+        ).read_text(encoding="utf-8")
+        assert list(unreadable) == [jan.name]
+        assert "<td style='text-align:right'>-</td>" in html
+        assert "Totaal: EUR 15.50" in html
+
+    def test_empty_state(self, tmp_path):
+        state = {"processed": [], "metadata": {}}
+        html = generate_history_report(
+            state, tmp_path, tmp_path, tmp_path / "reports"
+        ).read_text(encoding="utf-8")
+        assert "Nog geen verwerkte tickets." in html
@@ -0,0 +1,47 @@
+"""
+Tests voor review_queue.py
+"""
+from datetime import date
+
+from email_parser import TicketData
+from review_queue import enqueue_for_review, load_review_queue, review_file, save_review_queue
+
+
+def _make_ticket(order="TST001"):
+    return TicketData(
+        order_number=order,
+        from_station="Zottegem",
+        to_station="Antwerpen-Zuid",
+        direction="heen",
+        travel_date=date(2026, 2, 4),
+        price=14.0,
+        email_html="<html>ticket</html>",
+    )
+
+
+def test_review_file_next_to_state(tmp_path):
+    assert review_file(tmp_path / "processed.json") == tmp_path / "review.jsonl"
+
+
+def test_enqueue_skips_known_tickets(tmp_path):
+    path = tmp_path / "review.jsonl"
+    queue = load_review_queue(path)
+
+    assert enqueue_for_review([_make_ticket("A"), _make_ticket("B")], queue, path) == 2
+    assert enqueue_for_review([_make_ticket("B"), _make_ticket("C")], queue, path) == 1
+
+    assert list(load_review_queue(path)) == ["A", "B", "C"]
+    assert load_review_queue(path)["A"] == _make_ticket("A")
+
+
+def test_save_keeps_only_remaining(tmp_path):
+    path = tmp_path / "review.jsonl"
+    queue = {}
+    enqueue_for_review([_make_ticket("A"), _make_ticket("B")], queue, path)
+
+    del queue["A"]
+    save_review_queue(queue, path)
+    assert list(load_review_queue(path)) == ["B"]
+
+    save_review_queue({}, path)
+    assert not path.exists()
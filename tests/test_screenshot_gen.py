@@ -1,10 +1,32 @@
 """
-Tests voor screenshot_gen.py — bestandsnaamgeneratie.
+Tests voor screenshot_gen.py — bestandsnaamgeneratie en renderer (gestubd).
 """
+import base64
+import json
+import time
 from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock
 
+import pytest
+
+import screenshot_gen
 from email_parser import TicketData
-from screenshot_gen import _screenshot_filename
+from screenshot_gen import (
+    ChromeSession,
+    ScreenshotQueue,
+    RenderSettings,
+    _postprocess_image,
+    _screenshot_filename,
+    cached_html_path,
+    cached_pdf_path,
+    html_digest,
+    render_key,
+    render_settings_from_config,
+    save_pdf_pages,
+    save_screenshot,
+    save_screenshots,
+)
 
 
 def _make_ticket(order_number: str, direction: str = "heen") -> TicketData:
@@ -15,7 +37,7 @@ def _make_ticket(order_number: str, direction: str = "heen") -> TicketData:
         direction=direction,
         travel_date=date(2026, 2, 4),
         price=14.0,
-        email_html="",
+        email_html=f"<html>{order_number}</html>",
     )
 
 
@@ -40,3 +62,568 @@ class TestScreenshotFilename:
     def test_terug_direction(self):
         ticket = _make_ticket("ZZZ99999", direction="terug")
         assert _screenshot_filename(ticket) == "trein_040226_terug_ZZZ99999.png"
+
+
+class FakeSession:
+    """Vervangt de Chrome-sessie: schrijft een dummy-PNG."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+        self.closed = False
+
+    def screenshot(self, html, output_path, settings=None):
+        self.calls.append(output_path)
+        if self.fail:
+            raise RuntimeError("websocket verbroken")
+        output_path.write_bytes(b"PNG")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def isolated_session(monkeypatch):
+    """Herstel de module-globale sessiestatus na elke test."""
+    monkeypatch.setattr(screenshot_gen, "_session", None)
+    monkeypatch.setattr(screenshot_gen, "_session_unavailable", False)
+
+
+class TestSaveScreenshot:
+    def test_uses_persistent_session(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        per_call = MagicMock()
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+
+        ticket = _make_ticket("ABC12345")
+        path = save_screenshot(ticket, tmp_path)
+
+        assert path == tmp_path / "Februari 2026" / "trein_040226_heen_ABC12345.png"
+        assert path.read_bytes() == b"PNG"
+        assert len(session.calls) == 1
+        per_call.assert_not_called()
+
+    def test_session_reused_for_all_tickets(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+
+        for order in ("ORDER111", "ORDER222", "ORDER333"):
+            save_screenshot(_make_ticket(order), tmp_path)
+
+        assert len(session.calls) == 3
+
+    def test_falls_back_when_session_breaks(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession(fail=True)
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+
+        def per_call(htmls, output_dir, filenames, settings=None):
+            for filename in filenames:
+                (output_dir / filename).write_bytes(b"FALLBACK")
+
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+
+        path = save_screenshot(_make_ticket("ABC12345"), tmp_path)
+
+        assert path.read_bytes() == b"FALLBACK"
+        assert session.closed
+        assert screenshot_gen._session_unavailable is True
+
+    def test_falls_back_without_session(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: None)
+        calls = []
+
+        def per_call(htmls, output_dir, filenames, settings=None):
+            calls.append(filenames)
+            (output_dir / filenames[0]).write_bytes(b"FALLBACK")
+
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+
+        assert save_screenshot(_make_ticket("ABC12345"), tmp_path).read_bytes() == b"FALLBACK"
+        assert len(calls) == 1
+
+    def test_existing_file_not_rendered_again(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        ticket = _make_ticket("ABC12345")
+        save_screenshot(ticket, tmp_path)
+        save_screenshot(ticket, tmp_path)
+        assert len(session.calls) == 1
+
+    def test_per_call_error_becomes_runtime_error(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: None)
+        monkeypatch.setattr(
+            screenshot_gen, "_screenshot_per_call", MagicMock(side_effect=OSError("boem"))
+        )
+        with pytest.raises(RuntimeError, match="ABC12345"):
+            save_screenshot(_make_ticket("ABC12345"), tmp_path)
+
+
+class FakeWebSocket:
+    """Minimale DevTools-tegenpartij: antwoordt op commando's, stuurt events mee."""
+
+    def __init__(self, content_height=612.4):
+        self.sent = []
+        self._inbox = []
+        self.content_height = content_height
+        self.viewport_height = None
+
+    def send(self, raw):
+        message = json.loads(raw)
+        self.sent.append(message)
+        result = {}
+        if message["method"] == "Page.navigate":
+            # Event komt voor het antwoord binnen
+            self._inbox.append({"method": "Page.frameStartedLoading", "params": {}})
+            self._inbox.append({"method": "Page.loadEventFired", "params": {}})
+        elif message["method"] == "Page.getLayoutMetrics":
+            # Zoals Chrome: de inhoud is nooit lager dan de viewport
+            height = max(self.content_height, self.viewport_height)
+            result = {"cssContentSize": {"width": 800, "height": height}}
+        elif message["method"] == "Page.captureScreenshot":
+            result = {"data": base64.b64encode(b"PNGDATA").decode()}
+        elif message["method"] == "Page.printToPDF":
+            result = {"data": base64.b64encode(b"%PDF-fake").decode()}
+        elif message["method"] == "Emulation.setDeviceMetricsOverride":
+            if message["params"]["width"] <= 0:
+                self._inbox.append({"id": message["id"], "error": {"message": "bad width"}})
+                return
+            self.viewport_height = message["params"]["height"]
+        self._inbox.append({"id": message["id"], "result": result})
+
+    def recv(self):
+        return json.dumps(self._inbox.pop(0))
+
+    def close(self):
+        pass
+
+
+class TestChromeSession:
+    def _session(self, tmp_path):
+        session = ChromeSession()
+        session._ws = FakeWebSocket()
+        session._profile_dir = tmp_path
+        session._session_id = "PAGE"
+        return session
+
+    def test_screenshot_over_devtools(self, tmp_path):
+        session = self._session(tmp_path)
+        out = tmp_path / "out.png"
+
+        session.screenshot("<html>ticket</html>", out)
+
+        assert out.read_bytes() == b"PNGDATA"
+        methods = [m["method"] for m in session._ws.sent]
+        assert methods == [
+            "Emulation.setDeviceMetricsOverride",
+            "Page.navigate",
+            "Page.getLayoutMetrics",
+            "Emulation.setDeviceMetricsOverride",
+            "Page.captureScreenshot",
+        ]
+        assert all(m["sessionId"] == "PAGE" for m in session._ws.sent)
+        assert (tmp_path / "ticket.html").read_text(encoding="utf-8") == "<html>ticket</html>"
+
+    def test_clip_follows_content_height(self, tmp_path):
+        session = self._session(tmp_path)
+        session.screenshot("<html></html>", tmp_path / "out.png")
+
+        capture = session._ws.sent[-1]["params"]
+        assert capture["format"] == "png"
+        assert "quality" not in capture
+        assert capture["clip"] == {"x": 0, "y": 0, "width": 800, "height": 613, "scale": 1}
+        # Gemeten met een minimale viewport, vastgelegd met de bijgesneden hoogte
+        viewports = [
+            m["params"]["height"] for m in session._ws.sent
+            if m["method"] == "Emulation.setDeviceMetricsOverride"
+        ]
+        assert viewports == [1, 613]
+
+    def test_clip_never_exceeds_max_height(self, tmp_path):
+        session = self._session(tmp_path)
+        session._ws.content_height = 2400
+        session.screenshot("<html></html>", tmp_path / "out.png", RenderSettings(height=500))
+        assert session._ws.sent[-1]["params"]["clip"]["height"] == 500
+
+    def test_no_crop_keeps_full_viewport(self, tmp_path):
+        session = self._session(tmp_path)
+        session.screenshot("<html></html>", tmp_path / "out.png", RenderSettings(crop=False))
+
+        methods = [m["method"] for m in session._ws.sent]
+        assert "Page.getLayoutMetrics" not in methods
+        assert session._ws.sent[-1]["params"]["clip"]["height"] == 1400
+
+    def test_jpeg_passes_quality(self, tmp_path):
+        session = self._session(tmp_path)
+        session.screenshot(
+            "<html></html>", tmp_path / "out.jpg", RenderSettings(fmt="jpeg", quality=65)
+        )
+        capture = session._ws.sent[-1]["params"]
+        assert capture["format"] == "jpeg"
+        assert capture["quality"] == 65
+
+    def test_print_pdf_over_devtools(self, tmp_path):
+        session = self._session(tmp_path)
+        session.print_pdf("<html>ticket</html>", tmp_path / "out.pdf")
+
+        assert (tmp_path / "out.pdf").read_bytes() == b"%PDF-fake"
+        params = session._ws.sent[-1]["params"]
+        assert session._ws.sent[-1]["method"] == "Page.printToPDF"
+        assert params["printBackground"] is True
+
+    def test_protocol_error_raises(self, tmp_path):
+        session = self._session(tmp_path)
+        with pytest.raises(RuntimeError, match="bad width"):
+            session.screenshot("<html></html>", tmp_path / "out.png", RenderSettings(width=0))
+
+    def test_close_is_idempotent(self, tmp_path):
+        session = self._session(tmp_path / "profile")
+        (tmp_path / "profile").mkdir()
+        session.close()
+        session.close()
+        assert not (tmp_path / "profile").exists()
+
+
+class TestSaveScreenshots:
+    def test_batch_uses_one_session_for_all_months(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        starts = []
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: starts.append(1) or session)
+        tickets = [_make_ticket(f"ORDER{i:03d}") for i in range(40)]
+        tickets.append(TicketData(
+            order_number="MAART001", from_station="Zottegem", to_station="Antwerpen-Zuid",
+            direction="heen/terug", travel_date=date(2026, 3, 2), price=28.0,
+            email_html="<html>maart</html>",
+        ))
+
+        results = save_screenshots(tickets, tmp_path)
+
+        assert len(starts) == 1
+        assert len(session.calls) == 41
+        assert results["ORDER000"] == tmp_path / "Februari 2026" / "trein_040226_heen_ORDER000.png"
+        assert results["MAART001"] == tmp_path / "Maart 2026" / "trein_020326_heenenterug_MAART001.png"
+
+    def test_fallback_batches_per_month_folder(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: None)
+        calls = []
+
+        def per_call(htmls, output_dir, filenames, settings=None):
+            calls.append((output_dir.name, list(filenames)))
+            for filename in filenames:
+                (output_dir / filename).write_bytes(b"PNG")
+
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+        tickets = [_make_ticket(f"ORDER{i:03d}") for i in range(5)]
+
+        results = save_screenshots(tickets, tmp_path)
+
+        assert len(calls) == 1
+        assert len(calls[0][1]) == 5
+        assert all(isinstance(p, Path) for p in results.values())
+        assert all(p.parent.name == "Februari 2026" for p in results.values())
+
+    def test_failed_fallback_batch_reports_per_ticket(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: None)
+
+        def per_call(htmls, output_dir, filenames, settings=None):
+            if len(filenames) > 1 or htmls[0] == "<html>BAD00001</html>":
+                raise OSError("Chrome crashte")
+            (output_dir / filenames[0]).write_bytes(b"PNG")
+
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+
+        results = save_screenshots([_make_ticket("GOOD0001"), _make_ticket("BAD00001")], tmp_path)
+
+        assert isinstance(results["GOOD0001"], Path)
+        assert isinstance(results["BAD00001"], RuntimeError)
+        assert "BAD00001" in str(results["BAD00001"])
+
+    def test_session_break_mid_batch_falls_back_for_rest(self, tmp_path, monkeypatch, isolated_session):
+        class BreaksAfterOne(FakeSession):
+            def screenshot(self, html, output_path, settings=None):
+                if self.calls:
+                    raise RuntimeError("websocket verbroken")
+                super().screenshot(html, output_path, settings)
+
+        session = BreaksAfterOne()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        fallback = []
+
+        def per_call(htmls, output_dir, filenames, settings=None):
+            fallback.extend(filenames)
+            for filename in filenames:
+                (output_dir / filename).write_bytes(b"FALLBACK")
+
+        monkeypatch.setattr(screenshot_gen, "_screenshot_per_call", per_call)
+
+        results = save_screenshots([_make_ticket(f"ORDER{i}") for i in range(3)], tmp_path)
+
+        assert len(fallback) == 2
+        assert all(isinstance(p, Path) for p in results.values())
+
+    def test_close_session_does_not_wait_for_whole_batch(self, tmp_path, monkeypatch, isolated_session):
+        import threading
+
+        started, release = threading.Event(), threading.Event()
+
+        class SlowSession(FakeSession):
+            def screenshot(self, html, output_path, settings=None):
+                started.set()
+                release.wait(timeout=5)
+                super().screenshot(html, output_path, settings)
+
+        session = SlowSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        results = {}
+        batch = threading.Thread(
+            target=lambda: results.update(
+                save_screenshots([_make_ticket(f"ORDER{i}") for i in range(3)], tmp_path)
+            )
+        )
+        batch.start()
+        assert started.wait(timeout=5)
+        generation = screenshot_gen._session_generation
+        closer = threading.Thread(target=screenshot_gen.close_session)
+        closer.start()
+        while screenshot_gen._session_generation == generation:
+            time.sleep(0.001)
+        release.set()
+        closer.join(timeout=5)
+        batch.join(timeout=5)
+
+        assert not closer.is_alive()
+        assert len(session.calls) == 1
+        assert isinstance(results["ORDER0"], Path)
+        assert all(isinstance(results[f"ORDER{i}"], RuntimeError) for i in (1, 2))
+
+
+class TestRenderCache:
+    def test_key_depends_on_html_and_settings(self):
+        assert render_key("<a>") == render_key("<a>")
+        assert render_key("<a>") != render_key("<b>")
+        assert render_key("<a>") != render_key("<a>", RenderSettings(width=1024))
+
+    def test_renamed_ticket_reuses_cached_render(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        heen = _make_ticket("WR826GNF", direction="heen")
+        terug = _make_ticket("WR826GNF", direction="terug")
+
+        first = save_screenshots([heen], tmp_path)["WR826GNF"]
+        second = save_screenshots([terug], tmp_path)["WR826GNF"]
+
+        assert len(session.calls) == 1
+        assert first.name == "trein_040226_heen_WR826GNF.png"
+        assert second.name == "trein_040226_terug_WR826GNF.png"
+        assert second.read_bytes() == first.read_bytes()
+
+    def test_rerender_after_deleting_output_is_free(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        ticket = _make_ticket("ABC12345")
+
+        path = save_screenshot(ticket, tmp_path)
+        path.unlink()
+        assert save_screenshot(ticket, tmp_path).exists()
+        assert len(session.calls) == 1
+
+    def test_identical_html_rendered_once_per_batch(self, tmp_path, monkeypatch, isolated_session):
+        session = FakeSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        a = _make_ticket("AAA")
+        b = _make_ticket("BBB")
+        b.email_html = a.email_html
+
+        results = save_screenshots([a, b], tmp_path)
+
+        assert len(session.calls) == 1
+        assert results["AAA"].exists() and results["BBB"].exists()
+
+    def test_source_html_kept_in_cache(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: FakeSession())
+        ticket = _make_ticket("ABC12345")
+        save_screenshot(ticket, tmp_path)
+
+        cached = cached_html_path(tmp_path, html_digest(ticket.email_html))
+        assert cached.read_text(encoding="utf-8") == ticket.email_html
+
+    def test_copy_when_hard_link_fails(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: FakeSession())
+        monkeypatch.setattr(screenshot_gen.os, "link", MagicMock(side_effect=OSError("EXDEV")))
+
+        path = save_screenshot(_make_ticket("ABC12345"), tmp_path)
+
+        assert path.read_bytes() == b"PNG"
+
+
+class TestPdfPages:
+    class PdfSession(FakeSession):
+        def print_pdf(self, html, output_path):
+            self.calls.append(output_path)
+            if self.fail:
+                raise RuntimeError("websocket verbroken")
+            output_path.write_bytes(b"%PDF " + html.encode())
+
+    def _cache(self, tmp_path, html):
+        digest = html_digest(html)
+        path = cached_html_path(tmp_path, digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+        return digest
+
+    def test_prints_cached_html_once(self, tmp_path, monkeypatch, isolated_session):
+        session = self.PdfSession()
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        digest = self._cache(tmp_path, "<html>A</html>")
+
+        first = save_pdf_pages([digest, digest], tmp_path)
+        second = save_pdf_pages([digest], tmp_path)
+
+        assert first[digest] == second[digest] == cached_pdf_path(tmp_path, digest)
+        assert first[digest].read_bytes() == b"%PDF <html>A</html>"
+        assert len(session.calls) == 1
+
+    def test_missing_html_is_error(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: self.PdfSession())
+        result = save_pdf_pages(["0" * 64], tmp_path)
+        assert isinstance(result["0" * 64], RuntimeError)
+
+    def test_without_session_every_page_fails(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: None)
+        digest = self._cache(tmp_path, "<html>B</html>")
+        result = save_pdf_pages([digest], tmp_path)
+        assert "Chrome" in str(result[digest])
+
+    def test_broken_session_is_dropped(self, tmp_path, monkeypatch, isolated_session):
+        session = self.PdfSession(fail=True)
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: session)
+        digests = [self._cache(tmp_path, f"<html>{i}</html>") for i in range(3)]
+
+        result = save_pdf_pages(digests, tmp_path)
+
+        assert all(isinstance(result[d], RuntimeError) for d in digests)
+        assert len(session.calls) == 1
+        assert session.closed
+        assert screenshot_gen._session_unavailable
+
+
+class TestImageOutput:
+    def test_settings_from_config(self):
+        cfg = MagicMock(SCREENSHOT_FORMAT="JPG", SCREENSHOT_QUALITY=70, SCREENSHOT_CROP=False)
+        assert render_settings_from_config(cfg) == RenderSettings(crop=False, fmt="jpeg", quality=70)
+
+    def test_invalid_config_falls_back_to_defaults(self, capsys):
+        cfg = MagicMock(SCREENSHOT_FORMAT="gif", SCREENSHOT_QUALITY=500, SCREENSHOT_CROP="ja")
+        assert render_settings_from_config(cfg) == RenderSettings()
+        assert "gif" in capsys.readouterr().out
+
+    def test_extension_follows_format(self, tmp_path, monkeypatch, isolated_session):
+        monkeypatch.setattr(screenshot_gen, "_get_session", lambda: FakeSession())
+        results = save_screenshots(
+            [_make_ticket("UPL1IGGK")], tmp_path, RenderSettings(fmt="webp")
+        )
+        assert results["UPL1IGGK"].name == "trein_040226_heen_UPL1IGGK.webp"
+        assert list((tmp_path / ".cache" / "img").iterdir())[0].suffix == ".webp"
+
+    def test_postprocess_trims_empty_bottom(self, tmp_path):
+        Image = pytest.importorskip("PIL.Image")
+        img = Image.new("RGB", (80, 200), "white")
+        img.paste((0, 0, 0), (10, 10, 70, 50))
+        img.save(tmp_path / "raw.png")
+
+        _postprocess_image(tmp_path / "raw.png", tmp_path / "out.jpg", RenderSettings(fmt="jpeg"))
+
+        assert not (tmp_path / "raw.png").exists()
+        with Image.open(tmp_path / "out.jpg") as out:
+            assert out.format == "JPEG"
+            assert out.size == (80, 50)
+
+    def test_postprocess_without_pillow_keeps_png(self, tmp_path, monkeypatch):
+        import builtins
+
+        real_import = builtins.__import__
+
+        def no_pil(name, *args, **kwargs):
+            if name.startswith("PIL"):
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_pil)
+        (tmp_path / "raw.png").write_bytes(b"PNG")
+
+        _postprocess_image(tmp_path / "raw.png", tmp_path / "out.png", RenderSettings())
+        assert (tmp_path / "out.png").read_bytes() == b"PNG"
+        (tmp_path / "raw.png").write_bytes(b"PNG")
+        with pytest.raises(RuntimeError, match="Pillow"):
+            _postprocess_image(tmp_path / "raw.png", tmp_path / "out.webp", RenderSettings(fmt="webp"))
+
+
+class TestScreenshotQueue:
+    def test_renders_in_background_and_collects_results(self, tmp_path):
+        rendered = []
+
+        def render_many(tickets, screenshots_dir, settings=None):
+            rendered.extend(t.order_number for t in tickets)
+            return {t.order_number: screenshots_dir / f"{t.order_number}.png" for t in tickets}
+
+        queue = ScreenshotQueue(tmp_path, render_many=render_many)
+        queue.submit(_make_ticket("ORDER111"))
+        queue.submit(_make_ticket("ORDER222"))
+        results = queue.wait()
+
+        assert rendered == ["ORDER111", "ORDER222"]
+        assert results == {
+            "ORDER111": tmp_path / "ORDER111.png",
+            "ORDER222": tmp_path / "ORDER222.png",
+        }
+
+    def test_queued_tickets_rendered_as_one_batch(self, tmp_path):
+        import threading
+
+        release = threading.Event()
+        batches = []
+
+        def render_many(tickets, screenshots_dir, settings=None):
+            release.wait(timeout=5)
+            batches.append([t.order_number for t in tickets])
+            return {t.order_number: screenshots_dir / "x.png" for t in tickets}
+
+        queue = ScreenshotQueue(tmp_path, render_many=render_many)
+        queue.submit(_make_ticket("FIRST"))
+        for order in ("A", "B", "C"):
+            queue.submit(_make_ticket(order))
+        release.set()
+        queue.wait()
+
+        assert sum(len(b) for b in batches) == 4
+        assert len(batches) <= 2
+
+    def test_failures_are_kept_per_ticket(self, tmp_path):
+        def render_many(tickets, screenshots_dir, settings=None):
+            return {
+                t.order_number: RuntimeError("Chrome weg") if t.order_number == "BAD"
+                else screenshots_dir / "ok.png"
+                for t in tickets
+            }
+
+        queue = ScreenshotQueue(tmp_path, render_many=render_many)
+        for order in ("GOOD", "BAD"):
+            queue.submit(_make_ticket(order))
+        results = queue.wait()
+
+        assert results["GOOD"] == tmp_path / "ok.png"
+        assert str(results["BAD"]) == "Chrome weg"
+
+    def test_crashing_renderer_becomes_error_per_ticket(self, tmp_path):
+        def render_many(tickets, screenshots_dir, settings=None):
+            raise OSError("schijf vol")
+
+        queue = ScreenshotQueue(tmp_path, render_many=render_many)
+        queue.submit(_make_ticket("WORSE"))
+        results = queue.wait()
+
+        assert isinstance(results["WORSE"], RuntimeError)
+        assert "WORSE" in str(results["WORSE"])
+
+    def test_wait_without_submissions(self, tmp_path):
+        assert ScreenshotQueue(tmp_path).wait() == {}
@@ -1,8 +1,11 @@
 """
 Tests voor state.py
 """
+from datetime import date
+
 import pytest
 
+from excel_dates import date_to_excel_serial
 from state import (
     load_state,
     save_state,
@@ -10,6 +13,11 @@ from state import (
     is_skipped,
     mark_processed,
     mark_skipped_weekend,
+    duplicate_of,
+    month_aggregates,
+    trip_index,
+    trip_key,
+    unmark_processed,
 )
 
 
@@ -58,3 +66,109 @@ def test_no_duplicates(state_file):
 def test_missing_file_returns_empty(tmp_path):
     state = load_state(tmp_path / "nonexistent.json")
     assert state["processed"] == []
+
+
+def _meta(travel_date, price=14.0, direction="heen"):
+    return {
+        "filename": "onkosten.xlsx",
+        "travel_date_serial": date_to_excel_serial(travel_date),
+        "description": f"Trein Zottegem - Antwerpen-Zuid {direction}",
+        "price": price,
+        "direction": direction,
+        "trip": trip_key(travel_date, "Zottegem", "Antwerpen-Zuid", price),
+    }
+
+
+class TestMonthAggregates:
+    def test_updated_on_mark(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 10)))
+        mark_processed("B", state, _meta(date(2026, 2, 3), 28.0, "heen/terug"))
+        mark_processed("C", state, _meta(date(2026, 3, 2), 14.5, "terug"))
+
+        feb = month_aggregates(state)["2026-02"]
+        assert (feb["count"], feb["vervoer"]) == (2, 42.0)
+        assert (feb["first"], feb["last"]) == ("2026-02-03", "2026-02-10")
+        assert feb["directions"] == {"heen": 1, "heen/terug": 1}
+        assert month_aggregates(state)["2026-03"]["vervoer"] == 14.5
+
+    def test_remark_does_not_count_twice(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 10)))
+        mark_processed("A", state, _meta(date(2026, 2, 10), 15.0))
+        feb = month_aggregates(state)["2026-02"]
+        assert (feb["count"], feb["vervoer"]) == (1, 15.0)
+
+    def test_unmark_updates_first_last_and_drops_empty_month(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 3)))
+        mark_processed("B", state, _meta(date(2026, 2, 10), 28.0, "heen/terug"))
+        mark_processed("C", state, _meta(date(2026, 3, 2)))
+
+        unmark_processed("A", state)
+        unmark_processed("C", state)
+        assert not is_processed("A", state)
+        assert "A" not in state["metadata"]
+        assert list(month_aggregates(state)) == ["2026-02"]
+        feb = month_aggregates(state)["2026-02"]
+        assert (feb["count"], feb["vervoer"], feb["first"]) == (1, 28.0, "2026-02-10")
+        assert feb["directions"] == {"heen/terug": 1}
+
+    def test_survives_save_load(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 3)))
+        save_state(state, state_file)
+        assert month_aggregates(load_state(state_file)) == month_aggregates(state)
+
+    def test_built_once_for_older_state(self, state_file):
+        """Metadata van voor de totalen (zonder prijs) telt mee als onbekend bedrag."""
+        old = _meta(date(2026, 2, 3))
+        del old["price"], old["direction"]
+        state = {"processed": ["OLD"], "skipped_weekend": [], "metadata": {"OLD": old}}
+
+        mark_processed("NEW", state, _meta(date(2026, 2, 4)))
+        feb = month_aggregates(state)["2026-02"]
+        assert (feb["count"], feb["vervoer"], feb["unknown_price"]) == (2, 14.0, 1)
+
+
+class TestTripIndex:
+    KEY = trip_key(date(2026, 2, 13), "Zottegem", "Antwerpen-Zuid", 14.0)
+
+    def test_same_trip_under_other_order_is_found(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 13)))
+        assert duplicate_of(self.KEY, state) == "A"
+        assert duplicate_of(trip_key(date(2026, 2, 13), "zottegem", "ANTWERPEN-ZUID", 14), state) == "A"
+        assert duplicate_of(trip_key(date(2026, 2, 13), "Zottegem", "Antwerpen-Zuid", 15.0), state) is None
+
+    def test_unmark_removes_trip(self, state_file):
+        state = load_state(state_file)
+        mark_processed("A", state, _meta(date(2026, 2, 13)))
+        mark_processed("B", state, _meta(date(2026, 2, 13)))
+        unmark_processed("A", state)
+        assert duplicate_of(self.KEY, state) == "B"
+        unmark_processed("B", state)
+        assert trip_index(state) == {}
+
+    def test_built_from_older_metadata(self, state_file):
+        """Metadata zonder "trip" krijgt de sleutel uit omschrijving, datum en prijs."""
+        old = _meta(date(2026, 2, 13))
+        del old["trip"]
+        state = {"processed": ["OLD"], "skipped_weekend": [], "metadata": {"OLD": old}}
+        assert duplicate_of(self.KEY, state) == "OLD"
+
+
+def test_state_does_not_load_excel_updater():
+    """De state rekent met excel_dates, zonder de Excel-schrijver (en openpyxl) te laden."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, state; print('excel_updater' in sys.modules)"],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
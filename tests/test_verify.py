@@ -0,0 +1,137 @@
+"""
+Tests voor verify.py — vergelijking van state, Excel en screenshots.
+"""
+from datetime import date
+from unittest.mock import patch
+
+import openpyxl
+import pytest
+
+from email_parser import TicketData
+from excel_updater import (
+    COL_OMSCHRIJVING,
+    DATA_START_ROW,
+    add_tickets_by_month,
+    date_to_excel_serial,
+    excel_path_for_date,
+    remove_ticket_from_excel,
+)
+from state import load_state, mark_processed, unmark_processed
+from verify import format_verify_report, verify
+
+
+def _make_ticket(order, travel_date, direction="heen"):
+    return TicketData(
+        order_number=order,
+        from_station="Zottegem",
+        to_station="Antwerpen-Zuid",
+        direction=direction,
+        travel_date=travel_date,
+        price=14.0,
+        email_html="",
+    )
+
+
+TICKETS = [
+    _make_ticket("JAN1", date(2026, 1, 7)),
+    _make_ticket("JAN2", date(2026, 1, 7), "terug"),
+    _make_ticket("FEB1", date(2026, 2, 3)),
+]
+
+
+def _description(t):
+    return f"Trein {t.from_station} - {t.to_station} {t.direction}"
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Drie verwerkte tickets: rijen in Excel, metadata in de state, een screenshot elk."""
+    excel_dir = tmp_path / "data"
+    screenshots_dir = tmp_path / "screenshots"
+    add_tickets_by_month(TICKETS, excel_dir)
+    state = load_state(tmp_path / "processed.json")
+    for t in TICKETS:
+        mark_processed(t.order_number, state, {
+            "filename": excel_path_for_date(excel_dir, t.travel_date).name,
+            "travel_date_serial": date_to_excel_serial(t.travel_date),
+            "description": _description(t),
+            "price": t.price,
+            "direction": t.direction,
+        })
+        folder = screenshots_dir / ("Januari 2026" if t.travel_date.month == 1 else "Februari 2026")
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"trein_{t.travel_date:%d%m%y}_{t.direction}_{t.order_number}.png").write_bytes(b"")
+    return state, excel_dir, screenshots_dir
+
+
+def test_consistent_project_is_ok(project):
+    report = verify(*project)
+    assert report.ok
+    assert (report.tickets, report.rows, report.screenshots) == (3, 3, 3)
+    assert "Alles komt overeen" in format_verify_report(report)
+
+
+def test_row_deleted_by_hand(project):
+    state, excel_dir, screenshots_dir = project
+    t = TICKETS[1]
+    remove_ticket_from_excel(
+        excel_path_for_date(excel_dir, t.travel_date), date_to_excel_serial(t.travel_date), _description(t)
+    )
+    report = verify(state, excel_dir, screenshots_dir)
+    assert report.missing_rows == ["JAN2"]
+    assert report.unknown_rows == []
+
+
+def test_missing_month_file(project):
+    state, excel_dir, screenshots_dir = project
+    excel_path_for_date(excel_dir, date(2026, 2, 1)).unlink()
+    assert verify(state, excel_dir, screenshots_dir).missing_rows == ["FEB1"]
+
+
+def test_row_unknown_to_state(project):
+    """Een treinrij zonder ticket in de state wordt gemeld; andere onkosten niet."""
+    state, excel_dir, screenshots_dir = project
+    unmark_processed("FEB1", state)
+    feb = excel_path_for_date(excel_dir, date(2026, 2, 1))
+    wb = openpyxl.load_workbook(feb)
+    ws = wb.active
+    ws.cell(row=DATA_START_ROW + 1, column=1).value = ws.cell(row=DATA_START_ROW, column=1).value
+    ws.cell(row=DATA_START_ROW + 1, column=COL_OMSCHRIJVING).value = "Parking station"
+    wb.save(feb)
+
+    report = verify(state, excel_dir, screenshots_dir)
+    assert [(name, row.description) for name, row in report.unknown_rows] == [
+        (feb.name, _description(TICKETS[2]))
+    ]
+    assert report.missing_rows == []
+
+
+def test_screenshot_differences(project):
+    state, excel_dir, screenshots_dir = project
+    next((screenshots_dir / "Januari 2026").glob("*JAN1.png")).unlink()
+    (screenshots_dir / "Februari 2026" / "trein_040226_heen_OUD1.png").write_bytes(b"")
+    (screenshots_dir / "Februari 2026" / "trein_050226_heen_WACHT.png").write_bytes(b"")
+
+    report = verify(state, excel_dir, screenshots_dir, pending={"WACHT"})
+    assert report.missing_screenshots == ["JAN1"]
+    assert [p.name for p in report.orphan_screenshots] == ["trein_040226_heen_OUD1.png"]
+
+
+def test_screenshot_without_order_number_is_not_an_orphan(project):
+    state, excel_dir, screenshots_dir = project
+    (screenshots_dir / "Februari 2026" / "trein_040226_heen.png").write_bytes(b"")
+
+    report = verify(state, excel_dir, screenshots_dir)
+    assert report.orphan_screenshots == []
+    assert [p.name for p in report.unrecognized_screenshots] == ["trein_040226_heen.png"]
+    assert report.ok
+    assert "zonder bestelnummer" in format_verify_report(report)
+
+
+def test_unreadable_file_is_not_judged(project):
+    state, excel_dir, screenshots_dir = project
+    with patch("verify.scan_month_rows", side_effect=OSError("vergrendeld")):
+        report = verify(state, excel_dir, screenshots_dir)
+    assert set(report.unreadable) == {"Onkosten_Januari_2026.xlsx", "Onkosten_Februari_2026.xlsx"}
+    assert report.missing_rows == []
+    assert not report.ok
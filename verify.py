@@ -0,0 +1,185 @@
+"""
+Controle (--verify) of de state, de Excel-bestanden en de screenshots nog
+met elkaar overeenkomen.
+
+Van elke bron wordt één index opgebouwd, elke bron één keer gelezen:
+
+  state        (bestand, datum, omschrijving) -> bestelnummers, uit de metadata
+  Excel        (bestand, datum, omschrijving) -> rijen, read-only gescand
+  screenshots  bestelnummer -> bestand, uit de maandmappen
+
+en daarna vergeleken met verzamelingsbewerkingen. Zo vinden we tickets
+waarvan de rij met de hand uit Excel verwijderd is, treinrijen in Excel die
+de state niet (meer) kent (bijv. na het verlies van processed.json),
+verwerkte tickets zonder screenshot en screenshots van tickets die niet
+(meer) verwerkt zijn. Screenshots waarvan de naam geen bestelnummer bevat
+(oudere versies), worden apart gemeld in plaats van als wees. Rijen die niet met "Trein " beginnen, zijn niet door
+dit programma geschreven en worden niet beoordeeld.
+"""
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from constants import DUTCH_MONTHS
+from excel_dates import date_to_excel_serial
+from excel_updater import ExcelRow, month_excel_files, scan_month_rows
+from report_gen import screenshots_by_order
+
+TRAIN_PREFIX = "Trein "
+
+RowKey = tuple[str, int, str]  # (bestandsnaam, travel_date_serial, omschrijving)
+
+
+@dataclass
+class VerifyReport:
+    tickets: int = 0                      # verwerkte tickets in de state
+    rows: int = 0                         # treinrijen in de gescande maandbestanden
+    screenshots: int = 0                  # screenshots in de maandmappen
+    missing_rows: list[str] = field(default_factory=list)        # in de state, niet in Excel
+    unknown_rows: list[tuple[str, ExcelRow]] = field(default_factory=list)  # in Excel, niet in de state
+    missing_screenshots: list[str] = field(default_factory=list)  # verwerkt, zonder screenshot
+    orphan_screenshots: list[Path] = field(default_factory=list)  # screenshot, niet verwerkt
+    unrecognized_screenshots: list[Path] = field(default_factory=list)  # naam zonder bestelnummer
+    without_metadata: list[str] = field(default_factory=list)    # verwerkt zonder Excel-info
+    unreadable: dict[str, str] = field(default_factory=dict)     # bestandsnaam -> fout
+
+    @property
+    def ok(self) -> bool:
+        return not (
+            self.missing_rows or self.unknown_rows or self.missing_screenshots
+            or self.orphan_screenshots or self.unreadable
+        )
+
+
+def state_index(state: dict) -> tuple[dict[RowKey, list[str]], list[str]]:
+    """Verwachte Excel-rijen volgens de state, plus de verwerkte tickets zonder metadata."""
+    index: dict[RowKey, list[str]] = {}
+    without_metadata: list[str] = []
+    metadata = state.get("metadata", {})
+    for order in state.get("processed", []):
+        meta = metadata.get(order)
+        if meta is None or meta.get("travel_date_serial") is None or not meta.get("filename"):
+            without_metadata.append(order)
+            continue
+        key = (meta["filename"], meta["travel_date_serial"], meta.get("description") or "")
+        index.setdefault(key, []).append(order)
+    return index, without_metadata
+
+
+def excel_index(excel_paths) -> tuple[dict[RowKey, list[ExcelRow]], dict[str, str]]:
+    """De treinrijen van alle maandbestanden, plus de bestanden die niet te lezen waren."""
+    index: dict[RowKey, list[ExcelRow]] = {}
+    unreadable: dict[str, str] = {}
+    for path in excel_paths:
+        try:
+            rows = scan_month_rows(path)
+        except Exception as exc:  # vergrendeld of beschadigd: dit bestand niet beoordelen
+            unreadable[path.name] = str(exc)
+            continue
+        for row in rows:
+            description = row.description or ""
+            if not description.startswith(TRAIN_PREFIX):
+                continue
+            key = (path.name, date_to_excel_serial(row.travel_date), description)
+            index.setdefault(key, []).append(row)
+    return index, unreadable
+
+
+def screenshot_index(screenshots_dir: Path, unmatched: list[Path] | None = None) -> dict[str, Path]:
+    """
+    Alle ticketscreenshots in de maandmappen (bijv. "Februari 2026"), op
+    bestelnummer. Namen zonder bestelnummer komen in unmatched (indien gegeven).
+    """
+    found: dict[str, Path] = {}
+    if not screenshots_dir.is_dir():
+        return found
+    month_names = set(DUTCH_MONTHS.values())
+    with os.scandir(screenshots_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.split(" ")[0] in month_names:
+                found.update(screenshots_by_order(Path(entry.path), unmatched))
+    return found
+
+
+def verify(
+    state: dict,
+    excel_dir: Path,
+    screenshots_dir: Path,
+    pending: set[str] = frozenset(),
+) -> VerifyReport:
+    """
+    Vergelijk state, Excel en screenshots.
+
+    pending: bestelnummers die nog in de wachtrij of de reviewlijst staan;
+    hun screenshots tellen niet als wees.
+    """
+    expected, without_metadata = state_index(state)
+    filenames = {key[0] for key in expected}
+    paths = sorted(set(month_excel_files(excel_dir)) | {excel_dir / name for name in filenames})
+    present, unreadable = excel_index(p for p in paths if p.exists())
+
+    report = VerifyReport(
+        tickets=len(state.get("processed", [])),
+        rows=sum(len(rows) for rows in present.values()),
+        without_metadata=without_metadata,
+        unreadable=unreadable,
+    )
+
+    # Per sleutel: meer bestelnummers dan rijen -> rij(en) weg; meer rijen -> onbekend
+    for key in expected.keys() | present.keys():
+        if key[0] in unreadable:
+            continue
+        orders = expected.get(key, [])
+        rows = present.get(key, [])
+        report.missing_rows.extend(orders[len(rows):])
+        report.unknown_rows.extend((key[0], row) for row in rows[len(orders):])
+    report.missing_rows.sort()
+    report.unknown_rows.sort(key=lambda item: (item[1].travel_date, item[0]))
+
+    unrecognized: list[Path] = []
+    shots = screenshot_index(screenshots_dir, unrecognized)
+    report.screenshots = len(shots)
+    report.unrecognized_screenshots = sorted(unrecognized)
+    processed = set(state.get("processed", []))
+    report.missing_screenshots = sorted(processed - shots.keys())
+    report.orphan_screenshots = sorted(shots[o] for o in shots.keys() - processed - set(pending))
+    return report
+
+
+def format_verify_report(report: VerifyReport) -> str:
+    """Leesbare samenvatting van de verschillen (ASCII)."""
+    lines = [
+        f"  Gecontroleerd: {report.tickets} ticket(s) in de state, {report.rows} treinrij(en)"
+        f" in Excel, {report.screenshots} screenshot(s).",
+    ]
+    for name, error in sorted(report.unreadable.items()):
+        lines.append(f"  Niet gelezen: {name} -- {error}")
+    if report.missing_rows:
+        lines.append(f"\n  {len(report.missing_rows)} verwerkt(e) ticket(s) zonder rij in Excel:")
+        lines.extend(f"    - {order}" for order in report.missing_rows)
+    if report.unknown_rows:
+        lines.append(f"\n  {len(report.unknown_rows)} treinrij(en) in Excel die de state niet kent:")
+        lines.extend(
+            f"    - {row.travel_date.strftime('%d/%m/%Y')}  {row.description}  ({name})"
+            for name, row in report.unknown_rows
+        )
+    if report.missing_screenshots:
+        lines.append(f"\n  {len(report.missing_screenshots)} verwerkt(e) ticket(s) zonder screenshot:")
+        lines.extend(f"    - {order}" for order in report.missing_screenshots)
+    if report.orphan_screenshots:
+        lines.append(f"\n  {len(report.orphan_screenshots)} screenshot(s) van niet-verwerkte tickets:")
+        lines.extend(f"    - {path.parent.name}/{path.name}" for path in report.orphan_screenshots)
+    if report.unrecognized_screenshots:
+        lines.append(
+            f"\n  {len(report.unrecognized_screenshots)} screenshot(s) zonder bestelnummer in de naam"
+            " (oudere versie); niet vergeleken:"
+        )
+        lines.extend(f"    - {path.parent.name}/{path.name}" for path in report.unrecognized_screenshots)
+    if report.without_metadata:
+        lines.append(
+            f"\n  {len(report.without_metadata)} ticket(s) zonder Excel-info in de state"
+            " (verwerkt met een oudere versie); niet vergeleken met Excel."
+        )
+    if report.ok:
+        lines.append("\n  Alles komt overeen.")
+    return "\n".join(lines)